@@ -281,6 +281,10 @@ class Pilas(object):
 
         print "%s - Reiniciando" % (time.strftime("%H:%m:%S"))
 
+        # Las imagenes pudieron cambiar en disco, así que se descartan
+        # las que estaban en memoria.
+        self.imagenes.vaciar_cache()
+
         geometry = self.widget.geometry()
 
         scope = {'pilas': self, '__file__': None}
@@ -552,6 +556,30 @@ class Pilas(object):
         else:
             self.widget.definir_modo_ventana()
 
+    def definir_bucle_con_interpolacion(self, estado=True, maximo_de_pasos=5):
+        """Usa un bucle que dibuja a los actores entre dos actualizaciones.
+
+        Es útil en equipos lentos o con monitores de frecuencias
+        distintas a 60 cuadros por segundo.
+
+        :param estado: True para habilitar el bucle, False para volver al bucle normal.
+        :param maximo_de_pasos: Cantidad máxima de actualizaciones lógicas por cuadro.
+        """
+        self.widget.definir_bucle_con_interpolacion(estado, maximo_de_pasos)
+
+    def definir_redibujado_por_regiones(self, estado=True):
+        """Hace que en cada cuadro solo se pinten las partes que cambiaron.
+
+        Es ideal para juegos de mesa o menúes donde casi todos los
+        actores están quietos. Solo funciona sin aceleración de video.
+
+        :param estado: True para habilitar la opción, False para deshabilitarla.
+        """
+        if self.usa_aceleracion():
+            self.log("El redibujado por regiones no se puede usar con aceleracion de video.")
+        else:
+            self.widget.definir_redibujado_por_regiones(estado)
+
     def obtener_actor_por_indice(self, indice):
         return self.escena._actores.obtener_actores()[indice]
 
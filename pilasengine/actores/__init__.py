@@ -385,22 +385,26 @@ class Actores(object):
                                  ruta_over=ruta_over)
 
     def Mapa(self, x=0, y=0, grilla=None, filas=20, columnas=20,
-             densidad=0, restitucion=0, friccion=10.5, amortiguacion=0.1):
+             densidad=0, restitucion=0, friccion=10.5, amortiguacion=0.1,
+             unir_bloques_solidos=True):
         ":rtype: mapa.Mapa"
         return self._crear_actor('mapa', 'Mapa', x=x, y=y,
                                  grilla=grilla,
                                  filas=filas, columnas=columnas,
                                  densidad=densidad, restitucion=restitucion,
                                  friccion=friccion,
-                                 amortiguacion=amortiguacion)
+                                 amortiguacion=amortiguacion,
+                                 unir_bloques_solidos=unir_bloques_solidos)
 
     def MapaTiled(self, ruta_mapa, x=0, y=0,
-                  densidad=0, restitucion=0, friccion=10.5, amortiguacion=0.1):
+                  densidad=0, restitucion=0, friccion=10.5, amortiguacion=0.1,
+                  unir_bloques_solidos=True):
         ":rtype: mapa.MapaTiled"
         return self._crear_actor('mapa_tiled', 'MapaTiled', ruta_mapa=ruta_mapa, x=x, y=y,
                                  densidad=densidad, restitucion=restitucion,
                                  friccion=friccion,
-                                 amortiguacion=amortiguacion)
+                                 amortiguacion=amortiguacion,
+                                 unir_bloques_solidos=unir_bloques_solidos)
 
     def Banana(self,  x=0, y=0):
         ":rtype: banana.Banana"
@@ -498,11 +502,12 @@ class Actores(object):
                                  objetivo=objetivo)
 
     def Texto(self, cadena_de_texto="Sin texto", magnitud=20, vertical=False,
-              fuente=None, fijo=True, ancho=0, x=0, y=0):
+              fuente=None, fijo=True, ancho=0, x=0, y=0, usar_atlas=False):
         ":rtype: texto.Texto"
         import texto
         nuevo_actor = texto.Texto(self.pilas, cadena_de_texto, magnitud,
-                                  vertical, fuente, fijo, ancho, x, y)
+                                  vertical, fuente, fijo, ancho, x, y,
+                                  usar_atlas)
         return nuevo_actor
 
     def TextoInferior(self, texto="Sin texto", magnitud=20, retraso=5):
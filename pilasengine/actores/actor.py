@@ -9,6 +9,7 @@
 import inspect
 
 import pilasengine
+from pilasengine.utils import pitweener
 from estudiante import Estudiante
 from __builtin__ import True
 
@@ -93,6 +94,10 @@ class Actor(Estudiante):
         >>> invisible = pilas.actores.Actor('invisible.png')
     """
 
+    # Indice de la escena que recuerda en qué parte de la pantalla está
+    # el actor, ver _marcar_caja_modificada.
+    _indice_de_visibilidad = None
+
     def __init__(self, pilas=None, *k, **kv):
         # Especifica la composión de dibujado (ver actor particula.py).
         self.composicion = None
@@ -167,6 +172,7 @@ class Actor(Estudiante):
     def agregar(self, actor):
         self._actores.append(actor)
         actor.padre = self
+        self._marcar_caja_modificada()
 
     def agregar_al_grupo(self, grupo):
         self._grupos_a_los_que_pertenece.append(grupo)
@@ -192,8 +198,17 @@ class Actor(Estudiante):
         self.transparencia = 0
         self.espejado = False
         self.fijo = False
+        self._estatico = False
         self._figura_de_colision = None
 
+        # Posición, rotación y escala antes de la última actualización
+        # lógica, se usa para dibujar al actor entre dos actualizaciones.
+        self._transformacion_anterior = None
+
+        # Radio de la figura circular que se creará recién cuando el
+        # actor participe de alguna colisión (ver radio_de_colision).
+        self._figura_de_colision_pendiente = None
+
         if imagen:
             self.imagen = imagen
 
@@ -213,9 +228,14 @@ class Actor(Estudiante):
         self._dy = self.y
 
     def obtener_figura_de_colision(self):
+        if self._figura_de_colision_pendiente:
+            self._crear_figura_de_colision_pendiente()
+
         return self._figura_de_colision
 
     def definir_figura_de_colision(self, figura):
+        self._figura_de_colision_pendiente = None
+
         # Elimina la habilidad de imitar si la figura de colision es el objetivo.
         if self.esta_imitando_su_figura():
             self.eliminar_habilidad(self.pilas.habilidades.Imitar)
@@ -317,6 +337,7 @@ class Actor(Estudiante):
 
         self._imagen = imagen
         self.centro = ("centro", "centro")
+        self._marcar_caja_modificada()
 
     # Propiedades
     imagen = property(_obtener_imagen, _definir_imagen,
@@ -407,6 +428,7 @@ class Actor(Estudiante):
 
     def definir_x(self, x):
         self.pilas.utils.interpretar_propiedad_numerica(self, 'x', x)
+        self._marcar_caja_modificada()
 
     def obtener_centro_x(self):
         return self._centro_x
@@ -418,6 +440,7 @@ class Actor(Estudiante):
                                 % (x))
             x = self._interpretar_y_convertir_posicion(x, self.obtener_ancho())
         self.pilas.utils.interpretar_propiedad_numerica(self, 'centro_x', x)
+        self._marcar_caja_modificada()
 
     def obtener_centro_y(self):
         return self._centro_y
@@ -429,16 +452,18 @@ class Actor(Estudiante):
                                 % (y))
             y = self._interpretar_y_convertir_posicion(y, self.obtener_alto())
         self.pilas.utils.interpretar_propiedad_numerica(self, 'centro_y', y)
+        self._marcar_caja_modificada()
 
     def obtener_z(self):
         return self._z
 
     def definir_z(self, z):
         self._z = z
-        self.pilas.escena_actual()._actores.sort()
+        self.pilas.escena_actual()._actores.reubicar(self)
 
     def definir_y(self, y):
         self.pilas.utils.interpretar_propiedad_numerica(self, 'y', y)
+        self._marcar_caja_modificada()
 
     def obtener_y(self):
         return self._y
@@ -454,11 +479,13 @@ class Actor(Estudiante):
         self.pilas.utils.interpretar_propiedad_numerica(self, 'escala_x', s)
         if self._escala_x < 0.001:
             self._escala_x = 0.001
+        self._marcar_caja_modificada()
 
     def definir_escala_y(self, s):
         self.pilas.utils.interpretar_propiedad_numerica(self, 'escala_y', s)
         if self._escala_y < 0.001:
             self._escala_y = 0.001
+        self._marcar_caja_modificada()
 
     def obtener_escala(self):
         return self._escala_x
@@ -477,12 +504,14 @@ class Actor(Estudiante):
             rotacion %= 360
         self.pilas.utils.interpretar_propiedad_numerica(self, 'rotacion',
                                                         rotacion)
+        self._marcar_caja_modificada()
 
     def obtener_espejado(self):
         return self._espejado
 
     def definir_espejado(self, espejado):
         self._espejado = espejado
+        self._marcar_caja_modificada()
 
     def definir_transparencia(self, transparencia):
         self.pilas.utils.interpretar_propiedad_numerica(self, 'transparencia',
@@ -496,7 +525,38 @@ class Actor(Estudiante):
 
     def definir_fijo(self, fijo):
         self._fijo = fijo
-        # self.pilas.obtener_escena_actual().cambia_estado_fijo(self)
+        self._notificar_cambio_de_estado_a_los_grupos()
+
+    def obtener_padre(self):
+        return self._padre
+
+    def definir_padre(self, padre):
+        self._padre = padre
+        self._notificar_cambio_de_estado_a_los_grupos()
+
+    def _notificar_cambio_de_estado_a_los_grupos(self):
+        # Los grupos guardan listas de actores filtradas por los
+        # atributos fijo y padre (ver Grupo.iterar_actores).
+        for grupo in getattr(self, '_grupos_a_los_que_pertenece', []):
+            grupo.cambia_estado_de_actor(self)
+
+        self._marcar_caja_modificada()
+
+    def _marcar_caja_modificada(self):
+        """Avisa a la escena que el actor se movió o cambió de tamaño.
+
+        Así la escena solo vuelve a ubicar a los actores modificados
+        antes de dibujar (ver IndiceDeVisibilidad).
+        """
+        if self._indice_de_visibilidad:
+            self._indice_de_visibilidad.marcar(self)
+
+    def obtener_estatico(self):
+        return self._estatico
+
+    def definir_estatico(self, estatico):
+        self._estatico = estatico
+        self.pilas.escena_actual().invalidar_capa_estatica()
 
     def obtener_vx(self):
         return self._vx
@@ -534,6 +594,12 @@ class Actor(Estudiante):
     fijo = property(obtener_fijo, definir_fijo,
                     doc="Indica si el actor debe ser \
                     independiente a la cámara.")
+    padre = property(obtener_padre, definir_padre,
+                     doc="Actor que contiene a este actor (ver agregar).")
+    estatico = property(obtener_estatico, definir_estatico,
+                        doc="Indica si el actor casi no cambia, y se puede \
+                        dibujar una sola vez junto a los demás actores \
+                        estáticos, debajo del resto de los actores.")
 
     def eliminar(self):
         """Elimina el actor de la lista que se imprimen en pantalla."""
@@ -551,8 +617,10 @@ class Actor(Estudiante):
             self._destruir()
 
     def _eliminar_figura_de_colision(self):
-        if self.figura_de_colision:
-            self.figura_de_colision.eliminar()
+        self._figura_de_colision_pendiente = None
+
+        if self._figura_de_colision:
+            self._figura_de_colision.eliminar()
 
     def _destruir(self):
         """Elimina a un actor pero de manera inmediata."""
@@ -584,13 +652,21 @@ class Actor(Estudiante):
         self.__actualizar_velocidad()
 
     def pos_actualizar(self):
-        self.mover_figura_de_colision()
+        if self._figura_de_colision_pendiente:
+            colisiones = self.pilas.escena_actual().colisiones
+
+            if colisiones.requiere_figura_de_colision(self):
+                self._crear_figura_de_colision_pendiente()
+        else:
+            self.mover_figura_de_colision()
 
     def mover_figura_de_colision(self):
-        if getattr(self, 'figura_de_colision', False):
-            self.figura_de_colision.x = self.x - self._figura_de_colision_dx
-            self.figura_de_colision.y = self.y - self._figura_de_colision_dy
-            self.figura_de_colision.rotacion = self.rotacion
+        figura = self._figura_de_colision
+
+        if figura:
+            figura.x = self.x - self._figura_de_colision_dx
+            figura.y = self.y - self._figura_de_colision_dy
+            figura.rotacion = self.rotacion
 
     def _agregar_callback(self, grupo_de_callbacks, callback):
         """Agrega una función para invocar en una colección.
@@ -976,12 +1052,22 @@ class Actor(Estudiante):
         return self._radio_de_colision
 
     def definir_radio_de_colision(self, radio):
+        """Define el radio del circulo que se usa para detectar colisiones.
+
+        La figura física no se crea en este momento, sino cuando el
+        actor se utiliza en ``pilas.colisiones.agregar`` o se consulta
+        su ``figura_de_colision``. Así los actores que nunca colisionan
+        (textos, fondos, partículas etc.) no ocupan lugar en el motor
+        de física.
+        """
         self._radio_de_colision = radio
 
-        if radio:
+        if not radio:
+            self.figura_de_colision = None
+        elif self._figura_de_colision:
             self.crear_figura_de_colision_circular(radio)
         else:
-            self.figura_de_colision = None
+            self._figura_de_colision_pendiente = radio
 
     radio_de_colision = property(obtener_radio_de_colision, definir_radio_de_colision)
 
@@ -997,6 +1083,16 @@ class Actor(Estudiante):
 
     area_de_colision = property(obtener_area_colision, definir_area_colision)
 
+    def tiene_figura_de_colision_pendiente(self):
+        """Indica si el actor todavía no ha creado su figura de colisión."""
+        return bool(self._figura_de_colision_pendiente)
+
+    def _crear_figura_de_colision_pendiente(self):
+        radio = self._figura_de_colision_pendiente
+        self._figura_de_colision_pendiente = None
+        self.crear_figura_de_colision_circular(radio)
+        self.mover_figura_de_colision()
+
     def crear_figura_de_colision_circular(self, radio, x=0, y=0):
         self.ff = self.pilas.fisica.Circulo(None, None, radio, dinamica=False, sensor=True)
         self.figura_de_colision = self.ff
@@ -1023,3 +1119,13 @@ class Actor(Estudiante):
             return self.etiquetas.tiene_etiqueta(etiqueta)
         else:
             raise Exception("Solo se permite consultar por etiquetas como cadenas de texto, has enviado: " + str(etiqueta))
+
+
+# Estas propiedades solo guardan el valor en un atributo, así que las
+# interpolaciones pueden asignarlo directamente sin pasar por el setter.
+pitweener.register_direct_slot(Actor.x, '_x', None, Actor._marcar_caja_modificada)
+pitweener.register_direct_slot(Actor.y, '_y', None, Actor._marcar_caja_modificada)
+pitweener.register_direct_slot(Actor.rotacion, '_rotacion', lambda r: r % 360, Actor._marcar_caja_modificada)
+pitweener.register_direct_slot(Actor.transparencia, '_transparencia')
+pitweener.register_direct_slot(Actor.escala_x, '_escala_x', lambda s: max(s, 0.001), Actor._marcar_caja_modificada)
+pitweener.register_direct_slot(Actor.escala_y, '_escala_y', lambda s: max(s, 0.001), Actor._marcar_caja_modificada)
@@ -8,7 +8,6 @@
 
 
 from pilasengine.actores.animado import Animado
-import copy
 
 
 class Animacion(Animado):
@@ -62,7 +61,7 @@ class Animacion(Animado):
         self.tick = 0
         self.x = x
         self.y = y
-        self.imagen = copy.copy(grilla)
+        self.imagen = self._copiar_grilla(grilla)
         self.definir_cuadro(0)
         self.ciclica = ciclica
         self.definir_velocidad_de_animacion(velocidad)
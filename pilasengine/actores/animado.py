@@ -7,6 +7,7 @@
 # Website - http://www.pilas-engine.com.ar
 
 from pilasengine.actores.actor import Actor
+from pilasengine.imagenes.grilla import Grilla
 import copy
 
 
@@ -41,9 +42,20 @@ class Animado(Actor):
         Actor.__init__(self, pilas, *k, **kv)
 
     def pre_iniciar(self, x=0, y=0, grilla=None):
-        self.imagen = copy.copy(grilla)
+        self.imagen = self._copiar_grilla(grilla)
         self.definir_cuadro(0)
 
+    def _copiar_grilla(self, grilla):
+        """Retorna la imagen propia del actor para mostrar una grilla.
+
+        Las grillas entregan un cursor que comparte sus cuadros, así
+        cada actor solo guarda el cuadro que está mostrando.
+        """
+        if isinstance(grilla, Grilla):
+            return grilla.crear_cursor()
+
+        return copy.copy(grilla)
+
     def definir_cuadro(self, indice):
         """ Permite cambiar el cuadro de animación a mostrar
 
@@ -0,0 +1,164 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import os
+import sys
+import zlib
+import base64
+from array import array
+from xml.etree import cElementTree as ElementTree
+
+# Tiled guarda en los bits mas altos de cada bloque si está espejado
+# o rotado, pilas no usa esa información.
+MASCARA_DE_BLOQUE = 0x1FFFFFFF
+
+# Mapas leídos anteriormente, de la forma {ruta: (mtime, mapa)}.
+_mapas_leidos = {}
+
+
+class MapaTMX(object):
+    """Datos de un archivo .tmx creado con el programa tiled.
+
+    Las capas se guardan en una lista de tuplas (nombre, bloques), donde
+    bloques es un ``array`` con el número de cada bloque, recorriendo el
+    mapa fila por fila.
+    """
+
+    def __init__(self):
+        self.columnas = 0
+        self.filas = 0
+        self.ancho_cuadro = 0
+        self.alto_cuadro = 0
+        self.ruta_imagen = None
+        self.ancho_imagen = 0
+        self.alto_imagen = 0
+        self.capas = []
+
+    def __repr__(self):
+        return "<MapaTMX de %dx%d bloques con %d capas>" % (
+            self.columnas, self.filas, len(self.capas))
+
+
+def cargar(ruta):
+    """Retorna un objeto MapaTMX con los datos de un archivo .tmx
+
+    Los mapas leídos se recuerdan, así que si el archivo no cambió desde
+    la última lectura no se vuelve a interpretar.
+
+    :param ruta: Ruta completa al archivo .tmx
+    """
+    modificacion = os.path.getmtime(ruta)
+
+    if ruta in _mapas_leidos:
+        (modificacion_anterior, mapa) = _mapas_leidos[ruta]
+
+        if modificacion == modificacion_anterior:
+            return mapa
+
+    mapa = leer(ruta)
+    _mapas_leidos[ruta] = (modificacion, mapa)
+    return mapa
+
+
+def vaciar_cache():
+    """Olvida todos los mapas leídos anteriormente."""
+    _mapas_leidos.clear()
+
+
+def leer(ruta):
+    """Lee un archivo .tmx en una sola pasada.
+
+    :param ruta: Ruta completa al archivo .tmx
+    """
+    mapa = MapaTMX()
+    nombre_de_capa = None
+    bloques_xml = None
+    tiene_tileset = False
+
+    for (evento, nodo) in ElementTree.iterparse(ruta, events=('start', 'end')):
+        etiqueta = nodo.tag
+
+        if evento == 'start':
+            if etiqueta == 'map':
+                mapa.columnas = int(nodo.get('width'))
+                mapa.filas = int(nodo.get('height'))
+            elif etiqueta == 'layer':
+                nombre_de_capa = nodo.get('name', '')
+            elif etiqueta == 'data' and not nodo.get('encoding'):
+                bloques_xml = _crear_array_de_bloques()
+            continue
+
+        if etiqueta == 'tileset' and not tiene_tileset:
+            # Solo se utiliza el primer tileset del mapa.
+            tiene_tileset = True
+            imagen = nodo.find('image')
+            mapa.ancho_cuadro = int(nodo.get('tilewidth'))
+            mapa.alto_cuadro = int(nodo.get('tileheight'))
+            mapa.ruta_imagen = imagen.get('source')
+            mapa.ancho_imagen = int(imagen.get('width'))
+            mapa.alto_imagen = int(imagen.get('height'))
+        elif etiqueta == 'tile' and bloques_xml is not None:
+            bloques_xml.append(int(nodo.get('gid', 0)) & MASCARA_DE_BLOQUE)
+        elif etiqueta == 'data':
+            if bloques_xml is not None:
+                bloques = bloques_xml
+                bloques_xml = None
+            else:
+                bloques = _decodificar_bloques(nodo.text or '',
+                                               nodo.get('encoding'),
+                                               nodo.get('compression'))
+
+            mapa.capas.append((nombre_de_capa, bloques))
+            nodo.clear()
+
+    if not mapa.capas:
+        raise Exception("El mapa solicitado no tiene ninguna capa.")
+
+    if not tiene_tileset:
+        raise Exception("El mapa solicitado no tiene ningun tileset.")
+
+    return mapa
+
+
+def _crear_array_de_bloques():
+    # Se necesita un entero sin signo de 4 bytes por bloque.
+    if array('I').itemsize == 4:
+        return array('I')
+    else:
+        return array('L')
+
+
+def _decodificar_bloques(datos, codificacion, compresion):
+    bloques = _crear_array_de_bloques()
+
+    if codificacion == 'csv':
+        bloques.extend(int(x) & MASCARA_DE_BLOQUE
+                       for x in datos.split(',') if x.strip())
+    elif codificacion == 'base64':
+        datos = base64.b64decode(datos.strip())
+
+        if compresion == 'zlib':
+            datos = zlib.decompress(datos)
+        elif compresion == 'gzip':
+            datos = zlib.decompress(datos, 16 + zlib.MAX_WBITS)
+        elif compresion:
+            raise Exception("La compresion '%s' no esta soportada, usa zlib o gzip desde las preferencias de Tiled" % (compresion))
+
+        bloques.fromstring(datos)
+
+        # Tiled guarda los números en formato little-endian.
+        if sys.byteorder == 'big':
+            bloques.byteswap()
+
+        if bloques and max(bloques) > MASCARA_DE_BLOQUE:
+            for (i, bloque) in enumerate(bloques):
+                bloques[i] = bloque & MASCARA_DE_BLOQUE
+    else:
+        raise Exception("La codificacion '%s' no esta soportada, usa CSV o Base64 desde las preferencias de Tiled" % (codificacion))
+
+    return bloques
@@ -0,0 +1,157 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+from operator import add
+from itertools import izip
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+class ConjuntoDeParticulas(object):
+    """Almacena y actualiza todas las partículas de un emisor.
+
+    En lugar de crear un actor por cada partícula, guarda cada atributo
+    (posición, velocidad, escala etc.) en una lista propia, donde el
+    índice ``i`` de cada lista corresponde a la misma partícula. Así cada
+    cuadro se actualiza atributo por atributo, y todas las partículas se
+    dibujan con una sola llamada a ``drawPixmapFragments``.
+    """
+
+    # Nombres de las listas que describen a cada partícula.
+    ATRIBUTOS = ['x', 'y', 'dx', 'dy',
+                 'incremento_dx', 'incremento_dy',
+                 'escala', 'incremento_escala',
+                 'rotacion', 'incremento_rotacion',
+                 'transparencia', 'incremento_transparencia',
+                 'vida_restante']
+
+    def __init__(self):
+        for nombre in self.ATRIBUTOS:
+            setattr(self, nombre, [])
+
+    def __len__(self):
+        return len(self.x)
+
+    def agregar(self, x, y, dx, dy, aceleracion_x, aceleracion_y,
+                escala, escala_fin, rotacion, rotacion_fin,
+                transparencia, transparencia_fin, vida):
+        """Agrega una partícula al conjunto.
+
+        Los valores finales (escala_fin, rotacion_fin etc.) se alcanzan
+        de forma lineal al terminar la vida de la partícula.
+
+        :param vida: La cantidad de segundos que vivirá la partícula.
+        """
+        cuadros = vida * 60.0
+
+        self.x.append(x)
+        self.y.append(y)
+        self.dx.append(dx)
+        self.dy.append(dy)
+        self.incremento_dx.append(aceleracion_x / cuadros)
+        self.incremento_dy.append(aceleracion_y / cuadros)
+        self.escala.append(escala)
+        self.incremento_escala.append((escala_fin - escala) / cuadros)
+        self.rotacion.append(rotacion)
+        self.incremento_rotacion.append((rotacion_fin - rotacion) / cuadros)
+        self.transparencia.append(transparencia)
+        self.incremento_transparencia.append((transparencia_fin - transparencia) / cuadros)
+        self.vida_restante.append(vida * 1000)
+
+    def actualizar(self):
+        """Avanza un cuadro todas las partículas y elimina las que terminaron.
+
+        Retorna la cantidad de partículas eliminadas.
+        """
+        if not self.x:
+            return 0
+
+        self.dx = map(add, self.dx, self.incremento_dx)
+        self.dy = map(add, self.dy, self.incremento_dy)
+        self.x = map(add, self.x, self.dx)
+        self.y = map(add, self.y, self.dy)
+        self.escala = map(add, self.escala, self.incremento_escala)
+        self.rotacion = map(add, self.rotacion, self.incremento_rotacion)
+        self.transparencia = map(add, self.transparencia,
+                                 self.incremento_transparencia)
+
+        # Cada cuadro equivale a 16 milisegundos.
+        self.vida_restante = [v - 16 for v in self.vida_restante]
+
+        if min(self.vida_restante) >= 0:
+            return 0
+
+        return self._eliminar_particulas_terminadas()
+
+    def _eliminar_particulas_terminadas(self):
+        cantidad_anterior = len(self.x)
+        vivas = [i for (i, v) in enumerate(self.vida_restante) if v >= 0]
+
+        for nombre in self.ATRIBUTOS:
+            lista = getattr(self, nombre)
+            setattr(self, nombre, [lista[i] for i in vivas])
+
+        return cantidad_anterior - len(vivas)
+
+    def limpiar(self):
+        for nombre in self.ATRIBUTOS:
+            setattr(self, nombre, [])
+
+    def dibujar(self, painter, grilla, dx, dy):
+        """Dibuja todas las partículas usando un cuadro de la grilla.
+
+        :param painter: El painter de Qt donde dibujar.
+        :param grilla: La imagen o grilla de las partículas.
+        :param dx: Desplazamiento horizontal de la cámara.
+        :param dy: Desplazamiento vertical de la cámara.
+        """
+        if not self.x:
+            return
+
+        pixmap = grilla._imagen
+        ancho, alto = grilla.ancho(), grilla.alto()
+
+        # Si la imagen está en un atlas, _imagen es la página completa y
+        # el cuadro se desplaza según la posición de la imagen en ella.
+        origen_x, origen_y = grilla.obtener_origen()
+        origen_x += getattr(grilla, 'dx', 0)
+        origen_y += getattr(grilla, 'dy', 0)
+
+        if not hasattr(painter, 'drawPixmapFragments'):
+            self._dibujar_una_por_una(painter, pixmap, origen_x, origen_y,
+                                      ancho, alto, dx, dy)
+            return
+
+        rectangulo = QtCore.QRectF(origen_x, origen_y, ancho, alto)
+        crear = QtGui.QPainter.PixmapFragment.create
+        punto = QtCore.QPointF
+
+        fragmentos = [crear(punto(x - dx, dy - y), rectangulo,
+                            max(escala, 0.001), max(escala, 0.001),
+                            -rotacion, 1 - transparencia / 100.0)
+                      for (x, y, escala, rotacion, transparencia)
+                      in izip(self.x, self.y, self.escala, self.rotacion,
+                              self.transparencia)]
+
+        painter.drawPixmapFragments(fragmentos, pixmap)
+
+    def _dibujar_una_por_una(self, painter, pixmap, origen_x, origen_y,
+                             ancho, alto, dx, dy):
+        # Versiones de Qt anteriores a la 4.7 no tienen drawPixmapFragments.
+        for (x, y, escala, rotacion, transparencia) in izip(
+                self.x, self.y, self.escala, self.rotacion,
+                self.transparencia):
+            painter.save()
+            painter.translate(x - dx, dy - y)
+            painter.rotate(-rotacion)
+            painter.scale(max(escala, 0.001), max(escala, 0.001))
+            painter.setOpacity(1 - transparencia / 100.0)
+            painter.drawPixmap(-ancho / 2, -alto / 2, pixmap, origen_x,
+                               origen_y, ancho, alto)
+            painter.restore()
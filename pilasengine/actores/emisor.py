@@ -7,10 +7,14 @@
 # Website - http://www.pilas-engine.com.ar
 
 from pilasengine.actores.actor import Actor
+from pilasengine.actores.conjunto_de_particulas import ConjuntoDeParticulas
 import random
 
 class Emisor(Actor):
-    """
+    """Genera partículas de forma constante, por ejemplo para hacer humo.
+
+    Las partículas no son actores, el emisor las guarda en un
+    ConjuntoDeParticulas que las actualiza y dibuja todas juntas.
     """
 
     def pre_iniciar(self, x=0, y=0):
@@ -20,6 +24,7 @@ class Emisor(Actor):
         self.imagen_particula = self.pilas.imagenes.cargar_grilla("particula.png")
 
         self._contador_frecuencia_creacion = 0
+        self._particulas = ConjuntoDeParticulas()
         self.frecuencia_creacion = 0.1
         self.particulas_vivas = 0
 
@@ -86,37 +91,49 @@ class Emisor(Actor):
             self._contador_frecuencia_creacion -= self.frecuencia_creacion
             self.crear_particula()
 
+        self.particulas_vivas -= self._particulas.actualizar()
+
+    def dibujar(self, painter):
+        if not self.fijo:
+            dx = self.pilas.obtener_escena_actual().camara.x
+            dy = self.pilas.obtener_escena_actual().camara.y
+        else:
+            dx = 0
+            dy = 0
+
+        painter.save()
+
+        if self._composicion:
+            painter.setCompositionMode(self._composicion)
+
+        self._particulas.dibujar(painter, self.imagen_particula, dx, dy)
+        painter.restore()
+
+        Actor.dibujar(self, painter)
+
     def crear_particula(self):
         dx = self.rango(self.dx_min, self.dx_max) / 5.0
         dy = self.rango(self.dy_min, self.dy_max) / 5.0
-        d_escala = self.rango(self.escala_min, self.escala_max)
-        d_rotacion = self.rango(self.rotacion_min, self.rotacion_max)
+        d_escala = max(self.rango(self.escala_min, self.escala_max), 0.001)
+        d_rotacion = self.rango(self.rotacion_min, self.rotacion_max) % 360
         d_transparencia = self.rango(self.transparencia_min, self.transparencia_max)
         d_x = self.rango(self.x_min, self.x_max)
         d_y = self.rango(self.y_min, self.y_max)
 
-        p = self.pilas.actores.Particula(self,
-                                         self.x + d_x, self.y + d_y,
-                                         dx=dx, dy=dy,
-                                         imagen=self.imagen_particula,
-                                         vida=self.vida)
-
-        p.transparencia = d_transparencia
-        p.escala = d_escala
-        p.rotacion = d_rotacion
-        p.composicion = self._composicion
-
-        p.escala_fin = self.rango(self.escala_fin_min, self.escala_fin_max)
-        p.transparencia_fin = self.rango(self.transparencia_fin_min, self.transparencia_fin_max)
-        p.rotacion_fin = self.rango(self.rotacion_fin_min, self.rotacion_fin_max)
-
-        p.aceleracion_x = self.rango(self.aceleracion_x_min, self.aceleracion_x_max)
-        p.aceleracion_y = self.rango(self.aceleracion_y_min, self.aceleracion_y_max)
-
+        self._particulas.agregar(
+            self.x + d_x, self.y + d_y, dx, dy,
+            aceleracion_x=self.rango(self.aceleracion_x_min, self.aceleracion_x_max),
+            aceleracion_y=self.rango(self.aceleracion_y_min, self.aceleracion_y_max),
+            escala=d_escala,
+            escala_fin=self.rango(self.escala_fin_min, self.escala_fin_max),
+            rotacion=d_rotacion,
+            rotacion_fin=self.rango(self.rotacion_fin_min, self.rotacion_fin_max),
+            transparencia=d_transparencia,
+            transparencia_fin=self.rango(self.transparencia_fin_min, self.transparencia_fin_max),
+            vida=self.vida)
 
         self.particulas_vivas += 1
 
-
     def rango(self, minimo, maximo):
         if minimo < maximo:
             return self.rand_float_range(minimo, maximo)
@@ -6,6 +6,7 @@
 #
 # Website - http://www.pilas-engine.com.ar
 
+import bisect
 import collections
 from pilasengine.actores.actor import Actor
 
@@ -27,12 +28,36 @@ class Grupo(collections.MutableSequence):
 
     """
 
-    def __init__(self, pilas):
+    def __init__(self, pilas, ordenado=False):
         self.__dict__['pilas'] = pilas
         self.__dict__['_actores'] = []
         self.pilas.log("Creando el grupo", self)
         self.__dict__['etiquetas'] = AgrupadorEtiquetas(self)
 
+        # Un grupo ordenado mantiene a sus actores en orden de dibujado
+        # (ver _obtener_clave). En _claves guarda la clave de cada actor
+        # en la misma posición que en _actores, así cada actor se puede
+        # ubicar o reubicar con una búsqueda binaria.
+        self.__dict__['_ordenado'] = ordenado
+        self.__dict__['_claves'] = []
+        self.__dict__['_clave_por_actor'] = {}
+        self.__dict__['_numero_de_orden'] = 0
+        self.__dict__['_ordenar_por_y'] = False
+
+        # Listas de actores filtradas (ver iterar_actores), de la forma
+        # {(fijos, sin_padre): lista}. Se descartan cada vez que cambia
+        # el contenido o el orden del grupo.
+        self.__dict__['_listas_filtradas'] = {}
+
+        # En los grupos sin orden, los ids de sus actores. Permite saber
+        # si un actor está en el grupo sin recorrer la lista.
+        self.__dict__['_miembros'] = set()
+
+        # Ids de los actores eliminados que todavía siguen en la lista
+        # _actores. Se quitan todos juntos en _compactar, así eliminar
+        # muchos actores en el mismo cuadro recorre la lista una sola vez.
+        self.__dict__['_eliminados'] = set()
+
     def __setattr__(self, atributo, valor):
         """Este metodo es llamado cuando queremos modificar algun atributo de
         los actores, por ejemplo:
@@ -54,38 +79,202 @@ class Grupo(collections.MutableSequence):
         Todos los actores dentro del grupo tratan de ejecutar el metodo 'decir'
          """
         def map_a_todos(*args, **kwargs):
-            for actor in self._actores:
+            for actor in self.iterar_actores():
                 funcion = getattr(actor, atributo)
                 funcion(*args, **kwargs)
 
         return map_a_todos
 
     def obtener_cantidad_de_actores(self):
-        return len(self._actores)
+        return len(self._actores) - len(self._eliminados)
+
+    def __iter__(self):
+        return iter(self.iterar_actores())
 
     def __setitem__(self, key, item):
-        self._actores[key] = item
+        if self._ordenado:
+            del self[key]
+            self._insertar_en_orden(item)
+        else:
+            self._compactar()
+            self._miembros.discard(id(self._actores[key]))
+            self._actores[key] = item
+            self._miembros.add(id(item))
+            self._invalidar_listas_filtradas()
 
     def __getitem__(self, key):
+        self._compactar()
         return self._actores[key]
 
     def __delitem__(self, key):
+        self._compactar()
+        quitados = self._actores[key] if isinstance(key, slice) else [self._actores[key]]
+
+        if self._ordenado:
+            for actor in quitados:
+                del self._clave_por_actor[id(actor)]
+
+            del self._claves[key]
+        else:
+            for actor in quitados:
+                self._miembros.discard(id(actor))
+
         del self._actores[key]
+        self._invalidar_listas_filtradas()
 
     def __len__(self):
-        return len(self._actores)
+        return self.obtener_cantidad_de_actores()
 
     def insert(self, i, key):
-        self._actores.insert(i, key)
+        if self._ordenado:
+            # La posición depende del atributo z, no del índice.
+            self._insertar_en_orden(key)
+        else:
+            self._compactar()
+            self._actores.insert(i, key)
+            self._miembros.add(id(key))
+            self._invalidar_listas_filtradas()
 
     def sort(self):
-        self._actores.sort()
+        if self._ordenado:
+            self._reconstruir_orden()
+        else:
+            self._compactar()
+            self._actores.sort()
+            self._invalidar_listas_filtradas()
+
+    def _obtener_clave(self, actor, numero_de_orden):
+        """Retorna la clave que define el orden de dibujado de un actor.
+
+        Los actores con z mas grande se dibujan primero (mas lejos de la
+        cámara). A igual z, si se ordena por y se dibujan primero los
+        actores que están mas arriba, y sino el que se agregó primero.
+        """
+        if self._ordenar_por_y:
+            return (-actor._z, -actor._y, numero_de_orden)
+        else:
+            return (-actor._z, 0, numero_de_orden)
+
+    def _insertar_en_orden(self, actor):
+        self.__dict__['_numero_de_orden'] += 1
+        clave = self._obtener_clave(actor, self._numero_de_orden)
+        indice = bisect.bisect(self._claves, clave)
+        self._claves.insert(indice, clave)
+        self._actores.insert(indice, actor)
+        self._clave_por_actor[id(actor)] = clave
+        self._invalidar_listas_filtradas()
+
+    def _quitar_en_orden(self, actor):
+        clave = self._clave_por_actor.pop(id(actor))
+        indice = bisect.bisect_left(self._claves, clave)
+        del self._claves[indice]
+        del self._actores[indice]
+        self._invalidar_listas_filtradas()
+        return clave
+
+    def reubicar(self, actor):
+        """Actualiza la posición de un actor luego de cambiar su atributo z.
+
+        Solo tiene efecto en los grupos ordenados, como el grupo de
+        actores de cada escena.
+        """
+        if not self._ordenado:
+            return
+
+        clave = self._clave_por_actor.get(id(actor))
+
+        if clave is None or clave == self._obtener_clave(actor, clave[2]):
+            return
+
+        self._quitar_en_orden(actor)
+        clave = self._obtener_clave(actor, clave[2])
+        indice = bisect.bisect(self._claves, clave)
+        self._claves.insert(indice, clave)
+        self._actores.insert(indice, actor)
+        self._clave_por_actor[id(actor)] = clave
+
+    def definir_orden_por_y(self, estado=True):
+        """Hace que los actores con igual z se dibujen según su posición vertical.
+
+        Es útil en juegos vistos desde arriba o isométricos, donde los
+        personajes que están mas abajo en la pantalla tienen que verse
+        por delante de los que están mas arriba.
+        """
+        self.__dict__['_ordenar_por_y'] = estado
+        self._reconstruir_orden()
+
+    def actualizar_orden_por_y(self):
+        """Reubica a los actores que se movieron verticalmente."""
+        if not self._ordenar_por_y:
+            return
+
+        self._compactar()
+
+        for actor in [x for x in self._actores
+                      if self._clave_por_actor[id(x)][1] != -x._y]:
+            self.reubicar(actor)
+
+    def _reconstruir_orden(self):
+        if not self._ordenado:
+            return
+
+        self._compactar()
+        claves = [(self._obtener_clave(x, self._clave_por_actor[id(x)][2]), x)
+                  for x in self._actores]
+        claves.sort(key=lambda par: par[0])
+        self.__dict__['_claves'] = [clave for (clave, _) in claves]
+        self.__dict__['_actores'] = [actor for (_, actor) in claves]
+        self.__dict__['_clave_por_actor'] = dict((id(actor), clave)
+                                                 for (clave, actor) in claves)
+        self._invalidar_listas_filtradas()
+
+    def _contiene(self, actor):
+        if self._ordenado:
+            return id(actor) in self._clave_por_actor
+        else:
+            return id(actor) in self._miembros
+
+    def _compactar(self):
+        """Quita de la lista a todos los actores eliminados.
+
+        Se llama antes de leer la lista, así que si se eliminan muchos
+        actores juntos (por ejemplo al terminar una oleada de enemigos)
+        la lista se recorre una sola vez.
+        """
+        eliminados = self._eliminados
+
+        if not eliminados:
+            return
+
+        if self._ordenado:
+            quedan = [i for (i, x) in enumerate(self._actores)
+                      if id(x) not in eliminados]
+            self.__dict__['_claves'] = [self._claves[i] for i in quedan]
+            self.__dict__['_actores'] = [self._actores[i] for i in quedan]
+        else:
+            self.__dict__['_actores'] = [x for x in self._actores
+                                         if id(x) not in eliminados]
+
+        eliminados.clear()
 
     def eliminar(self, actor):
-        """Agrega el actor a una lista para eliminarlo mas tarde."""
+        """Quita al actor del grupo.
+
+        El actor deja de pertenecer al grupo inmediatamente, pero se
+        quita de la lista interna recién cuando se vuelve a consultar
+        (ver _compactar).
+        """
+
+        if self._contiene(actor):
+            if self._ordenado:
+                del self._clave_por_actor[id(actor)]
+            else:
+                self._miembros.discard(id(actor))
 
-        if actor in self._actores:
-            self._actores.remove(actor)
+            # Mientras el actor siga en la lista su id no se puede
+            # reutilizar, porque la lista mantiene una referencia a él.
+            self._eliminados.add(id(actor))
+            self._invalidar_listas_filtradas()
             actor.eliminar_del_grupo(self)
             self.pilas.log("Eliminando el actor", actor, "del grupo", self)
         else:
@@ -102,9 +291,21 @@ class Grupo(collections.MutableSequence):
 
             return
 
-        if actor not in self._actores:
+        if not self._contiene(actor):
             self.pilas.log("Agregando el actor", actor, "al grupo", self)
-            self._actores.append(actor)
+
+            if id(actor) in self._eliminados:
+                # El actor se eliminó y se vuelve a agregar antes de
+                # compactar, así que hay que sacar la copia anterior.
+                self._compactar()
+
+            if self._ordenado:
+                self._insertar_en_orden(actor)
+            else:
+                self._actores.append(actor)
+                self._miembros.add(id(actor))
+                self._invalidar_listas_filtradas()
+
             self.pilas.log("Haciendo que el actor", actor,
                            "tenga una referencia al", self)
             actor.agregar_al_grupo(self)
@@ -119,20 +320,49 @@ class Grupo(collections.MutableSequence):
         especifica True solo se retornan los actores fijos, en cambio
         con False se retornan los actores normales.
         """
-        if fijos in [True, False]:
-            if sin_padre:
-                return [x for x in self._actores if x.fijo == fijos and not x.padre]
+        return list(self.iterar_actores(fijos, sin_padre))
+
+    def iterar_actores(self, fijos=None, sin_padre=False):
+        """Retorna los actores del grupo sin hacer una copia.
+
+        Acepta los mismos argumentos que ``obtener_actores``, pero la
+        lista se comparte entre todas las llamadas hasta que el grupo
+        cambia, así que no se tiene que modificar. Si se agregan o
+        eliminan actores mientras se recorre, el recorrido continúa
+        sobre la lista anterior.
+        """
+        clave = (fijos, sin_padre)
+        lista = self._listas_filtradas.get(clave)
+
+        if lista is None:
+            self._compactar()
+
+            if fijos in [True, False]:
+                if sin_padre:
+                    lista = [x for x in self._actores if x.fijo == fijos and not x.padre]
+                else:
+                    lista = [x for x in self._actores if x.fijo == fijos]
             else:
-                return [x for x in self._actores if x.fijo == fijos]
-        else:
-            return list(self._actores)
+                lista = list(self._actores)
+
+            self._listas_filtradas[clave] = lista
+
+        return lista
+
+    def cambia_estado_de_actor(self, actor):
+        """Se llama cuando cambian los atributos fijo o padre de un actor."""
+        self._invalidar_listas_filtradas()
+
+    def _invalidar_listas_filtradas(self):
+        if self._listas_filtradas:
+            self._listas_filtradas.clear()
 
     def _obtener_valor_de(self, atributo):
         return [(actor.__class__.__name__, getattr(actor, atributo))
-                for actor in self._actores]
+                for actor in self.iterar_actores()]
 
     def _definir_valor_de(self, atributo, valor):
-        for actor in self._actores:
+        for actor in self.iterar_actores():
             setattr(actor, atributo, valor)
 
     def _obtener_espejado(self):
@@ -262,7 +492,7 @@ class Grupo(collections.MutableSequence):
                       y el centro de coordenadas del mundo.")
 
     def aprender(self, habilidad, *k, **kw):
-        for actor in self._actores:
+        for actor in self.iterar_actores():
             actor.aprender(habilidad, *k, **kw)
 
     def __repr__(self):
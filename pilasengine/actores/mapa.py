@@ -15,12 +15,12 @@ class Mapa(Actor):
 
     def pre_iniciar(self, x=0, y=0, grilla=None, filas=20, columnas=20,
                 densidad=1.0, restitucion=0.56, friccion=10.5,
-                amortiguacion=0.1):
+                amortiguacion=0.1, unir_bloques_solidos=True):
         pass
 
     def iniciar(self, x=0, y=0, grilla=None, filas=20, columnas=20,
                 densidad=1.0, restitucion=0.56, friccion=10.5,
-                amortiguacion=0.1):
+                amortiguacion=0.1, unir_bloques_solidos=True):
         """Inicializa el mapa.
 
         :param grilla: La imagen a utilizar cómo grilla con los bloques del escenario.
@@ -32,6 +32,7 @@ class Mapa(Actor):
         :param restitucion: La restitucion de la física de los bloques solidos.
         :param friccion: La friccion de la física de los bloques solidos.
         :param amortiguacion: La amortiguacion de la física de los bloques solidos.
+        :param unir_bloques_solidos: Si es True los bloques solidos vecinos se agrupan en pocas figuras rectangulares, si es False se crea una figura por cada bloque.
         """
         self.x = x
         self.y = y
@@ -42,6 +43,7 @@ class Mapa(Actor):
         self.restitucion = restitucion
         self.friccion = friccion
         self.amortiguacion = amortiguacion
+        self.unir_bloques_solidos = unir_bloques_solidos
 
         self.filas = filas
         self.columnas = columnas
@@ -49,22 +51,58 @@ class Mapa(Actor):
         # Genera una matriz indicando cuales de los bloque son solidos.
         self.matriz_de_bloques = self._generar_matriz_de_bloques(filas, columnas)
 
+        # Bloques que alguna vez se pintaron como sólidos, y por lo tanto
+        # llevan figura física (aunque luego se pinte otra capa encima).
+        self._bloques_con_figura = self._generar_matriz_de_bloques(filas, columnas)
+
         if not grilla:
             grilla = self.pilas.imagenes.cargar_grilla("grillas/plataformas_10_10.png", 10, 10)
 
         self.grilla = grilla
-        self.superficie = self.pilas.imagenes.cargar_superficie(columnas * self.grilla.cuadro_ancho, filas * self.grilla.cuadro_alto)
+        # El mapa se dibuja por partes, así los mapas grandes no
+        # necesitan una sola imagen gigante en memoria.
+        self.superficie = self.pilas.imagenes.crear_superficie_por_partes(columnas * self.grilla.cuadro_ancho, filas * self.grilla.cuadro_alto)
         self.imagen = self.superficie
         self.centro_mapa_x, self.centro_mapa_y = self.superficie.centro()
 
         self.fijo = False
         self.actores_con_figuras_solidas = []
 
+        # Indica que cambió algún bloque sólido y hay que volver a
+        # generar las figuras físicas del mapa.
+        self._figuras_solidas_pendientes = False
+
     def definir_figura_de_colision(self, figura):
         pass
 
     def actualizar(self):
-        pass
+        if self._figuras_solidas_pendientes:
+            self.construir_figuras_solidas()
+
+    def dibujar(self, painter):
+        self._actualizar_area_visible()
+        Actor.dibujar(self, painter)
+
+    def _actualizar_area_visible(self):
+        """Le indica a la superficie que parte del mapa muestra la cámara."""
+        if self.rotacion or self.escala_x != 1 or self.escala_y != 1:
+            # Con transformaciones el cálculo no es directo, así que
+            # se dibujan todas las partes.
+            self.superficie.olvidar_area_visible()
+            return
+
+        if self.fijo:
+            ancho, alto = self.pilas.widget.obtener_area()
+            izquierda, arriba = -ancho / 2, alto / 2
+        else:
+            camara = self.pilas.obtener_escena_actual().camara
+            izquierda, derecha, arriba, abajo = camara.obtener_area_visible()
+            ancho, alto = derecha - izquierda, arriba - abajo
+
+        # El área de la cámara se redondea, así que se agrega un
+        # pixel de margen en cada borde.
+        x, y = self.convertir_de_coordenada_absoluta_a_coordenada_mapa(izquierda, arriba)
+        self.superficie.definir_area_visible(x - 1, y - 1, ancho + 2, alto + 2)
 
     def terminar(self):
         pass
@@ -100,16 +138,115 @@ class Mapa(Actor):
         y = fila * alto
 
         if es_bloque_solido:
-            dx = self.ancho / 2
-            dy = self.alto / 2
-            nuevo_x = self.x + x - dx + alto/2
-            nuevo_y = self.y - y + dy - ancho/2
-            #actor = self.pilas.actores.Actor(nuevo_x, nuevo_y)
-            #actor.imagen = "invisible.png"
-            Rectangulo = self.pilas.fisica.Rectangulo
-            #actor.figura_de_colision = Rectangulo(nuevo_x, nuevo_y,
-            figura_de_colision = Rectangulo(nuevo_x, nuevo_y,
-                                        ancho, alto, 
+            if self.unir_bloques_solidos:
+                # Las figuras se generan juntas en la siguiente actualización,
+                # así se pueden pintar muchos bloques seguidos sin costo extra.
+                self._bloques_con_figura[fila][columna] = True
+                self._figuras_solidas_pendientes = True
+            else:
+                self._crear_figura_solida(x, y, ancho, alto)
+
+        #(dx, dy) = pilas.mundo.motor.centro_fisico()
+        #actor = pilas.actores.Actor(x=x-dx+(ancho/2), y=dy-y-(alto/2))
+
+        #actor.imagen = self.grilla.obtener_imagen_cuadro()
+        self.grilla.dibujarse_sobre_una_pizarra(self.superficie, x, y)
+
+    def construir_figuras_solidas(self):
+        """Genera las figuras físicas de todos los bloques sólidos del mapa.
+
+        Cuando ``unir_bloques_solidos`` está habilitado, los bloques
+        sólidos vecinos se agrupan en rectángulos lo mas grandes posible,
+        así el motor de física trabaja con muchas menos figuras que
+        bloques tiene el mapa.
+
+        Este método se llama automáticamente, pero se puede invocar
+        para que las figuras estén disponibles de inmediato.
+        """
+        self._figuras_solidas_pendientes = False
+
+        if not self.unir_bloques_solidos:
+            return
+
+        for figura in self.actores_con_figuras_solidas:
+            figura.eliminar()
+
+        self.actores_con_figuras_solidas = []
+
+        ancho = self.grilla.cuadro_ancho
+        alto = self.grilla.cuadro_alto
+
+        for (fila, columna, filas, columnas) in self._obtener_rectangulos_solidos():
+            self._crear_figura_solida(columna * ancho, fila * alto,
+                                      columnas * ancho, filas * alto)
+
+    def _obtener_rectangulos_solidos(self):
+        """Agrupa los bloques sólidos en rectángulos que no se superponen.
+
+        Recorre la matriz fila por fila: cada bloque sólido que todavía no
+        pertenece a un rectángulo se extiende primero hacia la derecha y
+        luego hacia abajo, mientras todos los bloques abarcados sean
+        sólidos y estén libres.
+
+        Retorna una lista de tuplas (fila, columna, filas, columnas).
+        """
+        matriz = self._bloques_con_figura
+        usados = self._generar_matriz_de_bloques(self.filas, self.columnas)
+        rectangulos = []
+
+        for fila in range(self.filas):
+            for columna in range(self.columnas):
+                if not matriz[fila][columna] or usados[fila][columna]:
+                    continue
+
+                columna_final = columna + 1
+
+                while (columna_final < self.columnas and
+                       matriz[fila][columna_final] and
+                       not usados[fila][columna_final]):
+                    columna_final += 1
+
+                fila_final = fila + 1
+
+                while fila_final < self.filas and self._es_tramo_solido_libre(
+                        usados, fila_final, columna, columna_final):
+                    fila_final += 1
+
+                for f in range(fila, fila_final):
+                    for c in range(columna, columna_final):
+                        usados[f][c] = True
+
+                rectangulos.append((fila, columna, fila_final - fila,
+                                    columna_final - columna))
+
+        return rectangulos
+
+    def _es_tramo_solido_libre(self, usados, fila, columna_inicial, columna_final):
+        bloques = self._bloques_con_figura[fila]
+        ocupados = usados[fila]
+
+        for columna in range(columna_inicial, columna_final):
+            if not bloques[columna] or ocupados[columna]:
+                return False
+
+        return True
+
+    def _crear_figura_solida(self, x, y, ancho, alto):
+        """Crea una figura estática sobre un área del mapa.
+
+        :param x: Posición horizontal del área, en pixels relativos al mapa.
+        :param y: Posición vertical del área, en pixels relativos al mapa.
+        :param ancho: Ancho del área en pixels.
+        :param alto: Alto del área en pixels.
+        """
+        dx = self.ancho / 2
+        dy = self.alto / 2
+        nuevo_x = self.x + x - dx + ancho / 2.0
+        nuevo_y = self.y - y + dy - alto / 2.0
+
+        Rectangulo = self.pilas.fisica.Rectangulo
+        figura_de_colision = Rectangulo(nuevo_x, nuevo_y,
+                                        ancho, alto,
                                         densidad=self.densidad,
                                         restitucion=self.restitucion,
                                         friccion=self.friccion,
@@ -117,13 +254,7 @@ class Mapa(Actor):
                                         plataforma=True  # Optimizacion
                                         )
 
-            self.actores_con_figuras_solidas.append(figura_de_colision)
-
-        #(dx, dy) = pilas.mundo.motor.centro_fisico()
-        #actor = pilas.actores.Actor(x=x-dx+(ancho/2), y=dy-y-(alto/2))
-
-        #actor.imagen = self.grilla.obtener_imagen_cuadro()
-        self.grilla.dibujarse_sobre_una_pizarra(self.superficie, x, y)
+        self.actores_con_figuras_solidas.append(figura_de_colision)
 
     def pintar_limite_de_bloques(self):
         """Dibuja los bordes de cada bloque."""
@@ -159,9 +290,6 @@ class Mapa(Actor):
         :param maximo: Cantidad máxima de pixels a leer.
         """
 
-        # TODO: se puede hacer mas eficiente el algoritmo si en lugar
-        #       de recorrer desde 0 a maximo solamente se recorre dando
-        #       saltos por bloques (de 'self.grilla.cuadro_alto' pixels)
         try:
             x, y = self.convertir_de_coordenada_absoluta_a_coordenada_mapa(x, y)
 
@@ -169,24 +297,112 @@ class Mapa(Actor):
             # del mapa.
             resto = int(y % self.grilla.cuadro_alto)
 
-            if not resto and self.es_punto_solido_coordenada_mapa(x, y):
-                return 0
-
-            # Es la distancia en pixels a la siguiente fila que se
-            # tiene que evaluar.
-            inicial = self.grilla.cuadro_alto - resto
+            # El bloque que contiene al punto solo cuenta como suelo si
+            # el punto está justo en su borde superior, así que el rayo
+            # comienza en el borde de la fila siguiente.
+            if resto:
+                inicial = self.grilla.cuadro_alto - resto
+            else:
+                inicial = 0
 
-            # Recorre el escenario hacia abajo, saltando por las filas
-            # del mapa. Si encuentra un suelo se detiene y retorna la
-            # cantidad de pixels que recorrió.
-            for distancia in range(inicial, maximo, self.grilla.cuadro_alto):
-                if self.es_punto_solido_coordenada_mapa(x, y+distancia):
-                    return distancia
+            if inicial >= maximo:
+                return maximo
 
+            distancia = inicial + self._lanzar_rayo_en_coordenadas_mapa(
+                x, y + inicial, 0, 1, maximo - inicial)
         except Exception:
             return maximo
 
-        return maximo
+        return int(min(distancia, maximo))
+
+    def lanzar_rayo(self, x, y, dx, dy, maximo):
+        """Retorna la distancia en pixels hasta el primer bloque sólido en una dirección.
+
+        El rayo avanza de bloque en bloque (usando el algoritmo de
+        Amanatides y Woo), así que el costo depende de la cantidad de
+        bloques que atraviesa y no de la cantidad de pixels.
+
+        Si el punto inicial está sobre un bloque sólido retorna 0, y si
+        no encuentra ningún bloque a menos de 'maximo' pixels retorna
+        'maximo'. Todo lo que está fuera del mapa se considera sólido.
+
+        :param x: Posición horizontal del origen, en coordenadas del mundo.
+        :param y: Posición vertical del origen, en coordenadas del mundo.
+        :param dx: Componente horizontal de la dirección del rayo.
+        :param dy: Componente vertical de la dirección del rayo.
+        :param maximo: Largo máximo del rayo en pixels.
+        """
+        x, y = self.convertir_de_coordenada_absoluta_a_coordenada_mapa(x, y)
+
+        # En las coordenadas del mapa el eje vertical crece hacia abajo.
+        return self._lanzar_rayo_en_coordenadas_mapa(x, y, dx, -dy, maximo)
+
+    def _lanzar_rayo_en_coordenadas_mapa(self, x, y, dx, dy, maximo):
+        largo = math.hypot(dx, dy)
+
+        if not largo:
+            raise ValueError("La direccion del rayo no puede ser (0, 0).")
+
+        dx /= float(largo)
+        dy /= float(largo)
+
+        ancho = self.grilla.cuadro_ancho
+        alto = self.grilla.cuadro_alto
+        matriz = self.matriz_de_bloques
+        filas = self.filas
+        columnas = self.columnas
+
+        columna = self._convertir_en_int(x / float(ancho))
+        fila = self._convertir_en_int(y / float(alto))
+
+        if not (0 <= fila < filas and 0 <= columna < columnas) or matriz[fila][columna]:
+            return 0
+
+        infinito = float('inf')
+
+        # 'siguiente_x' e 'siguiente_y' son las distancias sobre el rayo
+        # hasta el próximo borde vertical y horizontal de la grilla, y
+        # 'delta_x' y 'delta_y' lo que se recorre para cruzar un bloque
+        # completo en cada eje.
+        if dx > 0:
+            paso_x = 1
+            siguiente_x = ((columna + 1) * ancho - x) / dx
+            delta_x = ancho / dx
+        elif dx < 0:
+            paso_x = -1
+            siguiente_x = (columna * ancho - x) / dx
+            delta_x = -ancho / dx
+        else:
+            paso_x = 0
+            siguiente_x = delta_x = infinito
+
+        if dy > 0:
+            paso_y = 1
+            siguiente_y = ((fila + 1) * alto - y) / dy
+            delta_y = alto / dy
+        elif dy < 0:
+            paso_y = -1
+            siguiente_y = (fila * alto - y) / dy
+            delta_y = -alto / dy
+        else:
+            paso_y = 0
+            siguiente_y = delta_y = infinito
+
+        while True:
+            if siguiente_x < siguiente_y:
+                distancia = siguiente_x
+                siguiente_x += delta_x
+                columna += paso_x
+            else:
+                distancia = siguiente_y
+                siguiente_y += delta_y
+                fila += paso_y
+
+            if distancia >= maximo:
+                return maximo
+
+            if not (0 <= fila < filas and 0 <= columna < columnas) or matriz[fila][columna]:
+                return distancia
 
     def es_bloque_solido(self, fila, columna):
         """Indica si un determinado bloque es solido.
@@ -275,4 +491,5 @@ class Mapa(Actor):
             x.eliminar()
 
         self.actores_con_figuras_solidas = []
+        self._figuras_solidas_pendientes = False
         self.pilas.fisica.iterar()
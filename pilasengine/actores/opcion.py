@@ -26,7 +26,10 @@ class Opcion(Texto):
         :param argumentos: Argumentos posicionales para :funcion_a_invocar:
         :param fuente: Tipografía a utilizar.
         """
-        Texto.__init__(self, pilas, texto, x=x, y=y, fuente=fuente)
+        # Al resaltar la opción se cambia de color, así que se reutilizan
+        # las imagenes de ambos colores.
+        Texto.__init__(self, pilas, texto, x=x, y=y, fuente=fuente,
+                       usar_cache=True)
         self.magnitud = 20
         self.funcion_a_invocar = funcion_a_invocar
         self.argumentos = argumentos
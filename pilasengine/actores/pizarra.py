@@ -51,6 +51,17 @@ class Pizarra(Actor):
         x, y = self.obtener_coordenada_fisica(x, y)
         self.imagen.dibujar_punto(x, y, color=color)
 
+    def lote(self):
+        """Permite dibujar muchas cosas seguidas de forma mas rápida.
+
+        Por ejemplo:
+
+            >>> with pizarra.lote():
+            ...     for x in range(-300, 300, 10):
+            ...         pizarra.linea(x, -100, x, 100)
+        """
+        return self.imagen.lote()
+
     def obtener_coordenada_fisica(self, x, y):
         """Convierte las coordenadas de pantalla a coordenadas físicas.
 
@@ -21,7 +21,9 @@ class Puntaje(Texto):
         :param y: Posición vertical para el puntaje.
         :param color: Color que tendrá el texto de puntaje.
         """
-        Texto.__init__(self, pilas, str(texto), x=x, y=y)
+        # El puntaje suele cambiar muy seguido, así que se dibuja con
+        # un atlas de caracteres para no generar una imagen por cambio.
+        Texto.__init__(self, pilas, str(texto), x=x, y=y, usar_atlas=True)
         self.color = color
         self.valor = int(texto)
 
@@ -27,7 +27,7 @@ class Temporizador(Actor):
     def iniciar(self, x=0, y=0):
         """Inicia el contador de tiempo con la función indicada."""
         self.imagen = "invisible.png"
-        self.texto = self.pilas.actores.Texto("0")
+        self.texto = self.pilas.actores.Texto("0", usar_atlas=True)
         
         self.tiempo = -1
         self.tiempo_inicial = None
@@ -13,7 +13,8 @@ from pilasengine.colores import blanco
 class Texto(Actor):
 
     def __init__(self, pilas, texto="Sin texto", magnitud=20, vertical=False,
-                 fuente=None, fijo=True, ancho=0, x=0, y=0):
+                 fuente=None, fijo=True, ancho=0, x=0, y=0, usar_atlas=False,
+                 usar_cache=False):
         """Inicializa el actor.
 
         :param texto: Texto a mostrar.
@@ -25,12 +26,20 @@ class Texto(Actor):
                      la camara. Por defecto está fijo.
         :param ancho: El limite horizontal en pixeles para la cadena, el texto
                       se mostrara en varias lineas si no cabe en este límite.
+        :param usar_atlas: Dibuja el texto copiando caracteres desde un atlas
+                           compartido. Cambiar el texto es mucho mas rápido,
+                           así que es ideal para puntajes o relojes.
+        :param usar_cache: Comparte la imagen con otros textos iguales, ideal
+                           para etiquetas como las opciones de un menú.
         """
         self._ancho = ancho
         self.__magnitud = magnitud
         self.__vertical = vertical
         self.__fuente = fuente
         self.__color = blanco
+        self.__usar_atlas = usar_atlas
+        self.__imagen_de_atlas = None
+        self.__usar_cache = usar_cache
         Actor.__init__(self, pilas)
         self.x = x
         self.y = y
@@ -50,12 +59,26 @@ class Texto(Actor):
 
     def definir_texto(self, texto):
         """Define el texto a mostrar."""
-        imagen = self.pilas.imagenes.crear_texto(texto,
-                                                 self.__magnitud,
-                                                 self.__vertical,
-                                                 self.__fuente,
-                                                 color=self.__color,
-                                                 ancho=self._ancho)
+        if self.__imagen_de_atlas:
+            # Con el atlas se reutiliza la misma imagen, solo se vuelven
+            # a ubicar los caracteres.
+            imagen = self.__imagen_de_atlas
+            imagen.definir_texto(texto, self._ancho)
+
+            if self._estatico:
+                self.pilas.escena_actual().invalidar_capa_estatica()
+        else:
+            imagen = self.pilas.imagenes.crear_texto(texto,
+                                                     self.__magnitud,
+                                                     self.__vertical,
+                                                     self.__fuente,
+                                                     color=self.__color,
+                                                     ancho=self._ancho,
+                                                     usar_atlas=self.__usar_atlas,
+                                                     usar_cache=self.__usar_cache)
+
+            if self.__usar_atlas:
+                self.__imagen_de_atlas = imagen
 
         if not self._ancho:
             self._ancho = imagen.ancho()
@@ -82,6 +105,8 @@ class Texto(Actor):
 
     def definir_color(self, color):
         self.__color = color
+        # Cada color tiene su propio atlas.
+        self.__imagen_de_atlas = None
         # Actualiza el texto para forzar el re-dibujado
         self.texto = self.texto
 
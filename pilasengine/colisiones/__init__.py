@@ -11,6 +11,8 @@ import pilasengine
 
 import inspect
 
+from pilasengine.colisiones.hash_espacial import HashEspacial
+
 class Colisiones(object):
     "Administra todas las _colisiones entre actores."
 
@@ -26,35 +28,163 @@ class Colisiones(object):
         self._colisiones_programadas_con_respuesta = []
         self._colisiones_programadas_entre_etiquetas_con_respuesta = []
 
-        # Las colisiones en curso guarda
+        # Las colisiones en curso guarda los pares (actor_o_figura_1,
+        # actor_o_figura_2) que comenzaron a tocarse desde la última
+        # actualización. Cada par aparece una sola vez, aunque el motor
+        # de física lo notifique varias veces.
         self._colisiones_en_curso = []
+        self._claves_en_curso = set()
         self._lista = []
 
+        # Pares que están en contacto, de la forma:
+        #
+        #    {clave_del_par: [actor_o_figura_1, actor_o_figura_2, cantidad]}
+        #
+        # donde cantidad cuenta los contactos entre las distintas
+        # partes (fixtures) de ambos objetos.
+        self._contactos_activos = {}
+        self._contactos_terminados = {}
+        self._claves_activas_anteriores = set()
+
+        # Pares que comenzaron, continuaron y terminaron de tocarse en
+        # la última actualización.
+        self.entrantes = set()
+        self.permanentes = set()
+        self.salientes = set()
+
+        # Indices para encontrar rápidamente las colisiones programadas
+        # en las que participa un actor, figura, grupo o etiqueta.
+        #
+        # El primer diccionario relaciona el id de cada actor, figura o
+        # grupo con elementos de la forma (objeto, indice_de_colision, lado),
+        # donde lado es 0 si el objeto está en grupo_a y 1 si está
+        # en grupo_b. El segundo relaciona cada etiqueta con los
+        # indices de las colisiones entre etiquetas que la usan.
+        self._colisiones_por_participante = {}
+        self._colisiones_por_etiqueta = {}
+
+        # Listas comunes que se usaron en "agregar", de la forma
+        # (lista, indice_de_colision, lado). Se recorren al consultar
+        # una colisión porque el juego puede cambiarlas en cualquier
+        # momento (por ejemplo la lista de disparos de una nave).
+        self._colisiones_por_lista = []
+
+        # Copia de _colisiones_por_lista con el conjunto de ids de cada
+        # lista, de la forma (ids, indice_de_colision, lado). Se arma la
+        # primera vez que se consulta en cada actualización, así las
+        # listas no se recorren por cada actor o contacto.
+        self._ids_por_lista = None
+
+        # Motor alternativo para detectar colisiones. Si es None
+        # se usa el motor de física (Box2D).
+        self._motor = None
+
+    def definir_motor(self, motor, tamano_de_celda=64):
+        """Elige el mecanismo que se usa para detectar colisiones.
+
+        Los motores disponibles son:
+
+        - ``'fisica'``: cada actor tiene un sensor dentro del motor de
+          física (el comportamiento por omisión).
+        - ``'hash_espacial'``: se comparan las figuras de colisión de
+          los actores (círculos o rectángulos) usando una grilla, sin
+          crear cuerpos físicos.
+          Es ideal para juegos que no necesitan física real.
+
+        :param motor: El nombre del motor a utilizar.
+        :param tamano_de_celda: Tamaño en pixels de cada celda de la grilla.
+        """
+        if motor == 'fisica':
+            self._motor = None
+        elif motor == 'hash_espacial':
+            self._motor = HashEspacial(self, tamano_de_celda)
+        else:
+            raise ValueError("El motor de colisiones '%s' es invalido, use 'fisica' o 'hash_espacial'." % (motor))
+
+    def obtener_motor(self):
+        if self._motor:
+            return 'hash_espacial'
+        else:
+            return 'fisica'
+
     def notificar_colision(self, fixture_1, fixture_2):
         """Se invoca automáticamente desde el componente Fisica.
 
         Internamente, el motor de física tiene un objeto llamado
         ContactListener (en el archivo 'fisica/contact_listener.py').
         """
-        actor_asociado_1 = fixture_1.userData.get('actor', None)
-        actor_asociado_2 = fixture_2.userData.get('actor', None)
+        self.notificar_colision_entre_actores(self._obtener_participante(fixture_1),
+                                              self._obtener_participante(fixture_2))
+
+    def notificar_fin_de_colision(self, fixture_1, fixture_2):
+        """Se invoca desde el ContactListener cuando dos figuras se separan."""
+        self.notificar_fin_de_colision_entre_actores(self._obtener_participante(fixture_1),
+                                                     self._obtener_participante(fixture_2))
+
+    def notificar_colision_entre_actores(self, actor_1, actor_2):
+        """Registra que dos actores (o figuras) comenzaron a tocarse."""
+        if actor_1 is None or actor_2 is None:
+            return
 
-        figura_1 = fixture_1.userData.get('figura', None)
-        figura_2 = fixture_2.userData.get('figura', None)
+        clave = self._obtener_clave(actor_1, actor_2)
+        contacto = self._contactos_activos.get(clave)
 
-        info_colision = {'actor1': actor_asociado_1,
-                         'actor2': actor_asociado_2,
-                         'figura1': figura_1,
-                         'figura2': figura_2,
-                         'fixture1': fixture_1,
-                         'fixture2': fixture_2}
-        self._colisiones_en_curso.append(info_colision)
+        if contacto:
+            contacto[2] += 1
+        else:
+            self._contactos_activos[clave] = [actor_1, actor_2, 1]
+
+        if clave not in self._claves_en_curso:
+            self._claves_en_curso.add(clave)
+            self._colisiones_en_curso.append((actor_1, actor_2))
+
+    def notificar_fin_de_colision_entre_actores(self, actor_1, actor_2):
+        """Registra que dos actores (o figuras) dejaron de tocarse."""
+        if actor_1 is None or actor_2 is None:
+            return
+
+        clave = self._obtener_clave(actor_1, actor_2)
+        contacto = self._contactos_activos.get(clave)
+
+        if contacto:
+            contacto[2] -= 1
+
+            if contacto[2] <= 0:
+                del self._contactos_activos[clave]
+                self._contactos_terminados[clave] = (contacto[0], contacto[1])
+
+    def _obtener_participante(self, fixture):
+        """Retorna el actor asociado a un fixture, o su figura si no tiene actor."""
+        return fixture.userData.get('actor', None) or fixture.userData.get('figura', None)
+
+    def _obtener_clave(self, actor_1, actor_2):
+        a, b = id(actor_1), id(actor_2)
+
+        if a < b:
+            return (a, b)
+        else:
+            return (b, a)
 
     def obtener_cantidad_de_colisiones(self):
         return len(self._colisiones_en_curso)
 
+    def obtener_colisiones_entrantes(self):
+        """Retorna los pares de actores que comenzaron a tocarse en esta actualización."""
+        return self.entrantes
+
+    def obtener_colisiones_permanentes(self):
+        """Retorna los pares de actores que siguen en contacto desde antes."""
+        return self.permanentes
+
+    def obtener_colisiones_salientes(self):
+        """Retorna los pares de actores que dejaron de tocarse en esta actualización."""
+        return self.salientes
+
     def limpiar(self):
         self._colisiones_en_curso = []
+        self._claves_en_curso = set()
+        self._contactos_terminados = {}
+        self._ids_por_lista = None
 
     def actualizar(self):
         """Realiza todas las comprobaciones de colisiones.
@@ -62,40 +192,208 @@ class Colisiones(object):
         Este método dispara todas las acciones asociadas a las colisiones
         programadas cuando se producen.
         """
+        # Los actores pudieron cambiar las listas desde la última consulta.
+        self._ids_por_lista = None
 
-        for info_colision in self._colisiones_en_curso:
-            if info_colision['actor1']:
-                actor_1 = info_colision['actor1']
-            else:
-                actor_1 = info_colision['figura1']
+        if self._motor:
+            self._motor.actualizar(self._obtener_actores_que_pueden_colisionar())
 
-            if info_colision['actor2']:
-                actor_2 = info_colision['actor2']
-            else:
-                actor_2 = info_colision['figura2']
+        self._actualizar_entrantes_permanentes_y_salientes()
 
+        for (actor_1, actor_2) in self._colisiones_en_curso:
             self._ejecutar_colision_programada_si_existe(actor_1, actor_2)
             self._ejecutar_colisiones_entre_etiquetas_si_existe(actor_1, actor_2)
 
-        self._colisiones_en_curso = []
+        self.limpiar()
+
+    def _actualizar_entrantes_permanentes_y_salientes(self):
+        # Los actores eliminados no siempre informan el fin del
+        # contacto, así que se quitan en este punto.
+        for clave, (actor_1, actor_2, _) in self._contactos_activos.items():
+            if not actor_1._vivo or not actor_2._vivo:
+                del self._contactos_activos[clave]
+                self._contactos_terminados[clave] = (actor_1, actor_2)
+
+        anteriores = self._claves_activas_anteriores
+
+        self.entrantes = set(self._colisiones_en_curso)
+        self.permanentes = set((actor_1, actor_2)
+                               for clave, (actor_1, actor_2, _) in self._contactos_activos.iteritems()
+                               if clave in anteriores and clave not in self._claves_en_curso)
+        self.salientes = set(par for clave, par in self._contactos_terminados.iteritems()
+                             if clave not in self._contactos_activos)
+
+        self._claves_activas_anteriores = set(self._contactos_activos)
 
     def _ejecutar_colision_programada_si_existe(self, actor_1, actor_2):
-        for (grupo_a, grupo_b, funcion_a_llamar) in self._colisiones_programadas_con_respuesta:
-            for a in grupo_a:
-                for b in grupo_b:
-                    if a in (actor_1, actor_2) and b in (actor_1, actor_2):
-                        if not a.esta_eliminado() and not b.esta_eliminado():
-                            self.invocar_funcion(funcion_a_llamar, a, b)
+        lados_1 = self._obtener_lados_por_colision(actor_1)
+
+        if not lados_1:
+            return
+
+        lados_2 = self._obtener_lados_por_colision(actor_2)
+
+        for indice in sorted(set(lados_1).intersection(lados_2)):
+            funcion_a_llamar = self._colisiones_programadas_con_respuesta[indice][2]
+
+            if actor_1.esta_eliminado() or actor_2.esta_eliminado():
+                return
+
+            if 0 in lados_1[indice] and 1 in lados_2[indice]:
+                self.invocar_funcion(funcion_a_llamar, actor_1, actor_2)
+
+            if 0 in lados_2[indice] and 1 in lados_1[indice] and actor_1 is not actor_2:
+                self.invocar_funcion(funcion_a_llamar, actor_2, actor_1)
+
+    def _obtener_lados_por_colision(self, objeto):
+        """Retorna en qué lado de cada colisión programada participa un objeto.
+
+        El resultado es un diccionario de la forma {indice: set([lado])}, que
+        incluye las colisiones de los grupos a los que pertenece el objeto.
+        """
+        lados = {}
+        participantes = [objeto] + list(getattr(objeto, '_grupos_a_los_que_pertenece', []))
+
+        for participante in participantes:
+            for (registrado, indice, lado) in self._colisiones_por_participante.get(id(participante), []):
+                if registrado is participante:
+                    lados.setdefault(indice, set()).add(lado)
+
+        if self._colisiones_por_lista:
+            # Se compara por id, porque Actor.__cmp__ compara el valor de z.
+            ids = set(id(participante) for participante in participantes)
+
+            for (ids_de_lista, indice, lado) in self._obtener_ids_por_lista():
+                if not ids.isdisjoint(ids_de_lista):
+                    lados.setdefault(indice, set()).add(lado)
+
+        return lados
+
+    def _obtener_ids_por_lista(self):
+        """Retorna los ids de los elementos de cada lista de ``agregar``.
+
+        Se calculan una vez por actualización. Si el juego agrega un
+        actor a la lista después de la primera consulta, el actor
+        participa de la colisión desde la actualización siguiente.
+        """
+        if self._ids_por_lista is None:
+            self._ids_por_lista = [(set(id(x) for x in lista), indice, lado)
+                                   for (lista, indice, lado) in self._colisiones_por_lista]
+
+        return self._ids_por_lista
 
     def _ejecutar_colisiones_entre_etiquetas_si_existe(self, actor_1, actor_2):
-        for (grupo_a, grupo_b, funcion_a_llamar) in self._colisiones_programadas_entre_etiquetas_con_respuesta:
-            # grupo_a = ['Mono']
-            # grupo_b = ['item', 'ememigos']
-            if actor_1.etiquetas.interseccion(grupo_a) and actor_2.etiquetas.interseccion(grupo_b):
+        if not self._colisiones_por_etiqueta:
+            return
+
+        etiquetas_1 = actor_1.etiquetas.obtener_como_conjunto()
+        etiquetas_2 = actor_2.etiquetas.obtener_como_conjunto()
+        indices = set()
+
+        for etiqueta in etiquetas_1 | etiquetas_2:
+            indices.update(self._colisiones_por_etiqueta.get(etiqueta, []))
+
+        for indice in sorted(indices):
+            # grupo_a = set(['mono'])
+            # grupo_b = set(['item', 'ememigos'])
+            (grupo_a, grupo_b, funcion_a_llamar) = self._colisiones_programadas_entre_etiquetas_con_respuesta[indice]
+
+            if not grupo_a.isdisjoint(etiquetas_1) and not grupo_b.isdisjoint(etiquetas_2):
                 self.invocar_funcion(funcion_a_llamar, actor_1, actor_2)
-            elif actor_2.etiquetas.interseccion(grupo_a) and actor_1.etiquetas.interseccion(grupo_b):
+            elif not grupo_a.isdisjoint(etiquetas_2) and not grupo_b.isdisjoint(etiquetas_1):
                 self.invocar_funcion(funcion_a_llamar, actor_2, actor_1)
 
+    def requiere_figura_de_colision(self, actor):
+        """Indica si un actor tiene que crear su figura de colisión.
+
+        Se consulta en cada actualización de los actores que todavía no
+        crearon su figura, por ejemplo porque se agregaron a un grupo o
+        recibieron una etiqueta después de llamar a ``agregar``.
+        """
+        if self._motor or not self.escena.sensores_implicitos:
+            return False
+
+        return self._participa_de_colisiones(actor)
+
+    def _participa_de_colisiones(self, actor):
+        if self._colisiones_por_etiqueta:
+            for etiqueta in actor.etiquetas.obtener_como_conjunto():
+                if etiqueta in self._colisiones_por_etiqueta:
+                    return True
+
+        if self._colisiones_por_participante or self._colisiones_por_lista:
+            return bool(self._obtener_lados_por_colision(actor))
+
+        return False
+
+    def _indexar_grupo(self, indice, grupo, lado, es_lista_del_juego):
+        """Registra a los integrantes de un lado de una colisión programada.
+
+        Los objetos Grupo se registran completos, así los actores que
+        se agreguen al grupo mas adelante también participan de la
+        colisión. Las listas que envía el juego se registran completas
+        por el mismo motivo, y su contenido se consulta en cada colisión.
+        Solo los actores o figuras sueltos se registran uno por uno.
+        """
+        if isinstance(grupo, pilasengine.actores.grupo.Grupo):
+            participantes = [grupo]
+        elif es_lista_del_juego:
+            self._colisiones_por_lista.append((grupo, indice, lado))
+            self._ids_por_lista = None
+            return
+        else:
+            participantes = grupo
+
+        for x in participantes:
+            entradas = self._colisiones_por_participante.setdefault(id(x), [])
+            entradas.append((x, indice, lado))
+
+    def olvidar_actor(self, actor):
+        """Quita los registros de un actor que se eliminó de la escena.
+
+        Si el actor se había enviado solo (sin lista ni grupo) a
+        ``agregar`` también se quita de esa colisión programada, así
+        no queda ninguna referencia al actor.
+        """
+        entradas = self._colisiones_por_participante.pop(id(actor), None)
+
+        if not entradas:
+            return
+
+        restantes = []
+
+        for (registrado, indice, lado) in entradas:
+            if registrado is actor:
+                participantes = self._colisiones_programadas_con_respuesta[indice][lado]
+                participantes[:] = [x for x in participantes if x is not actor]
+            else:
+                restantes.append((registrado, indice, lado))
+
+        if restantes:
+            self._colisiones_por_participante[id(actor)] = restantes
+
+    def _crear_figuras_de_colision(self, grupo):
+        """Se asegura de que todos los actores del grupo tengan figura."""
+        if self._motor:
+            return
+
+        for x in grupo:
+            if isinstance(x, pilasengine.actores.Actor):
+                x.obtener_figura_de_colision()
+
+    def _obtener_actores_que_pueden_colisionar(self):
+        return [actor for actor in self.escena._actores.iterar_actores()
+                if actor._vivo and (actor._radio_de_colision or actor._figura_de_colision) and
+                self._participa_de_colisiones(actor)]
+
+    def _crear_figuras_de_colision_por_etiquetas(self, etiquetas):
+        if self._motor or not self.escena.sensores_implicitos:
+            return
+
+        for actor in self.escena._actores.iterar_actores():
+            if actor.tiene_figura_de_colision_pendiente() and not etiquetas.isdisjoint(actor.etiquetas.obtener_como_conjunto()):
+                actor.obtener_figura_de_colision()
+
     def invocar_funcion(self, funcion, actor1, actor2):
         if inspect.ismethod(funcion):
             if funcion.func_code.co_argcount == 3:
@@ -113,12 +411,15 @@ class Colisiones(object):
 
         # Se asegura que el primer parámetro se convierta en una lista si
         # es solo un elemento.
-        if not isinstance(grupo_a, list) and not isinstance(grupo_a, collections.MutableSequence):
+        es_lista_a = isinstance(grupo_a, list) or isinstance(grupo_a, collections.MutableSequence)
+        es_lista_b = isinstance(grupo_b, list) or isinstance(grupo_b, collections.MutableSequence)
+
+        if not es_lista_a:
             grupo_a = [grupo_a]
 
         # Se asegura que el primer parámetro se convierta en una lista si
         # es solo un elemento.
-        if not isinstance(grupo_b, list) and not isinstance(grupo_b, collections.MutableSequence):
+        if not es_lista_b:
             grupo_b = [grupo_b]
 
         # Se asegura de que se llame con etiquetas o actores, pero
@@ -130,14 +431,23 @@ class Colisiones(object):
         if funcion_a_llamar and not callable(funcion_a_llamar):
             raise Exception(u"El tercer parámetro debe ser una función.")
 
-        if cantidad_total == cantidad_actores:
+        if cantidad_total == cantidad_actores or cantidad_total == cantidad_figuras:
+            indice = len(self._colisiones_programadas_con_respuesta)
+            self._indexar_grupo(indice, grupo_a, 0, es_lista_a)
+            self._indexar_grupo(indice, grupo_b, 1, es_lista_b)
+            self._crear_figuras_de_colision(grupo_a)
+            self._crear_figuras_de_colision(grupo_b)
             self._colisiones_programadas_con_respuesta.append((grupo_a, grupo_b, funcion_a_llamar))
         elif cantidad_total == cantidad_etiquetas:
-            grupo_a = self._convertir_en_lista_de_cadenas(grupo_a)
-            grupo_b = self._convertir_en_lista_de_cadenas(grupo_b)
+            grupo_a = set(self._convertir_en_lista_de_cadenas(grupo_a))
+            grupo_b = set(self._convertir_en_lista_de_cadenas(grupo_b))
+            indice = len(self._colisiones_programadas_entre_etiquetas_con_respuesta)
+
+            for etiqueta in grupo_a | grupo_b:
+                self._colisiones_por_etiqueta.setdefault(etiqueta, []).append(indice)
+
+            self._crear_figuras_de_colision_por_etiquetas(grupo_a | grupo_b)
             self._colisiones_programadas_entre_etiquetas_con_respuesta.append((grupo_a, grupo_b, funcion_a_llamar))
-        elif cantidad_total == cantidad_figuras:
-            self._colisiones_programadas_con_respuesta.append((grupo_a, grupo_b, funcion_a_llamar))
         else:
             raise Exception("Las colisiones solo se permiten entre actores o entre etiquetas, pero sin mezclar.")
 
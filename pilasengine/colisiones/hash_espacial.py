@@ -0,0 +1,214 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import math
+
+from pilasengine.fisica.rectangulo import Rectangulo
+
+
+class HashEspacial(object):
+    """Detecta colisiones entre actores sin usar el motor de física.
+
+    Divide el escenario en una grilla uniforme de celdas cuadradas y
+    ubica a cada actor en las celdas que toca el rectángulo que
+    envuelve a su figura de colisión. Solo se comparan los actores
+    que comparten alguna celda.
+
+    Si el actor tiene una figura rectangular (por ejemplo creada con
+    ``definir_area_colision``) se usa ese rectángulo, incluyendo su
+    desplazamiento. En cualquier otro caso se usa un círculo con el
+    ``radio_de_colision`` del actor.
+
+    La grilla se actualiza de forma incremental: un actor cambia de
+    celdas solamente cuando su rectángulo cruza el borde de una celda.
+
+    Al igual que el motor de física, solo notifica a ``Colisiones``
+    cuando dos actores comienzan y terminan de tocarse.
+    """
+
+    def __init__(self, colisiones, tamano_de_celda=64):
+        self.colisiones = colisiones
+        self.tamano_de_celda = float(tamano_de_celda)
+
+        # Relaciona cada celda (columna, fila) con los actores que toca.
+        self._celdas = {}
+
+        # Relaciona el id de cada actor con (actor, celdas_que_ocupa, forma),
+        # donde forma se obtiene con "_obtener_forma".
+        self._actores = {}
+
+        # Pares de actores que estaban en contacto en la actualización
+        # anterior, de la forma {(id_1, id_2): (actor_1, actor_2)}.
+        self._pares_en_contacto = {}
+
+    def actualizar(self, actores):
+        """Reubica a los actores en la grilla y notifica los cambios de contacto.
+
+        :param actores: Actores que pueden colisionar en este cuadro.
+        """
+        vistos = set()
+
+        for actor in actores:
+            vistos.add(id(actor))
+            self._reubicar(actor)
+
+        for identificador in [i for i in self._actores if i not in vistos]:
+            self._quitar(identificador)
+
+        pares = self._obtener_pares_en_contacto()
+
+        for par, (actor_1, actor_2) in self._pares_en_contacto.iteritems():
+            if par not in pares:
+                self.colisiones.notificar_fin_de_colision_entre_actores(actor_1, actor_2)
+
+        for par, (actor_1, actor_2) in pares.iteritems():
+            if par not in self._pares_en_contacto:
+                self.colisiones.notificar_colision_entre_actores(actor_1, actor_2)
+
+        self._pares_en_contacto = pares
+
+    def limpiar(self):
+        self._celdas.clear()
+        self._actores.clear()
+        self._pares_en_contacto = {}
+
+    def obtener_cantidad_de_actores(self):
+        return len(self._actores)
+
+    def _obtener_forma(self, actor):
+        """Retorna la figura de colisión del actor en coordenadas de la escena.
+
+        El resultado es (x, y, radio) para un círculo, o (x, y, None,
+        medio_ancho, medio_alto) para un rectángulo. Los rectángulos
+        rotados se reemplazan por el rectángulo que los envuelve.
+        """
+        figura = actor._figura_de_colision
+
+        if figura is None:
+            return (actor.x, actor.y, actor._radio_de_colision)
+
+        x = actor.x - actor._figura_de_colision_dx
+        y = actor.y - actor._figura_de_colision_dy
+
+        if not isinstance(figura, Rectangulo):
+            return (x, y, figura.radio)
+
+        medio_ancho = figura.ancho / 2.0
+        medio_alto = figura.alto / 2.0
+        angulo = math.radians(actor.rotacion)
+
+        if angulo:
+            seno = abs(math.sin(angulo))
+            coseno = abs(math.cos(angulo))
+            medio_ancho, medio_alto = (medio_ancho * coseno + medio_alto * seno,
+                                       medio_ancho * seno + medio_alto * coseno)
+
+        return (x, y, None, medio_ancho, medio_alto)
+
+    def _obtener_celdas(self, forma):
+        tamano = self.tamano_de_celda
+        x, y = forma[0], forma[1]
+
+        if forma[2] is None:
+            medio_ancho, medio_alto = forma[3], forma[4]
+        else:
+            medio_ancho = medio_alto = forma[2]
+
+        columna_inicial = int(math.floor((x - medio_ancho) / tamano))
+        columna_final = int(math.floor((x + medio_ancho) / tamano))
+        fila_inicial = int(math.floor((y - medio_alto) / tamano))
+        fila_final = int(math.floor((y + medio_alto) / tamano))
+
+        return (columna_inicial, columna_final, fila_inicial, fila_final)
+
+    def _reubicar(self, actor):
+        identificador = id(actor)
+        forma = self._obtener_forma(actor)
+        rango = self._obtener_celdas(forma)
+
+        if identificador in self._actores:
+            if self._actores[identificador][1] == rango:
+                self._actores[identificador] = (actor, rango, forma)
+                return
+
+            self._quitar(identificador)
+
+        self._actores[identificador] = (actor, rango, forma)
+        columna_inicial, columna_final, fila_inicial, fila_final = rango
+
+        for columna in xrange(columna_inicial, columna_final + 1):
+            for fila in xrange(fila_inicial, fila_final + 1):
+                self._celdas.setdefault((columna, fila), set()).add(identificador)
+
+    def _quitar(self, identificador):
+        _, rango, _ = self._actores.pop(identificador)
+        columna_inicial, columna_final, fila_inicial, fila_final = rango
+
+        for columna in xrange(columna_inicial, columna_final + 1):
+            for fila in xrange(fila_inicial, fila_final + 1):
+                celda = self._celdas[(columna, fila)]
+                celda.discard(identificador)
+
+                if not celda:
+                    del self._celdas[(columna, fila)]
+
+    def _obtener_pares_en_contacto(self):
+        pares = {}
+        comparados = set()
+
+        for celda in self._celdas.itervalues():
+            if len(celda) < 2:
+                continue
+
+            identificadores = sorted(celda)
+
+            for i, id_1 in enumerate(identificadores):
+                for id_2 in identificadores[i + 1:]:
+                    par = (id_1, id_2)
+
+                    if par in comparados:
+                        continue
+
+                    comparados.add(par)
+
+                    actor_1, _, forma_1 = self._actores[id_1]
+                    actor_2, _, forma_2 = self._actores[id_2]
+
+                    if self._se_tocan(forma_1, forma_2):
+                        pares[par] = (actor_1, actor_2)
+
+        return pares
+
+    def _se_tocan(self, forma_1, forma_2):
+        x_1, y_1, radio_1 = forma_1[:3]
+        x_2, y_2, radio_2 = forma_2[:3]
+
+        if radio_1 is not None and radio_2 is not None:
+            dx = x_1 - x_2
+            dy = y_1 - y_2
+            distancia = radio_1 + radio_2
+            return dx * dx + dy * dy <= distancia * distancia
+
+        if radio_1 is None and radio_2 is None:
+            return (abs(x_1 - x_2) <= forma_1[3] + forma_2[3] and
+                    abs(y_1 - y_2) <= forma_1[4] + forma_2[4])
+
+        if radio_1 is None:
+            forma_1, forma_2 = forma_2, forma_1
+
+        # Un círculo y un rectángulo: se busca el punto del rectángulo
+        # mas cercano al centro del círculo.
+        x, y, radio = forma_1
+        x_2, y_2, _, medio_ancho, medio_alto = forma_2
+        dx = x - max(x_2 - medio_ancho, min(x, x_2 + medio_ancho))
+        dy = y - max(y_2 - medio_alto, min(y, y_2 + medio_alto))
+        return dx * dx + dy * dy <= radio * radio
+
+    def __repr__(self):
+        return "<HashEspacial con %d actores en %d celdas>" % (
+            len(self._actores), len(self._celdas))
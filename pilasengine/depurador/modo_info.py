@@ -29,7 +29,9 @@ class ModoInformacionDeSistema(ModoDepurador):
             "", # Area de juego
             "", # Posición de la cámara
             "", # Rendimiento
-            ""  # Cantidad de actores
+            "", # Cantidad de actores
+            "", # Actores dibujados
+            ""  # Cache de textos
         ]
 
     def _usa_aceleracion_de_video(self):
@@ -45,6 +47,8 @@ class ModoInformacionDeSistema(ModoDepurador):
         self.informacion[6] = u"Posición de la cámara: (%d, %d)" % (self.pilas.camara.x, self.pilas.camara.y)
         self.informacion[7] = u"Rendimiento: %s cuadros por segundo" % (self.pilas.widget.fps.obtener_cuadros_por_segundo())
         self.informacion[8] = u"Cantidad de actores: %d" % (self.pilas.escena_actual().obtener_cantidad_de_actores())
+        self.informacion[9] = u"Actores dibujados: %d (fuera de la cámara: %d)" % (self.pilas.escena_actual().obtener_cantidad_de_actores_dibujados())
+        self.informacion[10] = self._obtener_informacion_de_cache_de_textos()
 
         for (i, texto) in enumerate(self.informacion[::-1]):
             posicion_y = abajo + 20 + i * 20
@@ -55,5 +59,13 @@ class ModoInformacionDeSistema(ModoDepurador):
         self._texto_absoluto(painter, texto, derecha-9, abajo+7, color=pilasengine.colores.negro, alineado_a_derecha=True)
         self._texto_absoluto(painter, texto, derecha-10, abajo+8, color=pilasengine.colores.blanco, alineado_a_derecha=True)
 
+    def _obtener_informacion_de_cache_de_textos(self):
+        estadisticas = self.pilas.imagenes.obtener_estadisticas_de_textos()
+        medidas = estadisticas['medidas']
+        imagenes = estadisticas['imagenes']
+        return u"Cache de textos: medidas %d/%d, imágenes %d/%d (aciertos/fallos)" % (
+            medidas['aciertos'], medidas['fallos'],
+            imagenes['aciertos'], imagenes['fallos'])
+
     def dibujar_actor(self, actor, painter):
         pass
@@ -45,6 +45,9 @@ class Escenas(object):
     def realizar_actualizacion_logica(self):
         escena = self.obtener_escena_actual()
 
+        if self._interpola_transformaciones():
+            escena.guardar_transformaciones_de_actores()
+
         # Resuelve un bug raro que activaba todos los callbacks de colisiones
         # cuando se usaba pilas desde un script. Resulta que en el instante
         # inicial de armar la escena todas las figuras fisicas están en la
@@ -80,9 +83,42 @@ class Escenas(object):
         escena.actualizar_interpolaciones(1/60.0)
         escena.actualizar()
 
+    def obtener_rectangulos_modificados(self):
+        """Retorna las partes de la ventana que cambiaron, o None si cambió todo."""
+        escena = self.obtener_escena_actual()
+        return escena.regiones_modificadas.obtener_rectangulos()
+
+    def obtener_firma_de_dibujado(self):
+        """Retorna un valor que cambia cuando cambia lo que se ve, o None si no se puede saber."""
+        escena = self.obtener_escena_actual()
+        return escena.regiones_modificadas.obtener_firma()
+
+    def _interpola_transformaciones(self):
+        return self.pilas.widget.bucle_con_interpolacion
+
     def realizar_dibujado(self, painter):
         escena = self.obtener_escena_actual()
-        escena.dibujar_actores(painter)
+
+        if self._interpola_transformaciones():
+            # Las interpolaciones ya quedan incluidas en la transformación
+            # de cada actor, así que no hace falta muestrearlas aparte.
+            fraccion = self.pilas.widget.fps.obtener_fraccion_del_paso()
+            modificados = escena.interpolar_transformaciones_de_actores(fraccion)
+
+            try:
+                escena.dibujar_actores(painter)
+            finally:
+                escena.restaurar_transformaciones_de_actores(modificados)
+        elif escena.tweener.interpolate_on_render:
+            fraccion = self.pilas.widget.fps.obtener_fraccion_del_paso()
+            escena.tweener.sample(fraccion)
+
+            try:
+                escena.dibujar_actores(painter)
+            finally:
+                escena.tweener.restore()
+        else:
+            escena.dibujar_actores(painter)
 
     def vincular(self, clase_de_la_escena):
         """Permite vincular una escena personalizada a las escenas de pilas.
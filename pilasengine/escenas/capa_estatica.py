@@ -0,0 +1,145 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+from PyQt4 import QtCore
+from PyQt4 import QtGui
+
+
+def obtener_firma_de_actor(actor):
+    """Retorna una tupla que cambia cada vez que el actor se ve distinto.
+
+    No contempla cambios dentro de la imagen, como el cuadro de una
+    animación o el contenido de una superficie.
+    """
+    return (actor._x, actor._y, actor._rotacion, actor._escala_x,
+            actor._escala_y, actor._transparencia, actor._espejado,
+            actor.fijo, actor._z, actor._centro_x, actor._centro_y,
+            id(actor._imagen))
+
+
+class CapaEstatica(object):
+    """Dibuja una sola vez a los actores estáticos de una escena.
+
+    Los actores con el atributo ``estatico`` en True se pintan sobre
+    un pixmap que se reutiliza en los siguientes cuadros, así que
+    dibujar cien actores estáticos cuesta lo mismo que dibujar una
+    imagen del tamaño de la ventana.
+
+    El pixmap se vuelve a armar si se mueve la cámara, si cambia el
+    tamaño de la ventana o si alguno de los actores estáticos se
+    mueve, cambia de imagen o se elimina. Los cambios dentro de una
+    imagen (por ejemplo al escribir sobre una superficie) no se
+    detectan, en ese caso hay que llamar a ``invalidar``.
+
+    La capa se dibuja debajo de todos los actores que no son estáticos,
+    así que solo incluye a los estáticos que se dibujan antes que ellos
+    (ver ``obtener_actores``).
+    """
+
+    def __init__(self, pilas, escena):
+        self.pilas = pilas
+        self.escena = escena
+        self._pixmap = None
+        self._firma = None
+        self.reconstrucciones = 0
+
+    def invalidar(self):
+        """Hace que la capa se vuelva a armar antes del siguiente dibujado."""
+        self._firma = None
+
+    def obtener_actores(self):
+        """Retorna los actores estáticos que se pintan en la capa.
+
+        Son los estáticos que están por detrás de todos los actores que
+        no son estáticos en el orden de dibujado. El resto se dibuja
+        normalmente, así marcar a un actor como estático no cambia lo
+        que se ve.
+        """
+        grupo = self.escena._actores
+        actores = []
+
+        # La escena dibuja primero a los actores que no son fijos y
+        # luego a los fijos.
+        for fijos in (False, True):
+            for x in grupo.iterar_actores(fijos=fijos, sin_padre=True):
+                if not x._vivo:
+                    continue
+
+                if not x._estatico:
+                    return actores
+
+                actores.append(x)
+
+        return actores
+
+    def se_puede_utilizar(self):
+        # Los modos depuración dibujan información sobre cada actor,
+        # así que mientras estén habilitados se dibuja todo normalmente.
+        return not self.pilas.depurador._modos
+
+    def dibujar(self, painter, actores):
+        """Dibuja la capa con los actores estáticos.
+
+        :param painter: El painter de la ventana, sin las transformaciones de la cámara.
+        :param actores: Los actores estáticos de la escena.
+        """
+        widget = self.pilas.widget
+        camara = self.escena.camara
+        firma = (camara.x, camara.y, camara.escala, camara.rotacion,
+                 widget.escala, widget.obtener_area(), widget._borrosidad,
+                 [obtener_firma_de_actor(x) for x in actores])
+
+        if firma != self._firma:
+            self._construir(actores)
+            self._firma = firma
+
+        painter.save()
+        painter.scale(1.0 / widget.escala, 1.0 / widget.escala)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.restore()
+
+    def _construir(self, actores):
+        widget = self.pilas.widget
+        ancho, alto = widget.obtener_area()
+        escala = widget.escala
+
+        # El pixmap tiene el tamaño real de la ventana, así no pierde
+        # definición si la ventana está ampliada.
+        self._pixmap = QtGui.QPixmap(int(ancho * escala + 0.5),
+                                     int(alto * escala + 0.5))
+        self._pixmap.fill(QtCore.Qt.transparent)
+        self.reconstrucciones += 1
+
+        painter = QtGui.QPainter(self._pixmap)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform,
+                              widget._borrosidad)
+        painter.setRenderHint(QtGui.QPainter.TextAntialiasing, True)
+        painter.scale(escala, escala)
+
+        painter.save()
+        self.escena.camara.aplicar_transformaciones_completas(painter)
+
+        for x in actores:
+            if not x.fijo:
+                x.dibujar(painter)
+
+        painter.restore()
+
+        painter.save()
+        self.escena.camara.aplicar_translacion(painter)
+
+        for x in actores:
+            if x.fijo:
+                x.dibujar(painter)
+
+        painter.restore()
+        painter.end()
+
+    def __repr__(self):
+        return "<CapaEstatica (reconstruida %d veces)>" % (self.reconstrucciones)
@@ -6,7 +6,12 @@
 #
 # Website - http://www.pilas-engine.com.ar
 
+import math
+
 import camara
+from capa_estatica import CapaEstatica
+from regiones_modificadas import RegionesModificadas
+from indice_de_visibilidad import IndiceDeVisibilidad
 import pilasengine
 from pilasengine.actores import grupo
 from pilasengine.utils import pitweener
@@ -35,8 +40,11 @@ class Escena(object):
         pilas.log("Creando una escena: ", self)
         self.camara = camara.Camara(pilas, self)
         self.tweener = pitweener.Tweener()
-        self._actores = grupo.Grupo(pilas)
+        self._actores = grupo.Grupo(pilas, ordenado=True)
         self.grupos = []
+        self.capa_estatica = CapaEstatica(pilas, self)
+        self.regiones_modificadas = RegionesModificadas(pilas, self)
+        self.indice_de_visibilidad = IndiceDeVisibilidad()
 
         self.mueve_camara = self.pilas.eventos.Evento('mueve_camara')       # ['x', 'y', 'dx', 'dy']
         self.mueve_mouse = self.pilas.eventos.Evento('mueve_mouse')         # ['x', 'y', 'dx', 'dy']
@@ -54,10 +62,27 @@ class Escena(object):
         self.tareas = Tareas(self, pilas)
         self.fisica = Fisica(self, pilas)
         self.fisica.iniciar()
+
+        # Si es True los actores con radio_de_colision crean su figura
+        # física automáticamente cuando alguna de sus etiquetas o grupos
+        # se usa en pilas.colisiones.agregar. Si es False solo tienen
+        # figura los actores indicados explicitamente.
+        self.sensores_implicitos = True
         self.colisiones = Colisiones(pilas, self)
 
         self.click_de_mouse.conectar(self.arrastrar_actor_mas_cercano)
 
+    def definir_motor_de_colisiones(self, motor, tamano_de_celda=64):
+        """Elige cómo se detectan las colisiones entre actores de la escena.
+
+        Por ejemplo, para un juego sin física real se puede usar:
+
+            >>> pilas.escena.definir_motor_de_colisiones('hash_espacial')
+
+        Ver ``Colisiones.definir_motor`` para conocer las opciones.
+        """
+        self.colisiones.definir_motor(motor, tamano_de_celda)
+
     def eliminar_el_motor_de_fisica(self):
         """Método especial que se invoca cuando se reinicia pilas, y se tiene que eliminar la escena actual."""
         self.fisica.eliminar_para_liberar_memoria()
@@ -83,14 +108,86 @@ class Escena(object):
     def forzar_actualizacion_de_interpolaciones(self):
         self.tweener.force_update_one_frame()
 
+    def definir_interpolacion_al_dibujar(self, estado=True):
+        """Suaviza el movimiento de las interpolaciones al dibujar.
+
+        Las interpolaciones avanzan de a una actualización lógica (1/60
+        segundos). Si la pantalla se dibuja entre dos actualizaciones,
+        con esta opción cada actor interpolado se muestra en el punto
+        intermedio que le corresponde.
+
+        :param estado: True para habilitar la opción, False para deshabilitarla.
+        """
+        self.tweener.interpolate_on_render = estado
+
+    def guardar_transformaciones_de_actores(self):
+        """Recuerda la posición, rotación y escala de cada actor.
+
+        Se llama antes de cada actualización lógica, así luego se puede
+        dibujar a los actores entre el estado anterior y el actual.
+        """
+        for actor in self._actores.iterar_actores():
+            actor._transformacion_anterior = (actor._x, actor._y,
+                                              actor._rotacion,
+                                              actor._escala_x,
+                                              actor._escala_y)
+
+    def interpolar_transformaciones_de_actores(self, fraccion):
+        """Mueve a los actores entre su estado anterior y el actual.
+
+        Retorna las transformaciones reales de los actores modificados,
+        que se tienen que restaurar luego de dibujar con
+        ``restaurar_transformaciones_de_actores``.
+
+        :param fraccion: Un número entre 0 (estado anterior) y 1 (estado actual).
+        """
+        modificados = []
+
+        for actor in self._actores.iterar_actores():
+            anterior = actor._transformacion_anterior
+
+            if anterior is None:
+                continue
+
+            actual = (actor._x, actor._y, actor._rotacion,
+                      actor._escala_x, actor._escala_y)
+
+            if anterior == actual:
+                continue
+
+            x, y, rotacion, escala_x, escala_y = anterior
+            modificados.append((actor, actual))
+
+            # La rotación se interpola por el camino mas corto, así un
+            # actor que pasa de 359 a 1 grado no da una vuelta completa.
+            giro = (actual[2] - rotacion + 180) % 360 - 180
+
+            actor._x = x + (actual[0] - x) * fraccion
+            actor._y = y + (actual[1] - y) * fraccion
+            actor._rotacion = (rotacion + giro * fraccion) % 360
+            actor._escala_x = escala_x + (actual[3] - escala_x) * fraccion
+            actor._escala_y = escala_y + (actual[4] - escala_y) * fraccion
+            actor._marcar_caja_modificada()
+
+        return modificados
+
+    def restaurar_transformaciones_de_actores(self, modificados):
+        for (actor, (x, y, rotacion, escala_x, escala_y)) in modificados:
+            actor._x = x
+            actor._y = y
+            actor._rotacion = rotacion
+            actor._escala_x = escala_x
+            actor._escala_y = escala_y
+            actor._marcar_caja_modificada()
+
     def obtener_cantidad_de_actores(self):
-        return len(self._actores.obtener_actores())
+        return len(self._actores)
 
     def actualizar_actores(self):
         actores_a_eliminar = []
         self.pilas.pad.actualizar()
 
-        for x in self._actores.obtener_actores():
+        for x in self._actores.iterar_actores():
             if x._vivo:
                 x.pre_actualizar()
                 x.actualizar()
@@ -98,16 +195,41 @@ class Escena(object):
             else:
                 actores_a_eliminar.append(x)
 
+        # Cada actor se marca como eliminado en sus grupos sin recorrer
+        # las listas; la lista de la escena se compacta una sola vez, la
+        # próxima vez que se consulta.
         for actor in actores_a_eliminar:
             actor.quitar_de_la_escena_completamente()
+            self.colisiones.olvidar_actor(actor)
+            self.indice_de_visibilidad.quitar(actor)
+
+    def definir_orden_por_y(self, estado=True):
+        """Dibuja por delante a los actores que están mas abajo en la pantalla.
+
+        Solo afecta a los actores con el mismo valor de z, así se puede
+        seguir usando z para separar capas (fondo, personajes, etc).
+
+        :param estado: True para habilitar la opción, False para deshabilitarla.
+        """
+        self._actores.definir_orden_por_y(estado)
 
     def dibujar_actores(self, painter):
+        self._actores.actualizar_orden_por_y()
+        en_la_capa = set()
+
+        if self.capa_estatica.se_puede_utilizar():
+            estaticos = self.capa_estatica.obtener_actores()
+
+            if estaticos:
+                self.capa_estatica.dibujar(painter, estaticos)
+                en_la_capa = set(id(x) for x in estaticos)
+
         painter.save()
 
         self.camara.aplicar_transformaciones_completas(painter)
 
-        for x in self._actores.obtener_actores(fijos=False, sin_padre=True):
-            if x._vivo:
+        for x in self._obtener_actores_visibles():
+            if x._vivo and id(x) not in en_la_capa:
                 x.dibujar(painter)
 
         painter.restore()
@@ -115,20 +237,50 @@ class Escena(object):
         painter.save()
         self.camara.aplicar_translacion(painter)
 
-        for x in self._actores.obtener_actores(fijos=True, sin_padre=True):
-            if x._vivo:
+        for x in self._actores.iterar_actores(fijos=True, sin_padre=True):
+            if x._vivo and id(x) not in en_la_capa:
                 x.dibujar(painter)
 
         painter.restore()
 
+    def _obtener_actores_visibles(self):
+        izquierda, derecha, arriba, abajo = self.camara.obtener_area_visible()
+
+        if self.camara.rotacion % 360:
+            # Con la cámara girada se ve un poco mas, así que se toma el
+            # círculo que envuelve a la pantalla.
+            x, y = self.camara.x, self.camara.y
+            radio = math.hypot(derecha - x, arriba - y)
+            izquierda, derecha = x - radio, x + radio
+            arriba, abajo = y + radio, y - radio
+
+        area = (izquierda - 1, derecha + 1, arriba + 1, abajo - 1)
+        return self.indice_de_visibilidad.obtener_visibles(self._actores, area)
+
+    def obtener_cantidad_de_actores_dibujados(self):
+        """Retorna cuantos actores se dibujaron en el último cuadro, y cuantos
+        se descartaron por estar fuera de la cámara."""
+        indice = self.indice_de_visibilidad
+        return (indice.dibujados, indice.descartados)
+
+    def invalidar_capa_estatica(self):
+        """Vuelve a pintar los actores estáticos en el siguiente cuadro.
+
+        Es necesario llamarla si cambia el contenido de la imagen de
+        algún actor estático, por ejemplo al dibujar sobre una superficie.
+        """
+        self.capa_estatica.invalidar()
+        self.regiones_modificadas.invalidar()
+
     def agregar_actor(self, actor):
         self._actores.agregar(actor)
+        self.indice_de_visibilidad.agregar(actor)
 
     def agregar_grupo(self, grupo):
         self.grupos.append(grupo)
 
     def obtener_actores_en(self, x, y):
-        return [a for a in self._actores.obtener_actores()
+        return [a for a in self._actores.iterar_actores()
                 if a.colisiona_con_un_punto(x, y)]
 
     def arrastrar_actor_mas_cercano(self, evento):
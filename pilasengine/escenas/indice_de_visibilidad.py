@@ -0,0 +1,250 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import math
+
+from pilasengine.actores.actor import Actor
+from pilasengine.imagenes.imagen import Imagen
+
+
+def obtener_caja(actor):
+    """Retorna el rectángulo que envuelve al actor rotado y escalado.
+
+    El resultado es una tupla (izquierda, derecha, abajo, arriba) en
+    coordenadas de la escena.
+    """
+    ancho = actor._imagen.ancho()
+    alto = actor._imagen.alto()
+    dx, dy = actor._centro_x, actor._centro_y
+    escala_x, escala_y = actor._escala_x, actor._escala_y
+
+    if actor._espejado:
+        escala_x = -escala_x
+
+    # Actor.dibujar rota en sentido contrario porque en la pantalla
+    # el eje y crece hacia abajo.
+    angulo = math.radians(-actor._rotacion)
+    coseno = math.cos(angulo)
+    seno = math.sin(angulo)
+
+    xs = []
+    ys = []
+
+    for (u, v) in ((-dx, -dy), (ancho - dx, -dy),
+                   (-dx, alto - dy), (ancho - dx, alto - dy)):
+        u *= escala_x
+        v *= escala_y
+        xs.append(u * coseno - v * seno)
+        ys.append(u * seno + v * coseno)
+
+    x, y = actor._x, actor._y
+    return (x + min(xs), x + max(xs), y - max(ys), y - min(ys))
+
+
+class IndiceDeVisibilidad(object):
+    """Encuentra los actores que se ven a través de la cámara.
+
+    Divide la escena en celdas cuadradas y ubica a cada actor en las
+    celdas que toca su caja (ver ``obtener_caja``). Para saber que se ve
+    en pantalla solo se consultan las celdas del área visible, así que
+    los actores lejanos de un nivel grande no se recorren al dibujar.
+
+    Los actores avisan al índice cuando se mueven, giran, cambian de
+    escala o de imagen (ver ``Actor._marcar_caja_modificada``), y solo
+    la caja de esos actores se vuelve a calcular antes de dibujar.
+
+    Los actores con hijos, los que se dibujan de forma personalizada y
+    los que tienen una imagen repetida (como un fondo en mosaico) pueden
+    pintar fuera de su caja, así que se dibujan siempre. Los
+    actores fijos y los hijos de otros actores no se guardan en el
+    índice, porque la escena los dibuja por separado.
+    """
+
+    def __init__(self, tamano_de_celda=256):
+        self.tamano_de_celda = float(tamano_de_celda)
+
+        # Relaciona cada celda (columna, fila) con los actores que toca.
+        self._celdas = {}
+
+        # Relaciona el id de cada actor con (actor, caja, celdas).
+        self._actores = {}
+
+        # Actores que se dibujan sin importar su posición, de la forma
+        # {id: actor}.
+        self._siempre_visibles = {}
+
+        # Actores que cambiaron desde el último dibujado, de la forma
+        # {id: actor}.
+        self._modificados = {}
+
+        # Valor de ``Imagen.cambios_de_repeticion`` la última vez que se
+        # revisaron los actores.
+        self._cambios_de_repeticion = Imagen.cambios_de_repeticion
+
+        self.dibujados = 0
+        self.descartados = 0
+
+    def agregar(self, actor):
+        """Comienza a seguir los cambios de un actor de la escena."""
+        actor._indice_de_visibilidad = self
+        self._modificados[id(actor)] = actor
+
+    def quitar(self, actor):
+        """Deja de seguir a un actor que se eliminó de la escena."""
+        identificador = id(actor)
+        self._modificados.pop(identificador, None)
+        self._siempre_visibles.pop(identificador, None)
+
+        if identificador in self._actores:
+            self._quitar(identificador)
+
+        if actor._indice_de_visibilidad is self:
+            actor._indice_de_visibilidad = None
+
+    def marcar(self, actor):
+        """Indica que la caja de un actor se tiene que volver a calcular."""
+        self._modificados[id(actor)] = actor
+
+    def obtener_visibles(self, grupo, area):
+        """Retorna los actores del grupo que tocan el área visible.
+
+        Los actores se retornan ordenados según las claves del grupo
+        (ver ``Grupo.reubicar``), así se respeta el orden de dibujado
+        según el atributo z. Solo se ordenan los actores visibles.
+
+        :param grupo: El grupo ordenado con los actores de la escena.
+        :param area: Una tupla (izquierda, derecha, arriba, abajo).
+        """
+        self._actualizar()
+        izquierda, derecha, arriba, abajo = area
+        visibles = dict(self._siempre_visibles)
+
+        for identificador in self._buscar_en_celdas(izquierda, derecha,
+                                                    abajo, arriba):
+            if identificador in visibles:
+                continue
+
+            actor, (x1, x2, y1, y2), _ = self._actores[identificador]
+
+            if x1 <= derecha and x2 >= izquierda and y1 <= arriba and y2 >= abajo:
+                visibles[identificador] = actor
+
+        claves = grupo._clave_por_actor
+        resultado = [actor for (identificador, actor) in visibles.iteritems()
+                     if identificador in claves]
+        resultado.sort(key=lambda actor: claves[id(actor)])
+
+        self.dibujados = len(resultado)
+        self.descartados = len(self._actores) + len(self._siempre_visibles) - self.dibujados
+        return resultado
+
+    def limpiar(self):
+        for actor in self._modificados.values():
+            actor._indice_de_visibilidad = None
+
+        for (actor, _, _) in self._actores.values():
+            actor._indice_de_visibilidad = None
+
+        for actor in self._siempre_visibles.values():
+            actor._indice_de_visibilidad = None
+
+        self._celdas.clear()
+        self._actores.clear()
+        self._siempre_visibles.clear()
+        self._modificados.clear()
+
+    def _actualizar(self):
+        if self._cambios_de_repeticion != Imagen.cambios_de_repeticion:
+            # Alguna imagen comenzó o dejó de repetirse, y como la imagen
+            # no conoce a sus actores se revisan todos.
+            self._cambios_de_repeticion = Imagen.cambios_de_repeticion
+
+            for (actor, _, _) in self._actores.values():
+                self._modificados[id(actor)] = actor
+
+            self._modificados.update(self._siempre_visibles)
+
+        modificados = self._modificados
+        self._modificados = {}
+
+        for (identificador, actor) in modificados.iteritems():
+            if actor.fijo or actor.padre:
+                self._siempre_visibles.pop(identificador, None)
+
+                if identificador in self._actores:
+                    self._quitar(identificador)
+
+                continue
+
+            imagen = actor._imagen
+
+            if (actor._actores or type(actor).dibujar != Actor.dibujar or
+                    imagen.repetir_horizontal or imagen.repetir_vertical):
+                self._siempre_visibles[identificador] = actor
+
+                if identificador in self._actores:
+                    self._quitar(identificador)
+
+                continue
+
+            self._siempre_visibles.pop(identificador, None)
+            caja = obtener_caja(actor)
+            celdas = self._obtener_celdas(caja)
+            datos = self._actores.get(identificador)
+
+            if datos and datos[2] == celdas:
+                self._actores[identificador] = (actor, caja, celdas)
+                continue
+
+            if datos:
+                self._quitar(identificador)
+
+            self._actores[identificador] = (actor, caja, celdas)
+            columna_inicial, columna_final, fila_inicial, fila_final = celdas
+
+            for columna in xrange(columna_inicial, columna_final + 1):
+                for fila in xrange(fila_inicial, fila_final + 1):
+                    self._celdas.setdefault((columna, fila), set()).add(identificador)
+
+    def _obtener_celdas(self, caja):
+        izquierda, derecha, abajo, arriba = caja
+        tamano = self.tamano_de_celda
+        return (int(math.floor(izquierda / tamano)),
+                int(math.floor(derecha / tamano)),
+                int(math.floor(abajo / tamano)),
+                int(math.floor(arriba / tamano)))
+
+    def _buscar_en_celdas(self, izquierda, derecha, abajo, arriba):
+        columna_inicial, columna_final, fila_inicial, fila_final = \
+            self._obtener_celdas((izquierda, derecha, abajo, arriba))
+        encontrados = set()
+
+        for columna in xrange(columna_inicial, columna_final + 1):
+            for fila in xrange(fila_inicial, fila_final + 1):
+                celda = self._celdas.get((columna, fila))
+
+                if celda:
+                    encontrados.update(celda)
+
+        return encontrados
+
+    def _quitar(self, identificador):
+        _, _, celdas = self._actores.pop(identificador)
+        columna_inicial, columna_final, fila_inicial, fila_final = celdas
+
+        for columna in xrange(columna_inicial, columna_final + 1):
+            for fila in xrange(fila_inicial, fila_final + 1):
+                celda = self._celdas[(columna, fila)]
+                celda.discard(identificador)
+
+                if not celda:
+                    del self._celdas[(columna, fila)]
+
+    def __repr__(self):
+        return "<IndiceDeVisibilidad con %d actores en %d celdas>" % (
+            len(self._actores), len(self._celdas))
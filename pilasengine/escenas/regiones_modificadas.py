@@ -0,0 +1,207 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import math
+
+from pilasengine.actores.actor import Actor
+from pilasengine.imagenes.imagen import Imagen
+from capa_estatica import obtener_firma_de_actor
+
+
+class RegionesModificadas(object):
+    """Calcula que partes de la ventana cambiaron desde el último dibujado.
+
+    Por cada actor recuerda su firma (ver ``obtener_firma_de_actor``)
+    y el rectángulo de la ventana que ocupaba. Si el actor se mueve,
+    cambia o desaparece, tanto el rectángulo anterior como el nuevo se
+    tienen que volver a pintar.
+
+    Los actores con imágenes que pueden cambiar por dentro (grillas,
+    superficies o textos) se vuelven a pintar en cada cuadro, salvo que
+    sean estáticos. Si cambia un actor estático se pinta toda la
+    ventana, porque hay que volver a armar la capa estática.
+    """
+
+    def __init__(self, pilas, escena):
+        self.pilas = pilas
+        self.escena = escena
+
+        # Relaciona el id de cada actor con (firma, rectangulo, estatico).
+        self._actores = {}
+        self._firma_de_escena = None
+        self._invalidaciones = 0
+
+    def invalidar(self):
+        """Hace que en el siguiente cuadro se vuelva a pintar todo."""
+        self._firma_de_escena = None
+        self._invalidaciones += 1
+
+    def obtener_firma(self):
+        """Retorna una tupla que cambia cada vez que cambia lo que se ve.
+
+        Permite saltear el dibujado de un cuadro si la firma es igual a
+        la del cuadro anterior. Retorna None si no se puede saber, por
+        ejemplo si algún actor tiene una imagen que cambia por dentro o
+        se está dibujando entre dos actualizaciones.
+        """
+        actores = [x for x in self.escena._actores.iterar_actores() if x._vivo]
+
+        if self.pilas.depurador._modos or not self._se_pueden_calcular_regiones(actores):
+            return None
+
+        interpola = self.pilas.widget.bucle_con_interpolacion
+        firmas = []
+
+        for actor in actores:
+            if self._cambia_por_dentro(actor) or interpola and self._esta_interpolando(actor):
+                return None
+
+            firmas.append(obtener_firma_de_actor(actor))
+
+        camara = self.escena.camara
+        return (id(self.escena), self._invalidaciones, camara.x, camara.y,
+                camara.escala, camara.rotacion, tuple(firmas))
+
+    def obtener_rectangulos(self):
+        """Retorna los rectángulos que se tienen que volver a pintar.
+
+        Cada rectángulo es una tupla (x, y, ancho, alto) relativa a la
+        esquina superior izquierda de la ventana, sin contemplar la
+        escala del widget. Si no se pueden calcular las regiones, por
+        ejemplo porque se movió la cámara, retorna None y se tiene que
+        pintar la ventana completa.
+        """
+        camara = self.escena.camara
+        firma_de_escena = (camara.x, camara.y, camara.escala, camara.rotacion)
+        actores = self.escena._actores.iterar_actores()
+
+        if (firma_de_escena != self._firma_de_escena or
+                camara.escala != 1 or camara.rotacion != 0 or
+                self.pilas.depurador._modos or
+                not self._se_pueden_calcular_regiones(actores)):
+            self._firma_de_escena = firma_de_escena
+            self._actores = dict((id(x), (obtener_firma_de_actor(x),
+                                          self._obtener_rectangulo(x),
+                                          x._estatico))
+                                 for x in actores if x._vivo)
+            return None
+
+        interpola = self.pilas.widget.bucle_con_interpolacion
+        anteriores = self._actores
+        self._actores = {}
+        rectangulos = []
+        pintar_todo = False
+
+        for actor in actores:
+            if not actor._vivo:
+                continue
+
+            identificador = id(actor)
+            firma = obtener_firma_de_actor(actor)
+            anterior = anteriores.pop(identificador, None)
+
+            if anterior and anterior[0] == firma and not (
+                    self._cambia_por_dentro(actor) or
+                    interpola and self._esta_interpolando(actor)):
+                self._actores[identificador] = anterior
+                continue
+
+            if actor._estatico:
+                # Si cambia algún actor estático se vuelve a armar la
+                # capa estática completa.
+                pintar_todo = True
+
+            rectangulo = self._obtener_rectangulo(actor)
+
+            if interpola and actor._transformacion_anterior:
+                # Mientras se interpola el actor se dibuja en algún
+                # punto entre su estado anterior y el actual.
+                x, y, _, escala_x, escala_y = actor._transformacion_anterior
+                rectangulo = self._unir(rectangulo, self._obtener_rectangulo(
+                    actor, x, y, escala_x, escala_y))
+
+            self._actores[identificador] = (firma, rectangulo, actor._estatico)
+            rectangulos.append(rectangulo)
+
+            if anterior:
+                rectangulos.append(anterior[1])
+
+        # Los actores que quedan ya no están en la escena.
+        for (_, rectangulo, estatico) in anteriores.itervalues():
+            rectangulos.append(rectangulo)
+            pintar_todo = pintar_todo or estatico
+
+        if pintar_todo:
+            return None
+
+        return rectangulos
+
+    def _se_pueden_calcular_regiones(self, actores):
+        # Los actores con hijos, los que se dibujan de forma personalizada
+        # y los que tienen una imagen repetida pueden pintar fuera de su
+        # rectángulo. Los estáticos no importan porque cualquier cambio
+        # en ellos hace pintar toda la ventana.
+        for actor in actores:
+            if actor._estatico:
+                continue
+
+            if actor._actores or type(actor).dibujar != Actor.dibujar:
+                return False
+
+            imagen = actor._imagen
+
+            if imagen.repetir_horizontal or imagen.repetir_vertical:
+                return False
+
+        return True
+
+    def _cambia_por_dentro(self, actor):
+        return not actor._estatico and type(actor._imagen) is not Imagen
+
+    def _esta_interpolando(self, actor):
+        anterior = actor._transformacion_anterior
+        return anterior is not None and anterior != (
+            actor._x, actor._y, actor._rotacion,
+            actor._escala_x, actor._escala_y)
+
+    def _obtener_rectangulo(self, actor, x=None, y=None, escala_x=None,
+                            escala_y=None):
+        """Retorna un rectángulo que contiene al actor en cualquier rotación.
+
+        Los parámetros opcionales permiten calcular el rectángulo de
+        una posición o escala distinta a la actual del actor.
+        """
+        if x is None:
+            x, y = actor._x, actor._y
+            escala_x, escala_y = actor._escala_x, actor._escala_y
+
+        centro_x, centro_y = self.pilas.obtener_centro_fisico()
+        ancho = actor._imagen.ancho()
+        alto = actor._imagen.alto()
+        dx, dy = actor._centro_x, actor._centro_y
+
+        escala = max(abs(escala_x), abs(escala_y))
+        radio = math.hypot(max(dx, ancho - dx), max(dy, alto - dy)) * escala
+
+        if actor.fijo:
+            x = centro_x + x
+            y = centro_y - y
+        else:
+            x = centro_x + x - self.escena.camara.x
+            y = centro_y - y + self.escena.camara.y
+
+        # Se agregan dos pixels de margen por el suavizado de bordes.
+        radio += 2
+        return (x - radio, y - radio, radio * 2, radio * 2)
+
+    def _unir(self, a, b):
+        x = min(a[0], b[0])
+        y = min(a[1], b[1])
+        derecha = max(a[0] + a[2], b[0] + b[2])
+        abajo = max(a[1] + a[3], b[1] + b[3])
+        return (x, y, derecha - x, abajo - y)
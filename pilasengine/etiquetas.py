@@ -26,17 +26,25 @@ class Etiquetas(object):
     def __init__(self):
         self.lista = []
 
+        # Copia de la lista para consultar etiquetas rápidamente
+        # al procesar colisiones.
+        self._conjunto = set()
+
     def pre_iniciar(self, *k, **kw):
         pass
 
     def obtener_como_lista(self):
         return self.lista
 
+    def obtener_como_conjunto(self):
+        return self._conjunto
+
     def agregar(self, etiqueta):
         if isinstance(etiqueta, str):
             etiqueta = etiqueta.lower()
             if not etiqueta in self.lista:
                 self.lista.append(etiqueta)
+                self._conjunto.add(etiqueta)
         else:
             raise Exception("Solo se permiten etiquetas que sean cadenas de texto, has enviado: " + str(etiqueta))
 
@@ -54,6 +62,7 @@ class Etiquetas(object):
 
             if etiqueta in self.lista:
                 self.lista.remove(etiqueta)
+                self._conjunto.discard(etiqueta)
             else:
                 raise Exception("No se encuentra esta etiqueta en el actor")
         else:
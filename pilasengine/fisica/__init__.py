@@ -9,7 +9,10 @@
 from pilasengine.fisica.contact_listener import ObjetosContactListener
 from pilasengine.fisica import rectangulo
 from pilasengine.fisica import circulo
+from pilasengine.fisica.rayo import ConsultaDeRayo
+from pilasengine.fisica.rayo import ConsultaDePunto
 from pilasengine.fisica.constantes import constante_de_movimiento
+from pilasengine import utils
 import figura
 
 PPM = 30
@@ -211,16 +214,52 @@ class Fisica(object):
         if dy < 0:
             raise Exception("El valor de 'dy' debe ser positivo, ahora vale '%f'." %(dy))
 
-        delta = 0
+        return self.lanzar_rayo(x, y, 0, -1, dy)
 
-        while delta < dy:
+    def lanzar_rayo(self, x, y, dx, dy, maximo):
+        """Retorna la distancia en pixels hasta la primer figura en una dirección.
 
-            if self.obtener_cuerpos_en(x, y-delta):
-                return delta
+        Si el rayo no encuentra ninguna figura a menos de 'maximo'
+        pixels retorna 'maximo', y si el origen está dentro de una
+        figura retorna 0. Las figuras de tipo sensor se ignoran.
 
-            delta += 1
+        :param x: posición horizontal del origen del rayo.
+        :param y: posición vertical del origen del rayo.
+        :param dx: componente horizontal de la dirección del rayo.
+        :param dy: componente vertical de la dirección del rayo.
+        :param maximo: largo máximo del rayo en pixels.
+        """
+        largo = math.hypot(dx, dy)
+
+        if not self.mundo or not largo or maximo <= 0:
+            return maximo
+
+        origen = (utils.convertir_a_metros(x), utils.convertir_a_metros(y))
+        destino = (utils.convertir_a_metros(x + dx * maximo / largo),
+                   utils.convertir_a_metros(y + dy * maximo / largo))
+
+        if self._hay_una_figura_en(origen):
+            return 0
+
+        consulta = ConsultaDeRayo()
+        self.mundo.RayCast(consulta, origen, destino)
+
+        if consulta.fixture is None:
+            return maximo
+
+        return consulta.fraccion * maximo
+
+    def _hay_una_figura_en(self, punto):
+        # RayCast no informa las figuras que contienen al origen del
+        # rayo, así que se consultan aparte.
+        margen = 0.001
+        AABB = box2d.b2AABB()
+        AABB.lowerBound = (punto[0] - margen, punto[1] - margen)
+        AABB.upperBound = (punto[0] + margen, punto[1] + margen)
 
-        return delta
+        consulta = ConsultaDePunto(punto)
+        self.mundo.QueryAABB(consulta, AABB)
+        return consulta.fixture is not None
 
     def obtener_cuerpos_en(self, x, y):
         """Retorna una lista de cuerpos que se encuentran en la posicion (x, y) o retorna una lista vacia [].
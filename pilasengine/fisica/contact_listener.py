@@ -60,10 +60,10 @@ class ObjetosContactListener(box2d.b2ContactListener):
         #    self._colisiones_en_curso.append(info_colision)
 
     def EndContact(self, *args, **kwargs):
-        # TODO: informar el fin de la colisión.
         fixture_1 = args[0].fixtureA
         fixture_2 = args[0].fixtureB
         self.detener_figuras_estaticas(args[0])
+        self.pilas.colisiones.notificar_fin_de_colision(fixture_1, fixture_2)
         self.eliminar_colision(fixture_1, fixture_2)
 
 
@@ -0,0 +1,59 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import Box2D as box2d
+
+
+class ConsultaDeRayo(box2d.b2RayCastCallback):
+    """Busca la primer figura que atraviesa un rayo.
+
+    Box2D llama a ``ReportFixture`` por cada figura que toca el rayo,
+    en cualquier orden. Al retornar la fracción de la figura encontrada
+    el rayo se recorta hasta ese punto, así que al terminar la consulta
+    queda guardada la figura mas cercana al origen.
+    """
+
+    def __init__(self, ignorar_sensores=True):
+        box2d.b2RayCastCallback.__init__(self)
+        self.ignorar_sensores = ignorar_sensores
+        self.fixture = None
+        self.punto = None
+        self.fraccion = 1.0
+
+    def ReportFixture(self, fixture, point, normal, fraction):
+        if self.ignorar_sensores and fixture.sensor:
+            return -1
+
+        self.fixture = fixture
+        self.punto = (point[0], point[1])
+        self.fraccion = fraction
+        return fraction
+
+
+class ConsultaDePunto(box2d.b2QueryCallback):
+    """Busca una figura que contenga a un punto.
+
+    Se usa junto a ``ConsultaDeRayo``, porque Box2D no informa las
+    figuras que contienen al origen del rayo.
+    """
+
+    def __init__(self, punto, ignorar_sensores=True):
+        box2d.b2QueryCallback.__init__(self)
+        self.punto = punto
+        self.ignorar_sensores = ignorar_sensores
+        self.fixture = None
+
+    def ReportFixture(self, fixture):
+        if self.ignorar_sensores and fixture.sensor:
+            return True
+
+        if fixture.TestPoint(self.punto):
+            self.fixture = fixture
+            return False
+
+        return True
@@ -88,7 +88,7 @@ class Capa(object):
         dy = 0
         x_inicial = - ancho / 2
         y_inicial = - self.imagen.alto() / 2
-        painter.drawTiledPixmap(x_inicial, y_inicial + self.y, ancho, self.imagen.alto(), self.imagen._imagen,
+        painter.drawTiledPixmap(x_inicial, y_inicial + self.y, ancho, self.imagen.alto(), self.imagen.obtener_pixmap(),
                                 abs(dx) % self.imagen.ancho(), dy % self.imagen.alto())
 
     def mover_horizontal(self, dx):
@@ -33,7 +33,7 @@ class Fondo(actor.Actor):
 
     def definir_z(self, z):
         self._z = z
-        self.pilas.escena_actual()._actores.sort()
+        self.pilas.escena_actual()._actores.reubicar(self)
 
     z = property(obtener_z, definir_z,
                  doc="Define lejania respecto del observador.")
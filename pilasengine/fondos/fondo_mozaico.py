@@ -20,7 +20,7 @@ class FondoMozaico(Fondo):
 
         ancho, alto = self.pilas.obtener_area()
         painter.drawTiledPixmap(-ancho/2, -alto/2, ancho, alto,
-                                self.imagen._imagen,
+                                self.imagen.obtener_pixmap(),
                                 x % self.imagen.ancho(), 
                                 y % self.imagen.alto())
 
@@ -25,7 +25,7 @@ class Galaxia(FondoMozaico):
 
         ancho, alto = self.pilas.obtener_area()
         painter.drawTiledPixmap(-ancho/2, -alto/2, ancho, alto,
-                                self.imagen._imagen,
+                                self.imagen.obtener_pixmap(),
                                 x % self.imagen.ancho(), 
                                 y % self.imagen.alto())
 
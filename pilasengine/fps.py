@@ -52,6 +52,71 @@ class FPS(object):
             self.cuadros_por_segundo_numerico = self.cuadros
             self.cuadros = 0
 
+    def obtener_fraccion_del_paso(self):
+        """Retorna cuanto tiempo pasó desde la última actualización lógica.
+
+        El resultado es una fracción entre 0 y 1 de la duración de un
+        cuadro, donde 1 significa que está por ocurrir la siguiente
+        actualización.
+        """
+        anterior = self.siguiente - self.frecuencia
+        fraccion = (self.timer.elapsed() - anterior) / self.frecuencia
+        return min(max(fraccion, 0.0), 1.0)
+
     def obtener_cuadros_por_segundo(self):
         "Retorna la cantidad de cuadros por segundo."
-        return self.cuadros_por_segundo
\ No newline at end of file
+        return self.cuadros_por_segundo
+
+class FPSConAcumulador(FPS):
+    """Controlador de tiempo que acumula la duración real de cada cuadro.
+
+    En cada llamada a ``actualizar`` se suma el tiempo transcurrido y se
+    retorna cuantas actualizaciones lógicas de duración fija entran en
+    ese tiempo. Lo que sobra queda acumulado para el siguiente cuadro, y
+    se puede consultar con ``obtener_fraccion_del_paso`` para dibujar a
+    los actores entre dos actualizaciones.
+
+    Si el equipo no llega a realizar todas las actualizaciones, solo se
+    hacen ``maximo_de_pasos`` y el resto del tiempo se descarta. Así un
+    equipo lento no se atrasa cada vez mas intentando recuperarse.
+    """
+
+    def __init__(self, fps, maximo_de_pasos=5):
+        """Inicia el administrador de cuadros por segundo.
+
+        :param fps: Cantidad de actualizaciones lógicas por segundo.
+        :param maximo_de_pasos: Máximo de actualizaciones por cuadro.
+        """
+        FPS.__init__(self, fps)
+        self.maximo_de_pasos = maximo_de_pasos
+        self.pasos_descartados = 0
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Olvida el tiempo acumulado, por ejemplo al salir de la pausa."""
+        self.acumulado = 0.0
+        self.ultima_lectura = self.timer.elapsed()
+
+    def actualizar(self):
+        actual = self.timer.elapsed()
+        self.acumulado += actual - self.ultima_lectura
+        self.ultima_lectura = actual
+        self._procesar_fps(actual)
+
+        cantidad = int(self.acumulado / self.frecuencia)
+
+        if cantidad > self.maximo_de_pasos:
+            self.pasos_descartados += cantidad - self.maximo_de_pasos
+            cantidad = self.maximo_de_pasos
+            self.acumulado %= self.frecuencia
+        else:
+            self.acumulado -= cantidad * self.frecuencia
+
+        if cantidad:
+            self.cuadros += 1
+
+        return cantidad
+
+    def obtener_fraccion_del_paso(self):
+        acumulado = self.acumulado + self.timer.elapsed() - self.ultima_lectura
+        return min(max(acumulado / self.frecuencia, 0.0), 1.0)
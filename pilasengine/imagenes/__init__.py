@@ -8,6 +8,10 @@
 import os
 from PyQt4 import QtGui
 import pilasengine
+from pilasengine import colores
+from pilasengine.imagenes.cache import cache_de_imagenes
+from pilasengine.imagenes.cache import cache_de_medidas_de_texto
+from pilasengine.imagenes.cache import cache_de_textos
 
 
 class Imagenes(object):
@@ -20,17 +24,161 @@ class Imagenes(object):
         ruta_a_imagen = self.pilas.obtener_ruta_al_recurso(ruta_a_imagen)
         return imagen.Imagen(self.pilas, ruta_a_imagen)
 
+    def precargar(self, *rutas):
+        """Carga imagenes en la cache para que esten listas al usarse.
+
+        Es útil llamar a esta función antes de comenzar una escena, así
+        los actores que se crean durante el juego no tienen que leer
+        archivos desde el disco::
+
+            pilas.imagenes.precargar("disparos/bola_amarilla.png", "nave.png")
+
+        :param rutas: Rutas a las imagenes que se quieren precargar.
+        """
+        for ruta in rutas:
+            ruta_a_imagen = self.pilas.obtener_ruta_al_recurso(ruta)
+            cache_de_imagenes.obtener(ruta_a_imagen)
+
+    def vaciar_cache(self):
+        """Descarta todas las imagenes almacenadas en la cache."""
+        import grilla
+        cache_de_imagenes.vaciar()
+        cache_de_textos.vaciar()
+        cache_de_medidas_de_texto.vaciar()
+        grilla.vaciar_hojas()
+
+    def definir_limite_de_cache(self, limite):
+        """Define cuantos bytes pueden ocupar las imagenes en la cache."""
+        cache_de_imagenes.definir_limite(limite)
+
+    def obtener_estadisticas_de_cache(self):
+        """Retorna un diccionario con aciertos, fallos y bytes en uso."""
+        return cache_de_imagenes.obtener_estadisticas()
+
+    def obtener_estadisticas_de_textos(self):
+        """Retorna los aciertos y fallos de las caches de textos.
+
+        El resultado es un diccionario con las claves 'medidas' (tamaños
+        de textos) e 'imagenes' (textos ya dibujados).
+        """
+        return {
+            'medidas': cache_de_medidas_de_texto.obtener_estadisticas(),
+            'imagenes': cache_de_textos.obtener_estadisticas(),
+        }
+
+    def crear_atlas(self, rutas, tamano=2048, registrar=True):
+        """Agrupa varias imagenes y grillas en unas pocas texturas grandes.
+
+        Por ejemplo:
+
+            >>> atlas = pilas.imagenes.crear_atlas(["nave.png", "grillas/explosion.png"])
+
+        Ver ``AtlasDeImagenes`` para guardar el atlas y cargarlo luego
+        con ``cargar_atlas``.
+
+        :param rutas: Lista de rutas a las imagenes.
+        :param tamano: Ancho y alto de cada página del atlas.
+        :param registrar: Si es True, las imagenes que se carguen luego se toman del atlas.
+        """
+        import atlas_de_imagenes
+        import grilla
+        atlas = atlas_de_imagenes.AtlasDeImagenes(tamano)
+        atlas.agregar_imagenes(rutas, self.pilas.obtener_ruta_al_recurso)
+
+        if registrar:
+            atlas_de_imagenes.registrar(atlas, self.pilas.obtener_ruta_al_recurso)
+            grilla.vaciar_hojas()
+
+        return atlas
+
+    def cargar_atlas(self, ruta_del_indice):
+        """Carga un atlas guardado con ``AtlasDeImagenes.guardar``.
+
+        A partir de ese momento las imagenes que contiene se toman del
+        atlas en lugar de leerse desde sus archivos.
+        """
+        import atlas_de_imagenes
+        import grilla
+        ruta_del_indice = self.pilas.obtener_ruta_al_recurso(ruta_del_indice)
+        atlas = atlas_de_imagenes.cargar(ruta_del_indice)
+        atlas_de_imagenes.registrar(atlas, self.pilas.obtener_ruta_al_recurso)
+        grilla.vaciar_hojas()
+        return atlas
+
+    def olvidar_atlas(self):
+        """Hace que las imagenes se vuelvan a leer desde sus archivos."""
+        import atlas_de_imagenes
+        import grilla
+        atlas_de_imagenes.olvidar()
+        grilla.vaciar_hojas()
+
     def crear_superficie(self, ancho, alto):
         import superficie
         return superficie.Superficie(self.pilas, ancho, alto)
 
     cargar_superficie = crear_superficie
 
+    def crear_superficie_por_partes(self, ancho, alto, tamano_de_parte=512):
+        """Genera una superficie muy grande que se dibuja por partes.
+
+        Es útil para escenarios grandes, como los mapas, porque solo
+        ocupan memoria las partes que se ven en pantalla.
+        """
+        import superficie_por_partes
+        return superficie_por_partes.SuperficiePorPartes(self.pilas, ancho, alto,
+                                                         tamano_de_parte)
+
     def crear_texto(self, cadena_de_texto, magnitud, vertical, fuente,
-                    color, ancho):
+                    color, ancho, usar_atlas=False, usar_cache=False):
+        """Genera una imagen con un texto.
+
+        :param usar_atlas: Dibuja el texto desde un atlas de caracteres (ver
+                           ``crear_texto_de_atlas``).
+        :param usar_cache: Comparte la imagen con otros textos iguales. Es
+                           útil para etiquetas que no cambian, como las
+                           opciones de un menú.
+        """
+        if usar_atlas:
+            return self.crear_texto_de_atlas(cadena_de_texto, magnitud,
+                                             vertical, fuente, color, ancho)
+
         import texto
         return texto.Texto(self.pilas, cadena_de_texto, magnitud, vertical,
-                           fuente, color, ancho)
+                           fuente, color, ancho, usar_cache)
+
+    def medir_texto(self, cadena_de_texto, magnitud=10, vertical=False,
+                    fuente=None, ancho=0):
+        """Retorna el ancho y alto de un texto sin generar una imagen."""
+        import texto
+        return texto.medir_texto(cadena_de_texto, magnitud, vertical, fuente,
+                                 ancho)
+
+    def crear_texto_de_atlas(self, cadena_de_texto, magnitud, vertical,
+                             fuente, color, ancho):
+        """Genera un texto que se dibuja usando un atlas de caracteres.
+
+        Se comporta como el resultado de ``crear_texto``, pero cambiar
+        su contenido con ``definir_texto`` no genera imagenes nuevas.
+        """
+        import texto_de_atlas
+        atlas = self.obtener_atlas_de_glifos(magnitud, fuente, color)
+        return texto_de_atlas.TextoDeAtlas(self.pilas, cadena_de_texto, atlas,
+                                           vertical, ancho)
+
+    def obtener_atlas_de_glifos(self, magnitud, fuente=None,
+                                color=colores.blanco):
+        """Retorna el atlas compartido para una fuente, magnitud y color."""
+        import superficie
+        import atlas_de_glifos
+
+        if fuente:
+            nombre_de_fuente = superficie.cargar_fuente(fuente)
+        else:
+            nombre_de_fuente = QtGui.QFont().family()
+
+        r, g, b, _ = colores.generar_color_desde_texto(color).obtener_componentes()
+        return atlas_de_glifos.obtener_atlas(nombre_de_fuente, magnitud,
+                                             QtGui.QColor(r, g, b))
 
     def cargar_grilla(self, ruta, columnas=1, filas=1):
         """Representa una grilla de imagenes con varios cuadros de animación.
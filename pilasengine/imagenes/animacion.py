@@ -6,6 +6,7 @@
 #
 # Website - http://www.pilas-engine.com.ar
 import os
+import copy
 
 from grilla import Grilla
 
@@ -53,6 +54,11 @@ class Animacion(Grilla):
 
         return ha_avanzado
 
+    def crear_cursor(self):
+        # Las animaciones recuerdan cual se está reproduciendo, así que
+        # cada actor necesita una copia completa (igual que antes).
+        return copy.copy(self)
+
     def __repr__(self):
         nombre_imagen = os.path.basename(self.ruta_original)
         return "<Animacion del archivo '%s' (filas: %d, columnas: %d)>" % (nombre_imagen, self.filas, self.columnas)
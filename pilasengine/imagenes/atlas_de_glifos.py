@@ -0,0 +1,136 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+from PyQt4 import QtGui
+from PyQt4 import QtCore
+
+# Ancho del pixmap donde se dibujan los caracteres. El alto crece a
+# medida que se agregan caracteres nuevos.
+ANCHO_DEL_ATLAS = 512
+
+# Pixels libres alrededor de cada caracter, así el suavizado de un
+# caracter no se mezcla con el de su vecino.
+MARGEN = 1
+
+
+class AtlasDeGlifos(object):
+    """Guarda en un solo pixmap los caracteres de una fuente.
+
+    Cada atlas corresponde a una fuente, magnitud y color. Los
+    caracteres se dibujan una sola vez, la primera vez que se usan, y
+    luego los textos se arman copiando partes de este pixmap (ver
+    ``TextoDeAtlas``).
+
+    Cambiar un texto que usa el atlas solo requiere calcular la
+    posición de cada caracter, sin crear ni pintar pixmaps nuevos.
+    """
+
+    def __init__(self, nombre_de_fuente, magnitud, color):
+        self.fuente = QtGui.QFont(nombre_de_fuente, magnitud)
+        self.metricas = QtGui.QFontMetrics(self.fuente)
+        self.alto_de_linea = self.metricas.height()
+        self.color = color
+
+        # Relaciona cada caracter con (x, y, ancho, alto, desplazamiento,
+        # avance). Los primeros cuatro valores indican la parte del pixmap
+        # que ocupa, y el desplazamiento es la distancia horizontal entre
+        # la posición del caracter y el borde izquierdo de esa parte.
+        self._glifos = {}
+
+        self._pixmap = None
+        self._x = 0
+        self._y = 0
+        self.reconstrucciones = 0
+
+    def obtener_pixmap(self):
+        return self._pixmap
+
+    def obtener_glifo(self, caracter):
+        """Retorna los datos de un caracter, dibujándolo si es nuevo."""
+        glifo = self._glifos.get(caracter)
+
+        if glifo is None:
+            glifo = self._agregar_glifo(caracter)
+
+        return glifo
+
+    def obtener_avance(self, caracter):
+        return self.obtener_glifo(caracter)[5]
+
+    def _agregar_glifo(self, caracter):
+        avance = self.metricas.width(caracter)
+        rectangulo = self.metricas.boundingRect(caracter)
+
+        # Algunos caracteres (como la 'f' en cursiva) se dibujan un poco
+        # fuera del espacio que avanzan, así que se guarda todo el dibujo.
+        izquierda = min(0, rectangulo.left()) - MARGEN
+        derecha = max(avance, rectangulo.right() + 1) + MARGEN
+        ancho = derecha - izquierda
+        alto = self.alto_de_linea + MARGEN * 2
+
+        if self._pixmap is None:
+            self._ampliar(alto * 4)
+
+        if self._x + ancho > ANCHO_DEL_ATLAS:
+            self._x = 0
+            self._y += alto
+
+        if self._y + alto > self._pixmap.height():
+            self._ampliar(self._pixmap.height() * 2)
+
+        x, y = self._x, self._y
+        painter = QtGui.QPainter(self._pixmap)
+        painter.setRenderHint(QtGui.QPainter.TextAntialiasing, True)
+        painter.setFont(self.fuente)
+        painter.setPen(self.color)
+        painter.drawText(x - izquierda, y + MARGEN + self.metricas.ascent(),
+                         caracter)
+        painter.end()
+
+        self._x += ancho
+        glifo = (x, y, ancho, alto, izquierda, avance)
+        self._glifos[caracter] = glifo
+        return glifo
+
+    def _ampliar(self, alto):
+        pixmap = QtGui.QPixmap(ANCHO_DEL_ATLAS, alto)
+        pixmap.fill(QtCore.Qt.transparent)
+
+        if self._pixmap is not None:
+            painter = QtGui.QPainter(pixmap)
+            painter.drawPixmap(0, 0, self._pixmap)
+            painter.end()
+
+        self._pixmap = pixmap
+        self.reconstrucciones += 1
+
+    def __repr__(self):
+        return "<AtlasDeGlifos de '%s' %d con %d caracteres>" % (
+            self.fuente.family(), self.fuente.pointSize(), len(self._glifos))
+
+
+# Atlas compartidos por todos los textos, de la forma
+# {(nombre_de_fuente, magnitud, color en formato rgba): atlas}.
+_atlas = {}
+
+
+def obtener_atlas(nombre_de_fuente, magnitud, color):
+    """Retorna el atlas para una fuente, magnitud y color.
+
+    :param nombre_de_fuente: El nombre de la familia de la fuente.
+    :param magnitud: El tamaño de la fuente.
+    :param color: Un QColor.
+    """
+    clave = (nombre_de_fuente, magnitud, color.rgba())
+    atlas = _atlas.get(clave)
+
+    if atlas is None:
+        atlas = AtlasDeGlifos(nombre_de_fuente, magnitud, color)
+        _atlas[clave] = atlas
+
+    return atlas
+
@@ -0,0 +1,296 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+import os
+import json
+
+from PyQt4 import QtGui
+from PyQt4 import QtCore
+
+# Pixels transparentes alrededor de cada imagen, así al ampliar o rotar
+# una imagen no se mezclan los bordes de sus vecinas.
+MARGEN = 1
+
+
+class EmpaquetadorSkyline(object):
+    """Ubica rectángulos dentro de un área sin que se superpongan.
+
+    Recuerda el "horizonte" que forman los rectángulos ya ubicados, como
+    una lista de tramos (x, y, ancho), y coloca cada rectángulo nuevo lo
+    mas abajo posible (y luego lo mas a la izquierda posible) sobre él.
+    """
+
+    def __init__(self, ancho, alto):
+        self.ancho = ancho
+        self.alto = alto
+        self._tramos = [(0, 0, ancho)]
+
+    def ubicar(self, ancho, alto):
+        """Reserva lugar para un rectángulo y retorna su posición (x, y).
+
+        Retorna None si el rectángulo no entra en el área.
+        """
+        mejor = None
+
+        for (indice, (x, _, _)) in enumerate(self._tramos):
+            y = self._obtener_altura(indice, ancho)
+
+            if y is None or y + alto > self.alto:
+                continue
+
+            if mejor is None or (y + alto, x) < mejor[0]:
+                mejor = ((y + alto, x), indice, x, y)
+
+        if mejor is None:
+            return None
+
+        _, indice, x, y = mejor
+        self._agregar_tramo(indice, x, y + alto, ancho)
+        return (x, y)
+
+    def _obtener_altura(self, indice, ancho):
+        """Retorna a qué altura quedaría un rectángulo que comienza en el tramo."""
+        x = self._tramos[indice][0]
+
+        if x + ancho > self.ancho:
+            return None
+
+        y = 0
+        restante = ancho
+
+        while restante > 0:
+            _, altura_del_tramo, ancho_del_tramo = self._tramos[indice]
+            y = max(y, altura_del_tramo)
+            restante -= ancho_del_tramo
+            indice += 1
+
+        return y
+
+    def _agregar_tramo(self, indice, x, y, ancho):
+        self._tramos.insert(indice, (x, y, ancho))
+        fin = x + ancho
+        siguiente = indice + 1
+
+        # Recorta o quita los tramos que quedaron debajo del nuevo.
+        while siguiente < len(self._tramos):
+            x_del_tramo, y_del_tramo, ancho_del_tramo = self._tramos[siguiente]
+
+            if x_del_tramo >= fin:
+                break
+
+            recorte = fin - x_del_tramo
+
+            if ancho_del_tramo <= recorte:
+                del self._tramos[siguiente]
+            else:
+                self._tramos[siguiente] = (fin, y_del_tramo,
+                                           ancho_del_tramo - recorte)
+                break
+
+        # Une los tramos vecinos que quedaron a la misma altura.
+        indice = 0
+
+        while indice < len(self._tramos) - 1:
+            x_a, y_a, ancho_a = self._tramos[indice]
+            _, y_b, ancho_b = self._tramos[indice + 1]
+
+            if y_a == y_b:
+                self._tramos[indice] = (x_a, y_a, ancho_a + ancho_b)
+                del self._tramos[indice + 1]
+            else:
+                indice += 1
+
+
+class AtlasDeImagenes(object):
+    """Agrupa muchas imagenes en unas pocas páginas de gran tamaño.
+
+    Con aceleración de video cada pixmap distinto es una textura que
+    se tiene que enviar y activar por separado. Si las imagenes de un
+    juego están en un atlas, los actores comparten unas pocas texturas
+    y cada imagen solo recuerda que parte de la página le corresponde.
+
+    Las grillas se guardan completas, así sus cuadros quedan juntos.
+
+    El atlas se puede armar antes de distribuir el juego y guardar en
+    disco, por ejemplo:
+
+        >>> atlas = pilas.imagenes.crear_atlas(["nave.png", "grillas/explosion.png"])
+        >>> atlas.guardar("atlas/juego.json")
+
+    y luego solo resta cargarlo al iniciar el juego:
+
+        >>> pilas.imagenes.cargar_atlas("atlas/juego.json")
+    """
+
+    def __init__(self, tamano=2048):
+        self.tamano = tamano
+        self._paginas = []
+        self._empaquetadores = []
+        self._pixmaps = {}
+
+        # Relaciona el nombre de cada imagen con (pagina, x, y, ancho, alto).
+        self.ubicaciones = {}
+
+    def agregar(self, nombre, imagen):
+        """Copia una imagen dentro del atlas.
+
+        :param nombre: El nombre con el que se buscará la imagen, por ejemplo 'nave.png'.
+        :param imagen: Un QImage con el contenido de la imagen.
+        """
+        ancho = imagen.width()
+        alto = imagen.height()
+        ancho_reservado = ancho + MARGEN * 2
+        alto_reservado = alto + MARGEN * 2
+
+        if ancho_reservado > self.tamano or alto_reservado > self.tamano:
+            raise Exception("La imagen '%s' es mas grande que las paginas del atlas." % (nombre))
+
+        for (pagina, empaquetador) in enumerate(self._empaquetadores):
+            posicion = empaquetador.ubicar(ancho_reservado, alto_reservado)
+
+            if posicion:
+                break
+        else:
+            pagina = self._agregar_pagina()
+            posicion = self._empaquetadores[pagina].ubicar(ancho_reservado,
+                                                           alto_reservado)
+
+        x = posicion[0] + MARGEN
+        y = posicion[1] + MARGEN
+
+        painter = QtGui.QPainter(self._paginas[pagina])
+        painter.drawImage(x, y, imagen)
+        painter.end()
+
+        self._pixmaps.pop(pagina, None)
+        self.ubicaciones[nombre] = (pagina, x, y, ancho, alto)
+
+    def agregar_imagenes(self, nombres, obtener_ruta=None):
+        """Lee varias imagenes desde disco y las agrega al atlas.
+
+        Las imagenes se ubican de la mas alta a la mas baja, lo que
+        suele dejar menos espacio sin usar.
+
+        :param nombres: Los nombres de las imagenes.
+        :param obtener_ruta: Función que convierte un nombre en la ruta al archivo.
+        """
+        imagenes = []
+
+        for nombre in nombres:
+            ruta = obtener_ruta(nombre) if obtener_ruta else nombre
+            imagen = QtGui.QImage(ruta)
+
+            if imagen.isNull():
+                raise IOError("No se puede leer la imagen '%s'." % (ruta))
+
+            imagenes.append((nombre, imagen))
+
+        imagenes.sort(key=lambda par: (-par[1].height(), -par[1].width()))
+
+        for (nombre, imagen) in imagenes:
+            self.agregar(nombre, imagen)
+
+    def obtener(self, nombre):
+        """Retorna el pixmap de la página y el rectángulo (x, y, ancho, alto) de una imagen."""
+        pagina, x, y, ancho, alto = self.ubicaciones[nombre]
+        return (self._obtener_pixmap(pagina), (x, y, ancho, alto))
+
+    def obtener_cantidad_de_paginas(self):
+        return len(self._paginas)
+
+    def guardar(self, ruta_del_indice):
+        """Guarda las páginas como archivos png junto a un índice en formato json.
+
+        :param ruta_del_indice: Ruta al archivo índice, por ejemplo 'atlas/juego.json'.
+        """
+        base = os.path.splitext(ruta_del_indice)[0]
+        archivos = []
+
+        for (numero, pagina) in enumerate(self._paginas):
+            ruta = "%s_%d.png" % (base, numero)
+            pagina.save(ruta, "PNG")
+            archivos.append(os.path.basename(ruta))
+
+        archivo = open(ruta_del_indice, 'wt')
+        json.dump({'tamano': self.tamano, 'paginas': archivos,
+                   'imagenes': self.ubicaciones}, archivo, indent=2)
+        archivo.close()
+
+    def _agregar_pagina(self):
+        pagina = QtGui.QImage(self.tamano, self.tamano,
+                              QtGui.QImage.Format_ARGB32_Premultiplied)
+        pagina.fill(QtCore.Qt.transparent)
+        self._paginas.append(pagina)
+        self._empaquetadores.append(EmpaquetadorSkyline(self.tamano,
+                                                        self.tamano))
+        return len(self._paginas) - 1
+
+    def _obtener_pixmap(self, pagina):
+        pixmap = self._pixmaps.get(pagina)
+
+        if pixmap is None:
+            pixmap = QtGui.QPixmap.fromImage(self._paginas[pagina])
+            self._pixmaps[pagina] = pixmap
+
+        return pixmap
+
+    def __repr__(self):
+        return "<AtlasDeImagenes con %d imagenes en %d paginas>" % (
+            len(self.ubicaciones), len(self._paginas))
+
+
+def cargar(ruta_del_indice):
+    """Lee un atlas guardado con ``AtlasDeImagenes.guardar``."""
+    archivo = open(ruta_del_indice, 'rt')
+    indice = json.load(archivo)
+    archivo.close()
+
+    directorio = os.path.dirname(ruta_del_indice)
+    atlas = AtlasDeImagenes(indice['tamano'])
+
+    for nombre in indice['paginas']:
+        pagina = QtGui.QImage(os.path.join(directorio, nombre))
+
+        if pagina.isNull():
+            raise IOError("No se puede leer la pagina de atlas '%s'." % (nombre))
+
+        atlas._paginas.append(pagina)
+
+    for (nombre, ubicacion) in indice['imagenes'].items():
+        atlas.ubicaciones[nombre] = tuple(ubicacion)
+
+    return atlas
+
+
+# Imagenes que se toman de un atlas en lugar de leerse del disco, de
+# la forma {ruta_completa: (atlas, nombre)}.
+_imagenes_en_atlas = {}
+
+
+def registrar(atlas, obtener_ruta):
+    """Hace que las imagenes del atlas se usen al cargar sus archivos.
+
+    :param obtener_ruta: Función que convierte cada nombre del atlas en la ruta completa al archivo.
+    """
+    for nombre in atlas.ubicaciones:
+        _imagenes_en_atlas[obtener_ruta(nombre)] = (atlas, nombre)
+
+
+def buscar(ruta):
+    """Retorna el pixmap y el rectángulo de una imagen, o None si no está en ningún atlas."""
+    encontrado = _imagenes_en_atlas.get(ruta)
+
+    if encontrado is None:
+        return None
+
+    atlas, nombre = encontrado
+    return atlas.obtener(nombre)
+
+
+def olvidar():
+    """Vuelve a cargar las imagenes desde sus archivos."""
+    _imagenes_en_atlas.clear()
@@ -0,0 +1,167 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+import collections
+
+from PyQt4 import QtGui
+
+# Cantidad de bytes que puede ocupar la cache antes de descartar imagenes.
+LIMITE_POR_OMISION = 64 * 1024 * 1024
+
+
+class CacheDeImagenes(object):
+    """Almacena los pixmaps decodificados de las imagenes cargadas.
+
+    Cada pixmap se guarda usando como clave la ruta completa al
+    archivo, así varios actores que usan la misma imagen comparten
+    el mismo pixmap en lugar de leer y decodificar el archivo
+    nuevamente.
+
+    Cuando los pixmaps almacenados superan el limite de bytes se
+    descartan los que se usaron hace mas tiempo (LRU).
+    """
+
+    def __init__(self, limite=LIMITE_POR_OMISION):
+        self._pixmaps = collections.OrderedDict()
+        self._bytes_en_uso = 0
+        self.limite = limite
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, ruta):
+        """Retorna el pixmap asociado a la ruta, cargándolo si es necesario.
+
+        :param ruta: Ruta completa (ya resuelta) al archivo de imagen.
+        """
+        pixmap = self.buscar(ruta)
+
+        if pixmap is None:
+            pixmap = self._cargar_pixmap(ruta)
+            self._almacenar(ruta, pixmap)
+
+        return pixmap
+
+    def buscar(self, clave):
+        """Retorna el pixmap almacenado con esa clave, o None si no está."""
+        if clave in self._pixmaps:
+            self.aciertos += 1
+            pixmap, bytes_del_pixmap = self._pixmaps.pop(clave)
+            self._pixmaps[clave] = (pixmap, bytes_del_pixmap)
+            return pixmap
+
+        self.fallos += 1
+        return None
+
+    def agregar(self, clave, pixmap):
+        """Almacena un pixmap generado por el motor, como un texto dibujado."""
+        self._almacenar(clave, pixmap)
+
+    def contiene(self, ruta):
+        return ruta in self._pixmaps
+
+    def vaciar(self):
+        """Descarta todos los pixmaps almacenados y reinicia los contadores."""
+        self._pixmaps.clear()
+        self._bytes_en_uso = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def definir_limite(self, limite):
+        """Cambia la cantidad maxima de bytes que puede ocupar la cache.
+
+        :param limite: Cantidad de bytes, por ejemplo ``32 * 1024 * 1024``.
+        """
+        self.limite = limite
+        self._descartar_excedente()
+
+    def obtener_estadisticas(self):
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'imagenes': len(self._pixmaps),
+            'bytes': self._bytes_en_uso,
+            'limite': self.limite,
+        }
+
+    def _cargar_pixmap(self, ruta):
+        return QtGui.QPixmap(ruta)
+
+    def _calcular_bytes(self, pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) / 8
+
+    def _almacenar(self, ruta, pixmap):
+        bytes_del_pixmap = self._calcular_bytes(pixmap)
+        self._pixmaps[ruta] = (pixmap, bytes_del_pixmap)
+        self._bytes_en_uso += bytes_del_pixmap
+        self._descartar_excedente()
+
+    def _descartar_excedente(self):
+        # Siempre se conserva la ultima imagen cargada, aunque por si
+        # sola supere el limite.
+        while self._bytes_en_uso > self.limite and len(self._pixmaps) > 1:
+            _, (_, bytes_del_pixmap) = self._pixmaps.popitem(last=False)
+            self._bytes_en_uso -= bytes_del_pixmap
+
+    def __repr__(self):
+        return "<CacheDeImagenes con %d imagenes (%d aciertos, %d fallos)>" % (
+            len(self._pixmaps), self.aciertos, self.fallos)
+
+
+class CacheDeMedidas(object):
+    """Recuerda el tamaño de los textos que ya se midieron.
+
+    Medir un texto requiere pintarlo, así que se guarda el resultado
+    de las últimas mediciones. Cuando se supera el limite de textos
+    se descartan los que se usaron hace mas tiempo (LRU).
+    """
+
+    def __init__(self, limite=1024):
+        self._medidas = collections.OrderedDict()
+        self.limite = limite
+        self.aciertos = 0
+        self.fallos = 0
+
+    def buscar(self, clave):
+        """Retorna la medida (ancho, alto) guardada, o None si no está."""
+        medida = self._medidas.pop(clave, None)
+
+        if medida is None:
+            self.fallos += 1
+            return None
+
+        self.aciertos += 1
+        self._medidas[clave] = medida
+        return medida
+
+    def agregar(self, clave, medida):
+        self._medidas[clave] = medida
+
+        while len(self._medidas) > self.limite:
+            self._medidas.popitem(last=False)
+
+    def vaciar(self):
+        self._medidas.clear()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener_estadisticas(self):
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'textos': len(self._medidas),
+            'limite': self.limite,
+        }
+
+    def __repr__(self):
+        return "<CacheDeMedidas con %d textos (%d aciertos, %d fallos)>" % (
+            len(self._medidas), self.aciertos, self.fallos)
+
+
+# Caches compartidas por todas las instancias de pilas del proceso.
+cache_de_imagenes = CacheDeImagenes()
+cache_de_medidas_de_texto = CacheDeMedidas()
+cache_de_textos = CacheDeImagenes(limite=8 * 1024 * 1024)
@@ -6,10 +6,61 @@
 #
 # Website - http://www.pilas-engine.com.ar
 import os
+import weakref
 
 from imagen import Imagen
 
 
+# Hojas de cuadros ya armadas, de la forma {(ruta, columnas, filas): hoja}.
+# Se guardan mientras alguna grilla o cursor las use, así el límite de
+# la cache de imagenes sigue acotando la memoria de las grillas.
+_hojas = weakref.WeakValueDictionary()
+
+
+def obtener_hoja(pilas, ruta, columnas, filas):
+    """Retorna la hoja de cuadros compartida para un archivo de grilla."""
+    clave = (ruta, columnas, filas)
+    hoja = _hojas.get(clave)
+
+    if hoja is None:
+        hoja = HojaDeCuadros(Imagen(pilas, ruta), columnas, filas)
+        _hojas[clave] = hoja
+
+    return hoja
+
+
+def vaciar_hojas():
+    """Descarta las hojas, por ejemplo si cambian las imagenes o los atlas."""
+    _hojas.clear()
+
+
+class HojaDeCuadros(object):
+    """La parte de una grilla que no cambia: su pixmap y sus cuadros.
+
+    Se comparte entre todas las grillas y cursores del mismo archivo
+    con la misma cantidad de columnas y filas, así que nunca se tiene
+    que modificar.
+    """
+
+    __slots__ = ('ruta', 'pixmap', 'rectangulo', 'columnas', 'filas',
+                 'cuadro_ancho', 'cuadro_alto', 'cuadros', '__weakref__')
+
+    def __init__(self, imagen, columnas, filas):
+        self.ruta = imagen.ruta_original
+        self.pixmap = imagen._imagen
+        self.rectangulo = imagen._rectangulo
+        self.columnas = columnas
+        self.filas = filas
+        self.cuadro_ancho = imagen.ancho() / columnas
+        self.cuadro_alto = imagen.alto() / filas
+
+        # Esquina superior izquierda de cada cuadro dentro del pixmap.
+        x, y = imagen.obtener_origen()
+        self.cuadros = tuple((x + (cuadro % columnas) * self.cuadro_ancho,
+                              y + (cuadro / columnas) * self.cuadro_alto)
+                             for cuadro in xrange(columnas * filas))
+
+
 class Grilla(Imagen):
 
     """Representa una grilla regular, que se utiliza en animaciones.
@@ -21,14 +72,31 @@ class Grilla(Imagen):
     """
 
     def __init__(self, pilas, ruta, columnas=1, filas=1):
-        Imagen.__init__(self, pilas, ruta)
+        self.pilas = pilas
+        self.ruta_original = ruta
+        self.repetir_horizontal = False
+        self.repetir_vertical = False
+
+        self._hoja = obtener_hoja(pilas, ruta, columnas, filas)
+        self._imagen = self._hoja.pixmap
+        self._rectangulo = self._hoja.rectangulo
+
         self.cantidad_de_cuadros = columnas * filas
         self.columnas = columnas
         self.filas = filas
-        self.cuadro_ancho = Imagen.ancho(self) / columnas
-        self.cuadro_alto = Imagen.alto(self) / filas
+        self.cuadro_ancho = self._hoja.cuadro_ancho
+        self.cuadro_alto = self._hoja.cuadro_alto
         self.definir_cuadro(0)
 
+    def crear_cursor(self):
+        """Retorna un objeto liviano para mostrar la grilla en un actor.
+
+        El cursor comparte la hoja de cuadros con la grilla, y solo
+        recuerda el cuadro actual, así que se pueden crear miles de
+        ellos (por ejemplo uno por cada explosión) sin costo.
+        """
+        return CursorDeGrilla(self._hoja, self._cuadro)
+
     def ancho(self):
         return self.cuadro_ancho
 
@@ -36,7 +104,8 @@ class Grilla(Imagen):
         return self.cuadro_alto
 
     def _dibujar_pixmap(self, painter):
-        painter.drawPixmap(0, 0, self._imagen, self.dx, self.dy,
+        x, y = self.obtener_origen()
+        painter.drawPixmap(0, 0, self._imagen, x + self.dx, y + self.dy,
                            self.cuadro_ancho, self.cuadro_alto)
 
     def definir_cuadro(self, cuadro):
@@ -77,3 +146,104 @@ class Grilla(Imagen):
     def __repr__(self):
         nombre_imagen = os.path.basename(self.ruta_original)
         return "<Grilla del archivo '%s' (filas: %d, columnas: %d)>" % (nombre_imagen, self.filas, self.columnas)
+
+
+class CursorDeGrilla(object):
+    """Muestra los cuadros de una ``HojaDeCuadros`` compartida.
+
+    Se usa como la imagen de un actor, igual que una grilla, pero solo
+    guarda el cuadro actual y el tiempo acumulado para avanzar.
+    """
+
+    __slots__ = ('_hoja', '_cuadro', '_ticks_acumulados')
+
+    repetir_horizontal = False
+    repetir_vertical = False
+
+    def __init__(self, hoja, cuadro=0):
+        self._hoja = hoja
+        self.definir_cuadro(cuadro)
+
+    @property
+    def _imagen(self):
+        return self._hoja.pixmap
+
+    @property
+    def ruta_original(self):
+        return self._hoja.ruta
+
+    @property
+    def columnas(self):
+        return self._hoja.columnas
+
+    @property
+    def filas(self):
+        return self._hoja.filas
+
+    @property
+    def cantidad_de_cuadros(self):
+        return len(self._hoja.cuadros)
+
+    @property
+    def cuadro_ancho(self):
+        return self._hoja.cuadro_ancho
+
+    @property
+    def cuadro_alto(self):
+        return self._hoja.cuadro_alto
+
+    def ancho(self):
+        return self._hoja.cuadro_ancho
+
+    def alto(self):
+        return self._hoja.cuadro_alto
+
+    def centro(self):
+        return (self.ancho()/2, self.alto()/2)
+
+    def obtener_origen(self):
+        return (0, 0)
+
+    def dibujar(self, painter, composicion):
+        if composicion:
+            painter.setCompositionMode(composicion)
+
+        x, y = self._hoja.cuadros[self._cuadro]
+        painter.drawPixmap(0, 0, self._hoja.pixmap, x, y,
+                           self._hoja.cuadro_ancho, self._hoja.cuadro_alto)
+
+    def definir_cuadro(self, cuadro):
+        self._ticks_acumulados = 0
+        self._cuadro = cuadro
+
+    def avanzar(self, velocidad=60):
+        velocidad_de_animacion = (1000.0 / 60) * velocidad
+        self._ticks_acumulados += velocidad_de_animacion
+        ha_avanzado = True
+
+        if self._ticks_acumulados > 1000.0:
+            self._ticks_acumulados -= 1000.0
+            cuadro_actual = self._cuadro + 1
+
+            if cuadro_actual >= len(self._hoja.cuadros):
+                cuadro_actual = 0
+                ha_avanzado = False
+
+            self.definir_cuadro(cuadro_actual)
+
+        return ha_avanzado
+
+    def obtener_cuadro(self):
+        return self._cuadro
+
+    def dibujarse_sobre_una_pizarra(self, pizarra, x, y):
+        # El cursor se pinta usando las coordenadas absolutas del cuadro,
+        # así que se indica origen (0, 0) en obtener_origen.
+        origen_x, origen_y = self._hoja.cuadros[self._cuadro]
+        pizarra.pintar_parte_de_imagen(self, origen_x, origen_y,
+                                       self._hoja.cuadro_ancho,
+                                       self._hoja.cuadro_alto, x, y)
+
+    def __repr__(self):
+        nombre_imagen = os.path.basename(self._hoja.ruta)
+        return "<CursorDeGrilla del archivo '%s' (cuadro: %d)>" % (nombre_imagen, self._cuadro)
@@ -8,9 +8,23 @@
 import os
 from PyQt4 import QtGui
 
+from cache import cache_de_imagenes
+import atlas_de_imagenes
+
 
 class Imagen(object):
 
+    # Si la imagen está dentro de un atlas, indica que parte del pixmap
+    # le corresponde como (x, y, ancho, alto).
+    _rectangulo = None
+    _pixmap_separado = None
+
+    # Cuenta las veces que alguna imagen comenzó o dejó de repetirse, así
+    # la escena sabe cuando revisar que actores se dibujan como mosaico.
+    cambios_de_repeticion = 0
+    _repetir_horizontal = False
+    _repetir_vertical = False
+
     def __init__(self, pilas, ruta):
         self.ruta_original = ruta
         self.pilas = pilas
@@ -20,20 +34,48 @@ class Imagen(object):
         if isinstance(ruta, QtGui.QPixmap):
             self._imagen = ruta
         else:
-            if ruta.lower().endswith("jpeg") or ruta.lower().endswith("jpg"):
-                try:
-                    self._imagen = self.cargar_jpeg(ruta)
-                except:
-                    self._imagen = QtGui.QPixmap(ruta)
+            en_atlas = atlas_de_imagenes.buscar(ruta)
+
+            if en_atlas:
+                self._imagen, self._rectangulo = en_atlas
             else:
-                self._imagen = QtGui.QPixmap(ruta)
+                # El pixmap se comparte entre todas las imagenes que usan
+                # el mismo archivo, así que nunca se tiene que modificar.
+                self._imagen = cache_de_imagenes.obtener(ruta)
 
     def ancho(self):
+        if self._rectangulo:
+            return self._rectangulo[2]
+
         return self._imagen.size().width()
 
     def alto(self):
+        if self._rectangulo:
+            return self._rectangulo[3]
+
         return self._imagen.size().height()
 
+    def obtener_origen(self):
+        """Retorna la posición (x, y) de la imagen dentro de su pixmap."""
+        if self._rectangulo:
+            return self._rectangulo[:2]
+
+        return (0, 0)
+
+    def obtener_pixmap(self):
+        """Retorna un pixmap que contiene solamente a esta imagen.
+
+        Si la imagen está en un atlas se copia su parte la primera vez,
+        por ejemplo para dibujarla repetida como fondo.
+        """
+        if self._rectangulo is None:
+            return self._imagen
+
+        if self._pixmap_separado is None:
+            self._pixmap_separado = self._imagen.copy(*self._rectangulo)
+
+        return self._pixmap_separado
+
     def centro(self):
         "Retorna una tupla con la coordenada del punto medio del la imagen."
         return (self.ancho()/2, self.alto()/2)
@@ -63,10 +105,36 @@ class Imagen(object):
             if self.repetir_vertical:
                 y = self.ancho() * 200
 
-            painter.drawTiledPixmap(-x, -y, self.ancho() + x*2, self.alto() +y*2, self._imagen)
+            painter.drawTiledPixmap(-x, -y, self.ancho() + x*2, self.alto() +y*2, self.obtener_pixmap())
+        elif self._rectangulo:
+            x, y, ancho, alto = self._rectangulo
+            painter.drawPixmap(0, 0, self._imagen, x, y, ancho, alto)
         else:
             painter.drawPixmap(0, 0, self._imagen)
 
+    def _obtener_repetir_horizontal(self):
+        return self._repetir_horizontal
+
+    def _definir_repetir_horizontal(self, valor):
+        if valor != self._repetir_horizontal:
+            self._repetir_horizontal = valor
+            Imagen.cambios_de_repeticion += 1
+
+    def _obtener_repetir_vertical(self):
+        return self._repetir_vertical
+
+    def _definir_repetir_vertical(self, valor):
+        if valor != self._repetir_vertical:
+            self._repetir_vertical = valor
+            Imagen.cambios_de_repeticion += 1
+
+    repetir_horizontal = property(_obtener_repetir_horizontal,
+                                  _definir_repetir_horizontal,
+                                  doc="Dibuja la imagen repetida a lo ancho.")
+    repetir_vertical = property(_obtener_repetir_vertical,
+                                _definir_repetir_vertical,
+                                doc="Dibuja la imagen repetida a lo alto.")
+
     def __repr__(self):
         nombre_imagen = os.path.basename(self.ruta_original)
         return "<Imagen del archivo '%s'>" % (nombre_imagen)
@@ -6,6 +6,7 @@
 #
 # Website - http://www.pilas-engine.com.ar
 import os
+import contextlib
 from PyQt4 import QtGui
 from PyQt4 import QtCore
 from pilasengine.imagenes.imagen import Imagen
@@ -16,6 +17,11 @@ from pilasengine import utils
 class Superficie(Imagen):
     CACHE_FUENTES = {}
 
+    # Lápices y pinceles ya creados, para no construir uno nuevo en
+    # cada trazo: {(r, g, b, a, grosor): QPen} y {(r, g, b, a): QBrush}.
+    CACHE_LAPICES = {}
+    CACHE_PINCELES = {}
+
     def __init__(self, pilas, ancho, alto):
         self.pilas = pilas
         self._imagen = QtGui.QPixmap(ancho, alto)
@@ -24,17 +30,81 @@ class Superficie(Imagen):
         self.ruta_original = os.urandom(25)
         self.repetir_horizontal = False
         self.repetir_vertical = False
+        self._lotes_abiertos = 0
+
+    @contextlib.contextmanager
+    def lote(self):
+        """Permite dibujar muchas cosas sin volver a preparar el canvas.
+
+        Cada operación de dibujo abre y cierra el canvas, lo que es muy
+        lento si se dibujan cientos de lineas seguidas. Dentro de un lote
+        el canvas queda abierto hasta el final:
+
+            >>> with superficie.lote():
+            ...     for (x, y) in puntos:
+            ...         superficie.circulo(x, y, 2, relleno=True)
+
+        Los lotes se pueden anidar, el canvas se cierra al terminar el
+        lote mas externo.
+        """
+        self._comenzar()
+        self._lotes_abiertos += 1
+
+        try:
+            yield self
+        finally:
+            self._lotes_abiertos -= 1
+            self._terminar()
+
+    def _comenzar(self):
+        if not self._lotes_abiertos:
+            self.canvas.begin(self._imagen)
+
+    def _terminar(self):
+        if not self._lotes_abiertos:
+            self.canvas.end()
+
+    def _obtener_lapiz(self, r, g, b, a, grosor):
+        clave = (r, g, b, a, grosor)
+        lapiz = Superficie.CACHE_LAPICES.get(clave)
+
+        if lapiz is None:
+            lapiz = QtGui.QPen(QtGui.QColor(r, g, b, a), grosor)
+            Superficie.CACHE_LAPICES[clave] = lapiz
+
+        return lapiz
+
+    def _obtener_pincel(self, r, g, b, a):
+        clave = (r, g, b, a)
+        pincel = Superficie.CACHE_PINCELES.get(clave)
+
+        if pincel is None:
+            pincel = QtGui.QBrush(QtGui.QColor(r, g, b, a))
+            Superficie.CACHE_PINCELES[clave] = pincel
+
+        return pincel
+
+    def _rellenar(self, color):
+        if self._lotes_abiertos:
+            # No se puede usar fill mientras el canvas está abierto.
+            self.canvas.save()
+            self.canvas.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+            self.canvas.fillRect(self._imagen.rect(), color)
+            self.canvas.restore()
+        else:
+            self._imagen.fill(color)
 
     def pintar(self, color):
         r, g, b, a = color.obtener_componentes()
-        self._imagen.fill(QtGui.QColor(r, g, b, a))
+        self._rellenar(QtGui.QColor(r, g, b, a))
 
     def pintar_parte_de_imagen(self, imagen, origen_x, origen_y, ancho, alto,
                                x, y):
-        self.canvas.begin(self._imagen)
-        self.canvas.drawPixmap(x, y, imagen._imagen, origen_x, origen_y,
-                               ancho, alto)
-        self.canvas.end()
+        dx, dy = imagen.obtener_origen()
+        self._comenzar()
+        self.canvas.drawPixmap(x, y, imagen._imagen, origen_x + dx,
+                               origen_y + dy, ancho, alto)
+        self._terminar()
 
     def pintar_imagen(self, imagen, x=0, y=0):
         self.pintar_parte_de_imagen(imagen, 0, 0, imagen.ancho(),
@@ -42,17 +112,19 @@ class Superficie(Imagen):
 
     def texto(self, cadena, x=0, y=0, magnitud=10, fuente=None,
               color=colores.negro, ancho=0, vertical=False):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
         color = colores.generar_color_desde_texto(color)
         r, g, b, _ = color.obtener_componentes()
-        self.canvas.setPen(QtGui.QColor(r, g, b))
+        self.canvas.setPen(self._obtener_lapiz(r, g, b, 255, 1))
         dx = x
         dy = y
 
         if fuente:
             nombre_de_fuente = self.cargar_fuente(fuente)
         else:
-            nombre_de_fuente = self.canvas.font().family()
+            # Dentro de un lote el painter conserva la fuente del texto
+            # anterior, así que se usa la fuente por omisión.
+            nombre_de_fuente = QtGui.QFont().family()
 
         #nombre_de_fuente = self.canvas.font().family()
 
@@ -75,65 +147,67 @@ class Superficie(Imagen):
             rect = self.canvas.drawText(r, flags, line)
             dy += rect.height()
 
-        self.canvas.end()
+        self._terminar()
 
     def circulo(self, x, y, radio, color=colores.negro,
                 relleno=False, grosor=1):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
 
         r, g, b, _ = color.obtener_componentes()
-        color = QtGui.QColor(r, g, b)
-        pen = QtGui.QPen(color, grosor)
-        self.canvas.setPen(pen)
+        self.canvas.setPen(self._obtener_lapiz(r, g, b, 255, grosor))
 
         if relleno:
-            self.canvas.setBrush(color)
+            self.canvas.setBrush(self._obtener_pincel(r, g, b, 255))
+        else:
+            self.canvas.setBrush(QtCore.Qt.NoBrush)
 
         self.canvas.drawEllipse(x-radio, y-radio, radio*2, radio*2)
-        self.canvas.end()
+        self._terminar()
 
     def rectangulo(self, x, y, ancho, alto, color=colores.negro,
                    relleno=False, grosor=1):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
 
         r, g, b, a = color.obtener_componentes()
-        color = QtGui.QColor(r, g, b, a)
-        pen = QtGui.QPen(color, grosor)
-        self.canvas.setPen(pen)
+        self.canvas.setPen(self._obtener_lapiz(r, g, b, a, grosor))
 
         if relleno:
-            self.canvas.setBrush(color)
+            self.canvas.setBrush(self._obtener_pincel(r, g, b, a))
+        else:
+            self.canvas.setBrush(QtCore.Qt.NoBrush)
 
         self.canvas.drawRect(x, y, ancho, alto)
-        self.canvas.end()
+        self._terminar()
 
     def linea(self, x, y, x2, y2, color=colores.negro, grosor=1):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
 
         r, g, b, _ = color.obtener_componentes()
-        color = QtGui.QColor(r, g, b)
-        pen = QtGui.QPen(color, grosor)
-        self.canvas.setPen(pen)
+        self.canvas.setPen(self._obtener_lapiz(r, g, b, 255, grosor))
 
         self.canvas.drawLine(x, y, x2, y2)
-        self.canvas.end()
+        self._terminar()
 
     def poligono(self, puntos, color, grosor, cerrado=False):
-        x, y = puntos[0]
+        """Dibuja todos los segmentos de una sola vez, como una polilinea."""
+        poligono = QtGui.QPolygonF([QtCore.QPointF(x, y) for (x, y) in puntos])
 
         if cerrado:
-            puntos.append((x, y))
+            poligono.append(poligono.first())
 
-        for p in puntos[1:]:
-            nuevo_x, nuevo_y = p
-            self.linea(x, y, nuevo_x, nuevo_y, color, grosor)
-            x, y = nuevo_x, nuevo_y
+        self._comenzar()
+
+        r, g, b, _ = color.obtener_componentes()
+        self.canvas.setPen(self._obtener_lapiz(r, g, b, 255, grosor))
+
+        self.canvas.drawPolyline(poligono)
+        self._terminar()
 
     def dibujar_punto(self, x, y, color=colores.negro):
         self.circulo(x, y, 3, color=color, relleno=True)
 
     def limpiar(self):
-        self._imagen.fill(QtGui.QColor(0, 0, 0, 0))
+        self._rellenar(QtGui.QColor(0, 0, 0, 0))
 
     def cargar_fuente(self, fuente_como_ruta):
         """Carga o convierte una fuente para ser utilizada dentro del motor.
@@ -149,14 +223,22 @@ class Superficie(Imagen):
             'Visitor TTF1'
         """
 
-        if not fuente_como_ruta in Superficie.CACHE_FUENTES.keys():
-            ruta_a_la_fuente = utils.obtener_ruta_al_recurso(fuente_como_ruta)
-            fuente_id = QtGui.QFontDatabase.addApplicationFont(ruta_a_la_fuente)
-            Superficie.CACHE_FUENTES[fuente_como_ruta] = fuente_id
-        else:
-            fuente_id = Superficie.CACHE_FUENTES[fuente_como_ruta]
-
-        return str(QtGui.QFontDatabase.applicationFontFamilies(fuente_id)[0])
+        return cargar_fuente(fuente_como_ruta)
 
     def __repr__(self):
         return "<Superficie>"
+
+
+def cargar_fuente(fuente_como_ruta):
+    """Retorna el nombre de familia de una fuente a partir de su archivo.
+
+    Ver ``Superficie.cargar_fuente``.
+    """
+    if not fuente_como_ruta in Superficie.CACHE_FUENTES.keys():
+        ruta_a_la_fuente = utils.obtener_ruta_al_recurso(fuente_como_ruta)
+        fuente_id = QtGui.QFontDatabase.addApplicationFont(ruta_a_la_fuente)
+        Superficie.CACHE_FUENTES[fuente_como_ruta] = fuente_id
+    else:
+        fuente_id = Superficie.CACHE_FUENTES[fuente_como_ruta]
+
+    return str(QtGui.QFontDatabase.applicationFontFamilies(fuente_id)[0])
@@ -0,0 +1,224 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+from collections import OrderedDict
+
+from imagen import Imagen
+from superficie import Superficie
+from pilasengine import colores
+
+
+# Cantidad de bytes que pueden ocupar las partes dibujadas de
+# una misma superficie.
+LIMITE_POR_OMISION = 32 * 1024 * 1024
+
+
+class SuperficiePorPartes(Imagen):
+    """Una superficie muy grande que se dibuja en partes cuadradas.
+
+    En lugar de reservar un solo pixmap del tamaño completo, recuerda
+    las operaciones de dibujo que afectan a cada parte y arma el pixmap
+    de esa parte recién cuando se tiene que mostrar en pantalla.
+
+    Si se define un área visible (ver ``definir_area_visible``) solo
+    se dibujan las partes que la tocan. Las partes que no se muestran
+    hace tiempo se descartan cuando se supera el límite de memoria, y
+    se vuelven a armar si aparecen otra vez.
+    """
+
+    def __init__(self, pilas, ancho, alto, tamano_de_parte=512,
+                 limite=LIMITE_POR_OMISION):
+        self.pilas = pilas
+        self._imagen = None
+        self._ancho = ancho
+        self._alto = alto
+        self.tamano_de_parte = tamano_de_parte
+        self.limite = limite
+        self.ruta_original = "superficie_por_partes"
+        self.repetir_horizontal = False
+        self.repetir_vertical = False
+
+        # Operaciones de dibujo de cada parte, en el orden en que se
+        # hicieron: {(columna, fila): [(metodo, x, y, argumentos), ...]}
+        self._operaciones = {}
+
+        # Pixmaps de las partes ya armadas, del menos al mas usado.
+        self._partes = OrderedDict()
+        self._bytes_en_uso = 0
+        self._partes_construidas = 0
+
+        self._area_visible = None
+
+    def ancho(self):
+        return self._ancho
+
+    def alto(self):
+        return self._alto
+
+    def definir_area_visible(self, x, y, ancho, alto):
+        """Indica que rectángulo de la superficie se ve en pantalla.
+
+        :param x: Borde izquierdo del área, relativo a la superficie.
+        :param y: Borde superior del área, relativo a la superficie.
+        :param ancho: Ancho del área.
+        :param alto: Alto del área.
+        """
+        self._area_visible = (x, y, ancho, alto)
+
+    def olvidar_area_visible(self):
+        """Hace que se dibujen todas las partes de la superficie."""
+        self._area_visible = None
+
+    def pintar_parte_de_imagen(self, imagen, origen_x, origen_y, ancho, alto,
+                               x, y):
+        self._registrar(x, y, ancho, alto, 'pintar_parte_de_imagen',
+                        (imagen, origen_x, origen_y, ancho, alto))
+
+    def pintar_imagen(self, imagen, x=0, y=0):
+        self.pintar_parte_de_imagen(imagen, 0, 0, imagen.ancho(),
+                                    imagen.alto(), x, y)
+
+    def rectangulo(self, x, y, ancho, alto, color=colores.negro,
+                   relleno=False, grosor=1):
+        self._registrar(x - grosor, y - grosor, ancho + grosor * 2,
+                        alto + grosor * 2, 'rectangulo',
+                        (ancho, alto, color, relleno, grosor))
+
+    def texto(self, cadena, x=0, y=0, magnitud=10, fuente=None,
+              color=colores.negro, ancho=0, vertical=False):
+        # No se conoce el tamaño exacto del texto hasta dibujarlo, así
+        # que se estima con holgura a partir de la magnitud.
+        lineas = cadena.split('\n')
+        ancho_estimado = ancho or max(len(l) for l in lineas) * magnitud * 2
+        alto_estimado = len(lineas) * magnitud * 2
+        self._registrar(x, y, ancho_estimado, alto_estimado, 'texto',
+                        (cadena, magnitud, fuente, color, ancho, vertical))
+
+    def limpiar(self):
+        self._operaciones.clear()
+        self._partes.clear()
+        self._bytes_en_uso = 0
+
+    def obtener_estadisticas(self):
+        """Retorna un diccionario con datos de las partes en memoria."""
+        return {
+            'partes_con_dibujos': len(self._operaciones),
+            'partes_en_memoria': len(self._partes),
+            'partes_construidas': self._partes_construidas,
+            'bytes_en_uso': self._bytes_en_uso,
+            'limite': self.limite,
+        }
+
+    def _registrar(self, x, y, ancho, alto, metodo, argumentos):
+        operacion = (metodo, x, y, argumentos)
+
+        for parte in self._obtener_partes_en(x, y, ancho, alto):
+            self._operaciones.setdefault(parte, []).append(operacion)
+            self._descartar_parte(parte)
+
+    def _obtener_partes_en(self, x, y, ancho, alto):
+        """Retorna las partes que toca un rectángulo de la superficie."""
+        tamano = self.tamano_de_parte
+        columnas = (self._ancho - 1) / tamano
+        filas = (self._alto - 1) / tamano
+
+        columna_inicial = max(0, int(x) / tamano)
+        columna_final = min(columnas, int(x + ancho - 1) / tamano)
+        fila_inicial = max(0, int(y) / tamano)
+        fila_final = min(filas, int(y + alto - 1) / tamano)
+
+        return [(columna, fila)
+                for fila in range(fila_inicial, fila_final + 1)
+                for columna in range(columna_inicial, columna_final + 1)]
+
+    def _descartar_parte(self, parte):
+        pixmap = self._partes.pop(parte, None)
+
+        if pixmap is not None:
+            self._bytes_en_uso -= self._calcular_bytes(pixmap)
+
+    def _calcular_bytes(self, pixmap):
+        return pixmap.width() * pixmap.height() * pixmap.depth() / 8
+
+    def _obtener_pixmap_de_parte(self, parte, visibles):
+        if parte in self._partes:
+            pixmap = self._partes.pop(parte)
+            self._partes[parte] = pixmap
+            return pixmap
+
+        pixmap = self._construir_parte(parte)
+        self._partes[parte] = pixmap
+        self._bytes_en_uso += self._calcular_bytes(pixmap)
+        self._partes_construidas += 1
+        self._liberar_memoria(visibles)
+        return pixmap
+
+    def _construir_parte(self, parte):
+        columna, fila = parte
+        tamano = self.tamano_de_parte
+        dx = columna * tamano
+        dy = fila * tamano
+        ancho = min(tamano, self._ancho - dx)
+        alto = min(tamano, self._alto - dy)
+
+        superficie = Superficie(self.pilas, ancho, alto)
+
+        with superficie.lote():
+            for (metodo, x, y, argumentos) in self._operaciones[parte]:
+                if metodo == 'pintar_parte_de_imagen':
+                    imagen, origen_x, origen_y, ancho, alto = argumentos
+                    superficie.pintar_parte_de_imagen(imagen, origen_x,
+                                                      origen_y, ancho, alto,
+                                                      x - dx, y - dy)
+                elif metodo == 'rectangulo':
+                    ancho, alto, color, relleno, grosor = argumentos
+                    superficie.rectangulo(x - dx + grosor, y - dy + grosor,
+                                          ancho, alto, color, relleno, grosor)
+                elif metodo == 'texto':
+                    cadena, magnitud, fuente, color, ancho, vertical = argumentos
+                    superficie.texto(cadena, x - dx, y - dy, magnitud, fuente,
+                                     color, ancho, vertical)
+
+        return superficie._imagen
+
+    def _liberar_memoria(self, visibles):
+        """Descarta las partes menos usadas hasta respetar el límite.
+
+        Las partes que se están mostrando no se descartan, aunque
+        ocupen mas memoria que el límite.
+        """
+        if self._bytes_en_uso <= self.limite:
+            return
+
+        for parte in list(self._partes):
+            if self._bytes_en_uso <= self.limite:
+                break
+
+            if parte not in visibles:
+                self._descartar_parte(parte)
+
+    def _obtener_partes_visibles(self):
+        if self._area_visible is None:
+            return [parte for parte in self._operaciones]
+
+        x, y, ancho, alto = self._area_visible
+        return [parte for parte in self._obtener_partes_en(x, y, ancho, alto)
+                if parte in self._operaciones]
+
+    def _dibujar_pixmap(self, painter):
+        visibles = self._obtener_partes_visibles()
+        conjunto_de_visibles = set(visibles)
+        tamano = self.tamano_de_parte
+
+        for parte in visibles:
+            pixmap = self._obtener_pixmap_de_parte(parte, conjunto_de_visibles)
+            columna, fila = parte
+            painter.drawPixmap(columna * tamano, fila * tamano, pixmap)
+
+    def __repr__(self):
+        return "<SuperficiePorPartes de %dx%d (%d partes en memoria)>" % (
+            self._ancho, self._alto, len(self._partes))
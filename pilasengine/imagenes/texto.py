@@ -10,56 +10,101 @@ import os
 from PyQt4 import QtGui
 from PyQt4 import QtCore
 from pilasengine.imagenes.superficie import Superficie
+from pilasengine.imagenes.superficie import cargar_fuente
+from pilasengine.imagenes.cache import cache_de_medidas_de_texto
+from pilasengine.imagenes.cache import cache_de_textos
+from pilasengine import colores
 from pilasengine import utils
 
 
 class Texto(Superficie):
 
-    def __init__(self, pilas, texto, magnitud, vertical, fuente, color, ancho):
+    def __init__(self, pilas, texto, magnitud, vertical, fuente, color, ancho,
+                 usar_cache=False):
+        """Genera una imagen con el texto dibujado.
+
+        :param usar_cache: Reutiliza el pixmap de otro texto igual. Solo se
+                           tiene que usar si no se va a pintar sobre la imagen.
+        """
+        pixmap = None
+
+        if usar_cache:
+            componentes = colores.generar_color_desde_texto(color).obtener_componentes()
+            clave = (texto, fuente, magnitud, vertical, ancho, componentes)
+            pixmap = cache_de_textos.buscar(clave)
+
         ancho, alto = self.obtener_area_de_texto(texto, magnitud, vertical,
                                                  fuente, ancho)
-        Superficie.__init__(self, pilas, ancho, alto)
+
+        if pixmap is None:
+            Superficie.__init__(self, pilas, ancho, alto)
+            self.texto(texto, magnitud=magnitud, fuente=fuente,
+                       color=color, ancho=ancho, vertical=vertical)
+
+            if usar_cache:
+                cache_de_textos.agregar(clave, self._imagen)
+        else:
+            Superficie.__init__(self, pilas, 0, 0)
+            self._imagen = pixmap
+
         self._ancho_del_texto = ancho
         self.dibujar_texto = self.texto
-        self.dibujar_texto(texto, magnitud=magnitud, fuente=fuente,
-                           color=color, ancho=ancho, vertical=vertical)
         self.ruta_original = texto.encode('ascii', 'xmlcharrefreplace') + str(os.urandom(25))
         self.texto = texto
 
     def obtener_area_de_texto(self, cadena, magnitud=10, vertical=False,
                               fuente=None, ancho=0):
-        pic = QtGui.QPicture()
-        p = QtGui.QPainter(pic)
+        return medir_texto(cadena, magnitud, vertical, fuente, ancho)
 
-        if fuente:
-            nombre_de_fuente = self.cargar_fuente(fuente)
-        else:
-            nombre_de_fuente = p.font().family()
 
-        font = QtGui.QFont(nombre_de_fuente, magnitud)
-        p.setFont(font)
+def medir_texto(cadena, magnitud=10, vertical=False, fuente=None, ancho=0):
+    """Retorna el ancho y alto que ocupa un texto al dibujarlo.
 
-        alto = 0
+    Las medidas se guardan en ``cache_de_medidas_de_texto``, así que
+    medir varias veces el mismo texto solo lo pinta la primera vez.
+    """
+    clave = (cadena, fuente, magnitud, vertical, ancho)
+    medida = cache_de_medidas_de_texto.buscar(clave)
 
-        if vertical:
-            lineas = [t for t in cadena]
-        else:
-            lineas = cadena.split('\n')
+    if medida is None:
+        medida = _medir_texto_sin_cache(cadena, magnitud, vertical, fuente,
+                                        ancho)
+        cache_de_medidas_de_texto.agregar(clave, medida)
 
-        if not ancho:
-            flags = QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop
-        else:
-            flags = QtCore.Qt.AlignLeft | QtCore.Qt.TextWordWrap | QtCore.Qt.AlignTop
+    return medida
+
+
+def _medir_texto_sin_cache(cadena, magnitud, vertical, fuente, ancho):
+    pic = QtGui.QPicture()
+    p = QtGui.QPainter(pic)
+
+    if fuente:
+        nombre_de_fuente = cargar_fuente(fuente)
+    else:
+        nombre_de_fuente = p.font().family()
+
+    font = QtGui.QFont(nombre_de_fuente, magnitud)
+    p.setFont(font)
+
+    alto = 0
 
-        for line in lineas:
-            if line == '':
-                line = ' '
+    if vertical:
+        lineas = [t for t in cadena]
+    else:
+        lineas = cadena.split('\n')
 
-            brect = p.drawText(QtCore.QRect(0, 0, ancho, 2000), flags, line)
-            ancho = max(ancho, brect.width())
-            alto += brect.height()
+    if not ancho:
+        flags = QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop
+    else:
+        flags = QtCore.Qt.AlignLeft | QtCore.Qt.TextWordWrap | QtCore.Qt.AlignTop
 
-        p.end()
-        return (ancho, alto)
+    for line in lineas:
+        if line == '':
+            line = ' '
 
+        brect = p.drawText(QtCore.QRect(0, 0, ancho, 2000), flags, line)
+        ancho = max(ancho, brect.width())
+        alto += brect.height()
 
+    p.end()
+    return (ancho, alto)
@@ -0,0 +1,117 @@
+# -*- encoding: utf-8 -*-
+# pilas engine: un motor para hacer videojuegos
+#
+# Copyright 2010-2014 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+from pilasengine.imagenes.imagen import Imagen
+from pilasengine.imagenes.atlas_de_glifos import MARGEN
+
+
+class TextoDeAtlas(Imagen):
+    """Un texto que se dibuja copiando caracteres desde un atlas.
+
+    A diferencia de ``imagenes.Texto`` no tiene un pixmap propio: cada
+    vez que cambia el texto solamente se calcula en qué posición va
+    cada caracter, y al dibujar se copian desde el ``AtlasDeGlifos``.
+
+    Es ideal para textos que cambian muy seguido, como un puntaje o un
+    reloj. Como cada caracter se ubica por separado no se aplica el
+    kerning de la fuente, así que puede verse apenas distinto a un
+    texto normal.
+    """
+
+    def __init__(self, pilas, texto, atlas, vertical=False, ancho=0):
+        self.pilas = pilas
+        self.atlas = atlas
+        self.vertical = vertical
+        self.ruta_original = "texto_de_atlas"
+        self.repetir_horizontal = False
+        self.repetir_vertical = False
+        self.definir_texto(texto, ancho)
+
+    def definir_texto(self, texto, ancho=0):
+        """Cambia el texto a mostrar.
+
+        :param texto: La cadena de texto.
+        :param ancho: El ancho máximo de cada linea, o 0 para no partir las lineas.
+        """
+        self.texto = texto
+        self._fragmentos = []
+        alto_de_linea = self.atlas.alto_de_linea
+
+        if self.vertical:
+            lineas = [t for t in texto]
+        else:
+            lineas = []
+
+            for linea in texto.split('\n'):
+                lineas.extend(self._partir_linea(linea, ancho))
+
+        self._ancho = ancho
+        self._alto = alto_de_linea * len(lineas)
+
+        for (numero, linea) in enumerate(lineas):
+            x = 0
+            y = numero * alto_de_linea - MARGEN
+
+            for caracter in linea:
+                origen_x, origen_y, ancho_del_glifo, alto_del_glifo, \
+                    desplazamiento, avance = self.atlas.obtener_glifo(caracter)
+
+                if not caracter.isspace():
+                    self._fragmentos.append((x + desplazamiento, y,
+                                             origen_x, origen_y,
+                                             ancho_del_glifo, alto_del_glifo))
+
+                x += avance
+
+            self._ancho = max(self._ancho, x)
+
+    def _partir_linea(self, linea, ancho):
+        """Divide una linea en varias para que ninguna supere el ancho.
+
+        Igual que en ``imagenes.Texto``, las lineas solo se cortan entre
+        palabras.
+        """
+        if not ancho:
+            return [linea]
+
+        lineas = []
+        actual = None
+        ancho_actual = 0
+        espacio = self.atlas.obtener_avance(' ')
+
+        for palabra in linea.split(' '):
+            ancho_de_palabra = self._medir(palabra)
+
+            if actual is None:
+                actual, ancho_actual = palabra, ancho_de_palabra
+            elif ancho_actual + espacio + ancho_de_palabra <= ancho:
+                actual += ' ' + palabra
+                ancho_actual += espacio + ancho_de_palabra
+            else:
+                lineas.append(actual)
+                actual, ancho_actual = palabra, ancho_de_palabra
+
+        lineas.append(actual)
+        return lineas
+
+    def _medir(self, cadena):
+        return sum(self.atlas.obtener_avance(c) for c in cadena)
+
+    def ancho(self):
+        return self._ancho
+
+    def alto(self):
+        return self._alto
+
+    def _dibujar_pixmap(self, painter):
+        pixmap = self.atlas.obtener_pixmap()
+
+        for (x, y, origen_x, origen_y, ancho, alto) in self._fragmentos:
+            painter.drawPixmap(x, y, pixmap, origen_x, origen_y, ancho, alto)
+
+    def __repr__(self):
+        return "<TextoDeAtlas '%s'>" % (self.texto)
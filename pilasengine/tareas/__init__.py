@@ -6,6 +6,8 @@
 #
 # Website - http://www.pilas-engine.com.ar
 
+import heapq
+
 from pilasengine.tareas.tarea import Tarea
 from pilasengine.tareas.tarea_condicional import TareaCondicional
 
@@ -36,40 +38,82 @@ class Tareas(object):
         "Inicializa el gestor de tareas."
         self.escena = escena
         self.pilas = pilas
-        self.tareas_planificadas = []
         self.contador_de_tiempo = 0
 
+        # Montículo (heap) con las tareas ordenadas por tiempo de
+        # ejecución, de la forma [time_out, numero_de_orden, tarea]. El
+        # número de orden desempata tareas con el mismo time_out.
+        self.tareas_planificadas = []
+        self._numero_de_orden = 0
+
+        # Las tareas eliminadas quedan en el montículo hasta que llega
+        # su turno, pero ya no se cuentan como planificadas.
+        self._cantidad_de_tareas = 0
+        self._cantidad_de_eliminadas = 0
+
+        # Cambia cada vez que se eliminan todas las tareas.
+        self._generacion = 0
+
     def obtener_cantidad_de_tareas_planificadas(self):
         """Retora la cantidad de tareas planificadas."""
-        return len(self.tareas_planificadas)
+        return self._cantidad_de_tareas
 
     def actualizar(self, dt):
         """Actualiza los contadores de tiempo y ejecuta las tareas pendientes.
 
+        Solo se consultan las tareas que ya tienen que ejecutarse, el
+        resto permanece en el montículo sin costo.
+
         :param dt: Tiempo transcurrido desde la anterior llamada.
         """
         self.contador_de_tiempo += dt
-        tareas_a_eliminar = []
+        tareas_a_replanificar = []
+        generacion = self._generacion
+
+        while (self.tareas_planificadas and
+               self.contador_de_tiempo > self.tareas_planificadas[0][0]):
+            tarea = heapq.heappop(self.tareas_planificadas)[2]
+            tarea._en_monticulo = False
+
+            if tarea._eliminada:
+                self._cantidad_de_eliminadas -= 1
+                continue
 
-        for tarea in self.tareas_planificadas:
-            if self.contador_de_tiempo > tarea.time_out:
-                tarea.ejecutar()
+            tarea.ejecutar()
 
-                if tarea.una_vez:
-                    tareas_a_eliminar.append(tarea)
-                else:
-                    tarea.time_out += tarea.dt
+            if generacion != self._generacion:
+                # La tarea llamó a eliminar_todas.
+                return
 
-        for x in tareas_a_eliminar:
-            if x in self.tareas_planificadas:
-                self.tareas_planificadas.remove(x)
+            if tarea._eliminada:
+                continue
+
+            if tarea.una_vez:
+                tarea._eliminada = True
+                self._cantidad_de_tareas -= 1
+            else:
+                # Cada tarea se ejecuta a lo sumo una vez por
+                # actualización, así que se vuelve a planificar al final.
+                tarea.time_out += tarea.dt
+                tareas_a_replanificar.append(tarea)
+
+        for tarea in tareas_a_replanificar:
+            if not tarea._eliminada:
+                self._insertar(tarea)
 
     def _agregar(self, tarea):
         """Agrega una nueva tarea para ejecutarse luego.
 
         :param tarea: Referencia a la tarea que se debe agregar.
         """
-        self.tareas_planificadas.append(tarea)
+        self._cantidad_de_tareas += 1
+        self._insertar(tarea)
+
+    def _insertar(self, tarea):
+        self._numero_de_orden += 1
+        tarea._en_monticulo = True
+        heapq.heappush(self.tareas_planificadas,
+                       [tarea.time_out, self._numero_de_orden, tarea])
 
     def una_vez(self, time_out, function, *args, **kwargs):
         """Genera una tarea que se ejecutará usan sola vez.
@@ -113,10 +157,37 @@ class Tareas(object):
     def eliminar_tarea(self, tarea):
         """Elimina una tarea de la lista de tareas planificadas.
 
+        La tarea se marca como eliminada y se descarta recién cuando
+        llega su turno, así eliminar no tiene que recorrer las tareas.
+
         :param tarea: Referencia a la tarea que se tiene que eliminar.
         """
-        self.tareas_planificadas.remove(tarea)
+        if tarea._eliminada or tarea.planificador is not self:
+            raise ValueError("La tarea no esta planificada.")
+
+        tarea._eliminada = True
+        self._cantidad_de_tareas -= 1
+
+        if tarea._en_monticulo:
+            self._cantidad_de_eliminadas += 1
+
+        # Si la mayoría de las tareas del montículo están eliminadas
+        # conviene reconstruirlo.
+        if self._cantidad_de_eliminadas > self._cantidad_de_tareas:
+            self._descartar_tareas_eliminadas()
+
+    def _descartar_tareas_eliminadas(self):
+        self.tareas_planificadas = [x for x in self.tareas_planificadas
+                                    if not x[2]._eliminada]
+        heapq.heapify(self.tareas_planificadas)
+        self._cantidad_de_eliminadas = 0
 
     def eliminar_todas(self):
         """Elimina todas las tareas de la lista de planificadas."""
+        for (_, _, tarea) in self.tareas_planificadas:
+            tarea._eliminada = True
+
         self.tareas_planificadas = []
+        self._cantidad_de_tareas = 0
+        self._cantidad_de_eliminadas = 0
+        self._generacion += 1
@@ -28,6 +28,8 @@ class Tarea(object):
         self.funcion = funcion
         self.args, self.kwargs = args, kwargs
         self.pilas = pilas
+        self._eliminada = False
+        self._en_monticulo = False
 
     def ejecutar(self):
         "Ejecuta la tarea."
@@ -1,6 +1,6 @@
 # -*- encoding: utf-8 -*-
+import os
 import sys
-import time
 import unittest
 
 from PyQt4 import QtGui
@@ -47,8 +47,11 @@ class TestActores(unittest.TestCase):
         escena.actualizar_interpolaciones()
         self.assertTrue(actor.x > 0, "El actor se mueve un poco a la derecha")
 
-        # Simula el paso de un segundo
-        time.sleep(0.5)
+        # Simula el paso de medio segundo, la duración de la interpolación.
+        for _ in range(29):
+            escena.actualizar_interpolaciones()
+
+        self.assertTrue(actor.x < 100, actor.x)
 
         escena.actualizar_interpolaciones()
         self.assertTrue(actor.x == 100, actor.x)
@@ -119,6 +122,75 @@ class TestActores(unittest.TestCase):
 
         self.assertTrue(actor.esta_dentro_de_la_pantalla(), "y el metodo esta_dentro_de_la_pantalla retorna lo contrario")
 
+    def testElMapaUneLosBloquesSolidos(self):
+        mapa = self.pilas.actores.Mapa(filas=4, columnas=4)
+
+        for fila in range(2):
+            for columna in range(4):
+                mapa.pintar_bloque(fila, columna, 1)
+
+        mapa.construir_figuras_solidas()
+        self.assertEquals(len(mapa.actores_con_figuras_solidas), 1,
+                          "Ocho bloques vecinos forman una sola figura")
+        self.assertTrue(mapa.es_bloque_solido(1, 3))
+
+        mapa = self.pilas.actores.Mapa(filas=4, columnas=4,
+                                       unir_bloques_solidos=False)
+        mapa.pintar_bloque(0, 0, 1)
+        mapa.pintar_bloque(0, 1, 1)
+        self.assertEquals(len(mapa.actores_con_figuras_solidas), 2,
+                          "Sin unir bloques se crea una figura por bloque")
+
+    def testElMapaLanzaRayosHastaLosBloquesSolidos(self):
+        mapa = self.pilas.actores.Mapa(filas=4, columnas=4)
+        mapa.pintar_bloque(3, 0, 1)
+        ancho = mapa.grilla.cuadro_ancho
+        alto = mapa.grilla.cuadro_alto
+
+        # Un punto en el centro del primer bloque del mapa.
+        x = ancho / 2 - mapa.centro[0]
+        y = mapa.centro[1] - alto / 2
+
+        self.assertEquals(mapa.lanzar_rayo(x, y, 0, -1, 500), alto * 2.5)
+        self.assertEquals(mapa.lanzar_rayo(x, y, 1, 0, 500), ancho * 3.5, "El borde del mapa es solido")
+        self.assertEquals(mapa.lanzar_rayo(x, y, 0, -1, 10), 10)
+        self.assertEquals(mapa.obtener_distancia_al_suelo(x, y, 500), alto * 2.5)
+
+    def testElEmisorNoCreaUnActorPorParticula(self):
+        emisor = self.pilas.actores.Emisor()
+        escena = self.pilas.obtener_escena_actual()
+        cantidad_de_actores = escena.obtener_cantidad_de_actores()
+
+        for _ in range(10):
+            emisor.crear_particula()
+
+        self.assertEquals(emisor.particulas_vivas, 10)
+        self.assertEquals(escena.obtener_cantidad_de_actores(), cantidad_de_actores)
+
+        # Las particulas viven un segundo, unos 63 cuadros.
+        for _ in range(63):
+            emisor._particulas.actualizar()
+
+        self.assertEquals(len(emisor._particulas), 0)
+
+    def testLaFisicaLanzaRayosDesdeDentroDeUnaFigura(self):
+        self.pilas.fisica.Rectangulo(0, -100, 200, 40, dinamica=False)
+
+        self.assertEquals(self.pilas.fisica.obtener_distancia_al_suelo(0, -100, 50), 0,
+                          "El origen esta dentro del rectangulo")
+        self.assertAlmostEqual(self.pilas.fisica.obtener_distancia_al_suelo(0, 0, 200), 80, delta=1)
+
+    def testLeeMapasTiledUnaSolaVez(self):
+        from pilasengine.actores import cargador_tmx
+        ruta = os.path.join(os.path.dirname(__file__), '..', 'ejemplos', 'mapa.tmx')
+
+        mapa = cargador_tmx.cargar(ruta)
+        self.assertEquals((mapa.columnas, mapa.filas), (20, 15))
+        self.assertEquals([nombre for (nombre, _) in mapa.capas], ['suelo', 'objetos', 'cielo'])
+        self.assertEquals(len(mapa.capas[0][1]), 20 * 15)
+        self.assertIs(cargador_tmx.cargar(ruta), mapa, "Si el archivo no cambia no lo vuelve a leer")
+
+
 class TestActoresPersonalizados(unittest.TestCase):
     app = QtGui.QApplication(sys.argv)
 
@@ -70,6 +70,160 @@ class TestColisiones(unittest.TestCase):
         # Dispara las funciones de colision.
         self.pilas.colisiones.actualizar()
 
+    def testColisionesEntreGruposQueCambian(self):
+        monos = self.pilas.actores.Grupo()
+        aceituna = self.pilas.actores.Aceituna()
+        colisiones = []
+
+        def colisionan(actor1, actor2):
+            colisiones.append((actor1, actor2))
+
+        self.pilas.colisiones.agregar(monos, aceituna, colisionan)
+
+        # El actor se suma al grupo luego de programar la colisión.
+        mono = self.pilas.actores.Mono()
+        monos.agregar(mono)
+
+        self.pilas.colisiones.notificar_colision(aceituna.figura_de_colision, mono.figura_de_colision)
+        self.pilas.colisiones.actualizar()
+        self.assertEquals(colisiones, [(mono, aceituna)])
+
+    def testColisionesEntreListasQueCambian(self):
+        disparos = []
+        aceituna = self.pilas.actores.Aceituna()
+        colisiones = []
+
+        def colisionan(actor1, actor2):
+            colisiones.append((actor1, actor2))
+
+        self.pilas.colisiones.agregar(disparos, aceituna, colisionan)
+
+        # Igual que en la habilidad Disparar, la lista se completa
+        # luego de programar la colisión.
+        disparo = self.pilas.actores.Mono()
+        disparos.append(disparo)
+
+        self.pilas.simular_actualizacion_logica()
+        self.assertFalse(disparo.tiene_figura_de_colision_pendiente())
+
+        self.pilas.colisiones.notificar_colision(disparo.figura_de_colision, aceituna.figura_de_colision)
+        self.pilas.colisiones.actualizar()
+        self.assertEquals(colisiones, [(disparo, aceituna)])
+
+    def testRecorreLasListasUnaVezPorActualizacion(self):
+        disparos = [self.pilas.actores.Mono() for _ in range(10)]
+        aceituna = self.pilas.actores.Aceituna()
+        colisiones = self.pilas.colisiones
+        colisiones.agregar(disparos, aceituna, lambda: None)
+
+        self.assertTrue(colisiones._participa_de_colisiones(disparos[0]))
+        ids_por_lista = colisiones._ids_por_lista
+        self.assertTrue(colisiones._participa_de_colisiones(disparos[-1]))
+        self.assertIs(colisiones._ids_por_lista, ids_por_lista)
+
+        otro = self.pilas.actores.Mono()
+        disparos.append(otro)
+        colisiones.actualizar()
+        self.assertTrue(colisiones._participa_de_colisiones(otro))
+
+    def testOlvidaALosActoresEliminados(self):
+        mono = self.pilas.actores.Mono()
+        aceituna = self.pilas.actores.Aceituna()
+        self.pilas.colisiones.agregar(mono, aceituna, lambda: None)
+
+        mono.eliminar()
+        self.pilas.simular_actualizacion_logica()
+        self.assertNotIn(id(mono), self.pilas.colisiones._colisiones_por_participante)
+        self.assertIn(id(aceituna), self.pilas.colisiones._colisiones_por_participante)
+
+    def testAgrupaLasNotificacionesDeUnMismoPar(self):
+        mono = self.pilas.actores.Mono()
+        aceituna = self.pilas.actores.Aceituna()
+        colisiones = []
+
+        self.pilas.colisiones.agregar(mono, aceituna, lambda a, b: colisiones.append((a, b)))
+        self.pilas.colisiones.notificar_colision(mono.figura_de_colision, aceituna.figura_de_colision)
+        self.pilas.colisiones.notificar_colision(aceituna.figura_de_colision, mono.figura_de_colision)
+        self.pilas.colisiones.actualizar()
+
+        self.assertEquals(len(colisiones), 1, "Invoca una sola vez por par")
+        self.assertEquals(len(self.pilas.colisiones.entrantes), 1)
+
+        self.pilas.colisiones.actualizar()
+        self.assertEquals(len(self.pilas.colisiones.entrantes), 0)
+        self.assertEquals(len(self.pilas.colisiones.permanentes), 1)
+
+    def testLosActoresCreanSuFiguraSoloAlColisionar(self):
+        mono = self.pilas.actores.Mono()
+        aceituna = self.pilas.actores.Aceituna()
+        self.assertTrue(mono.tiene_figura_de_colision_pendiente(),
+                        "No crea la figura al iniciar")
+
+        self.pilas.colisiones.agregar(mono, aceituna, lambda: None)
+        self.assertFalse(mono.tiene_figura_de_colision_pendiente())
+        self.assertFalse(aceituna.tiene_figura_de_colision_pendiente())
+
+    def testLasEtiquetasCreanLasFigurasDeLosActores(self):
+        mono = self.pilas.actores.Mono()
+        self.pilas.colisiones.agregar("mono", "aceituna", lambda: None)
+        self.assertFalse(mono.tiene_figura_de_colision_pendiente())
+
+        # Los actores nuevos la crean en su primer actualización.
+        aceituna = self.pilas.actores.Aceituna()
+        self.assertTrue(aceituna.tiene_figura_de_colision_pendiente())
+        self.pilas.simular_actualizacion_logica()
+        self.assertFalse(aceituna.tiene_figura_de_colision_pendiente())
+
+    def testSePuedenDeshabilitarLosSensoresImplicitos(self):
+        self.pilas.escena_actual().sensores_implicitos = False
+        mono = self.pilas.actores.Mono()
+        self.pilas.colisiones.agregar("mono", "aceituna", lambda: None)
+        self.pilas.simular_actualizacion_logica()
+        self.assertTrue(mono.tiene_figura_de_colision_pendiente())
+
+    def testColisionesConHashEspacial(self):
+        self.pilas.escena_actual().definir_motor_de_colisiones('hash_espacial')
+        mono = self.pilas.actores.Mono()
+        aceituna = self.pilas.actores.Aceituna(x=500)
+        colisiones = []
+
+        def colisionan(actor1, actor2):
+            colisiones.append((actor1, actor2))
+
+        self.pilas.colisiones.agregar("mono", "aceituna", colisionan)
+        self.assertTrue(mono.tiene_figura_de_colision_pendiente(),
+                        "No usa el motor de física")
+
+        self.pilas.colisiones.actualizar()
+        self.assertEquals(colisiones, [])
+
+        aceituna.x = 10
+        self.pilas.colisiones.actualizar()
+        self.pilas.colisiones.actualizar()
+        self.assertEquals(colisiones, [(mono, aceituna)],
+                          "Notifica una sola vez al comenzar el contacto")
+
+    def testHashEspacialConFigurasRectangulares(self):
+        self.pilas.escena_actual().definir_motor_de_colisiones('hash_espacial')
+        plataforma = self.pilas.actores.Actor()
+        plataforma.definir_area_colision(0, 0, 200, 20)
+        aceituna = self.pilas.actores.Aceituna(x=95)
+        colisiones = []
+
+        def colisionan(actor1, actor2):
+            colisiones.append((actor1, actor2))
+
+        self.pilas.colisiones.agregar(plataforma, aceituna, colisionan)
+        self.pilas.colisiones.actualizar()
+        self.assertEquals(colisiones, [(plataforma, aceituna)],
+                          "Usa el ancho del rectangulo, no el radio")
+
+        aceituna.x = 0
+        aceituna.y = 40
+        self.pilas.colisiones.actualizar()
+        salientes = [set(par) for par in self.pilas.colisiones.salientes]
+        self.assertEquals(salientes, [set([plataforma, aceituna])])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -30,6 +30,175 @@ class TestEscenas(unittest.TestCase):
         with self.assertRaises(Exception):
             EscenaNueva()
 
+    def testInterpolaLasTransformacionesDeLosActores(self):
+        escena = self.pilas.escena_actual()
+        actor = self.pilas.actores.Aceituna()
+        actor.x = 0
+        actor.rotacion = 350
+
+        escena.guardar_transformaciones_de_actores()
+        actor.x = 100
+        actor.rotacion = 10
+
+        modificados = escena.interpolar_transformaciones_de_actores(0.5)
+        self.assertEquals(actor.x, 50)
+        self.assertEquals(actor.rotacion, 0, "Gira por el camino mas corto.")
+
+        escena.restaurar_transformaciones_de_actores(modificados)
+        self.assertEquals(actor.x, 100)
+        self.assertEquals(actor.rotacion, 10)
+
+    def testDibujaLosActoresEstaticosUnaSolaVez(self):
+        escena = self.pilas.escena_actual()
+        escena.fondo.estatico = True
+        quieto = self.pilas.actores.Aceituna(-100, 0)
+        quieto.estatico = True
+        self.pilas.actores.Aceituna(100, 0)
+
+        imagen = QtGui.QImage(640, 480, QtGui.QImage.Format_ARGB32)
+        painter = QtGui.QPainter(imagen)
+        escena.dibujar_actores(painter)
+        escena.dibujar_actores(painter)
+        self.assertEquals(escena.capa_estatica.reconstrucciones, 1)
+
+        quieto.x = -90
+        escena.dibujar_actores(painter)
+        painter.end()
+        self.assertEquals(escena.capa_estatica.reconstrucciones, 2)
+
+    def testLosActoresEstaticosRespetanElOrdenDeDibujado(self):
+        escena = self.pilas.escena_actual()
+        escena.fondo.estatico = True
+        self.pilas.actores.Aceituna(100, 0)
+
+        adelante = self.pilas.actores.Aceituna(-100, 0)
+        adelante.z = -10
+        adelante.estatico = True
+
+        marco = self.pilas.actores.Aceituna(0, 100)
+        marco.fijo = True
+        marco.estatico = True
+
+        estaticos = escena.capa_estatica.obtener_actores()
+        self.assertEquals(len(estaticos), 1, "Solo el fondo esta detras de todo.")
+        self.assertIs(estaticos[0], escena.fondo)
+
+    def testInformaSoloLasRegionesModificadas(self):
+        escena = self.pilas.escena_actual()
+        escena.fondo.estatico = True
+        movil = self.pilas.actores.Aceituna(100, 0)
+        regiones = escena.regiones_modificadas
+
+        self.assertEquals(regiones.obtener_rectangulos(), None,
+                          "La primera vez se pinta toda la ventana.")
+        self.assertEquals(regiones.obtener_rectangulos(), [])
+
+        movil.x = 120
+        self.assertEquals(len(regiones.obtener_rectangulos()), 2,
+                          "Se pinta la posicion anterior y la nueva.")
+
+        self.pilas.camara.x = 10
+        self.assertEquals(regiones.obtener_rectangulos(), None)
+
+    def testPintaTodoSiUnActorTieneUnaImagenRepetida(self):
+        escena = self.pilas.escena_actual()
+        escena.fondo.estatico = True
+        movil = self.pilas.actores.Aceituna(100, 0)
+        movil.imagen.repetir_horizontal = True
+        regiones = escena.regiones_modificadas
+
+        regiones.obtener_rectangulos()
+        movil.x = 120
+        self.assertEquals(regiones.obtener_rectangulos(), None)
+
+    def testLaFirmaDeDibujadoSoloCambiaSiCambiaLaEscena(self):
+        escena = self.pilas.escena_actual()
+        movil = self.pilas.actores.Aceituna(100, 0)
+        regiones = escena.regiones_modificadas
+
+        firma = regiones.obtener_firma()
+        self.assertEquals(regiones.obtener_firma(), firma)
+
+        movil.x = 120
+        self.assertNotEquals(regiones.obtener_firma(), firma)
+
+    def testNoDibujaLosActoresFueraDeLaCamara(self):
+        escena = self.pilas.escena_actual()
+        self.pilas.actores.Aceituna(0, 0)
+        self.pilas.actores.Aceituna(5000, 0)
+        self.pilas.actores.Aceituna(0, -5000)
+
+        imagen = QtGui.QImage(640, 480, QtGui.QImage.Format_ARGB32)
+        painter = QtGui.QPainter(imagen)
+        escena.dibujar_actores(painter)
+
+        # El fondo se dibuja siempre, junto a la aceituna del centro.
+        self.assertEquals(escena.obtener_cantidad_de_actores_dibujados(), (2, 2))
+
+        self.pilas.camara.x = 5000
+        escena.dibujar_actores(painter)
+        painter.end()
+        self.assertEquals(escena.obtener_cantidad_de_actores_dibujados(), (2, 2))
+
+    def testSoloVuelveAUbicarALosActoresModificados(self):
+        escena = self.pilas.escena_actual()
+        quieto = self.pilas.actores.Aceituna(0, 0)
+        lejano = self.pilas.actores.Aceituna(5000, 0)
+
+        imagen = QtGui.QImage(640, 480, QtGui.QImage.Format_ARGB32)
+        painter = QtGui.QPainter(imagen)
+        escena.dibujar_actores(painter)
+        self.assertEquals(escena.indice_de_visibilidad._modificados, {})
+
+        # Las interpolaciones también avisan que el actor se movió.
+        lejano.x = [0], 0.1
+
+        for _ in range(10):
+            escena.actualizar_interpolaciones()
+
+        self.assertIn(id(lejano), escena.indice_de_visibilidad._modificados)
+        self.assertNotIn(id(quieto), escena.indice_de_visibilidad._modificados)
+
+        escena.dibujar_actores(painter)
+        painter.end()
+        self.assertEquals(escena.obtener_cantidad_de_actores_dibujados(), (3, 0))
+
+    def testDibujaLosFondosRepetidosAunqueSeMuevaLaCamara(self):
+        escena = self.pilas.escena_actual()
+        fondo = self.pilas.fondos.Fondo()
+        fondo.imagen = self.pilas.imagenes.cargar('aceituna.png')
+
+        imagen = QtGui.QImage(640, 480, QtGui.QImage.Format_ARGB32)
+        painter = QtGui.QPainter(imagen)
+        escena.dibujar_actores(painter)
+
+        fondo.imagen.repetir_horizontal = True
+        fondo.imagen.repetir_vertical = True
+        self.pilas.camara.x = 5000
+        self.pilas.camara.y = 5000
+        escena.dibujar_actores(painter)
+        painter.end()
+        self.assertIn(fondo, escena._obtener_actores_visibles())
+
+    def testMantieneLosActoresOrdenadosPorZ(self):
+        escena = self.pilas.escena_actual()
+        a = self.pilas.actores.Aceituna()
+        b = self.pilas.actores.Aceituna()
+        c = self.pilas.actores.Aceituna()
+
+        c.z = 10
+        a.z = -10
+        self.assertEquals(escena._actores.obtener_actores()[-3:], [c, b, a])
+
+        escena.definir_orden_por_y()
+        a.z = b.z = c.z = 0
+        a.y = -50
+        b.y = 50
+        c.y = 0
+        escena._actores.actualizar_orden_por_y()
+        self.assertEquals(escena._actores.obtener_actores()[-3:], [b, c, a],
+                          "A igual z se dibuja primero el que esta mas arriba.")
+
 
 if __name__ == '__main__':
     unittest.main()
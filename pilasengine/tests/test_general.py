@@ -15,5 +15,31 @@ class TestGeneral(unittest.TestCase):
     def testEscribirConAvisar(self):
         actor = self.pilas.avisar("Hola mundo !!")
 
+    def testRecuerdaLasRutasALosRecursos(self):
+        ruta = self.pilas.obtener_ruta_al_recurso("aceituna.png")
+        self.assertIn("aceituna.png", pilasengine.utils._indice_de_rutas)
+        self.assertEquals(ruta, self.pilas.obtener_ruta_al_recurso("aceituna.png"))
+
+        self.pilas.utils.agregar_ruta_personalizada("/tmp/pilas_test_rutas")
+        self.assertNotIn("aceituna.png", pilasengine.utils._indice_de_rutas,
+                         "Se olvidan las rutas al cambiar los directorios")
+
+    def testEjecutaLasTareasEnOrden(self):
+        tareas = self.pilas.tareas
+        llamadas = []
+
+        tareas.siempre(0.5, llamadas.append, 'siempre')
+        tareas.una_vez(0.1, llamadas.append, 'una_vez')
+        cancelada = tareas.una_vez(0.2, llamadas.append, 'cancelada')
+        tareas.eliminar_tarea(cancelada)
+
+        self.assertEquals(tareas.obtener_cantidad_de_tareas_planificadas(), 2)
+
+        for _ in range(61):
+            tareas.actualizar(1 / 60.0)
+
+        self.assertEquals(llamadas, ['una_vez', 'siempre', 'siempre'])
+        self.assertEquals(tareas.obtener_cantidad_de_tareas_planificadas(), 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
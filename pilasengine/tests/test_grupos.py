@@ -63,5 +63,40 @@ class Test(unittest.TestCase):
         self.assertEqual(1, actor.obtener_cantidad_de_grupos_al_que_pertenece(),
                          "Regresa a estar en un solo grupo")
 
+    def testReutilizaLasListasFiltradas(self):
+        grupo = self.pilas.actores.Grupo()
+        actor = self.pilas.actores.Aceituna()
+        grupo.agregar(actor)
+
+        normales = grupo.iterar_actores(fijos=False, sin_padre=True)
+        self.assertIs(normales, grupo.iterar_actores(fijos=False, sin_padre=True),
+                      "No se copia la lista si el grupo no cambia")
+
+        actor.fijo = True
+        self.assertEquals(grupo.iterar_actores(fijos=False, sin_padre=True), [])
+        self.assertEquals(grupo.iterar_actores(fijos=True, sin_padre=True), [actor])
+
+        padre = self.pilas.actores.Aceituna()
+        padre.agregar(actor)
+        self.assertEquals(grupo.iterar_actores(fijos=True, sin_padre=True), [])
+
+    def testEliminaMuchosActoresJuntos(self):
+        grupo = self.pilas.actores.Grupo()
+        actores = [self.pilas.actores.Aceituna() for x in range(10)]
+
+        for actor in actores:
+            grupo.agregar(actor)
+
+        for actor in actores[::2]:
+            grupo.eliminar(actor)
+
+        self.assertEqual(5, len(grupo))
+        self.assertEqual(actores[1::2], grupo.obtener_actores())
+
+        grupo.eliminar(actores[1])
+        grupo.agregar(actores[1])
+        self.assertEqual(actores[3::2] + [actores[1]], grupo.obtener_actores(),
+                         "Se puede volver a agregar un actor eliminado")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
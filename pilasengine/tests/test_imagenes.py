@@ -0,0 +1,197 @@
+# -*- encoding: utf-8 -*-
+import gc
+import sys
+import unittest
+import weakref
+
+from PyQt4 import QtGui
+
+import pilasengine
+
+
+class TestImagenes(unittest.TestCase):
+    app = QtGui.QApplication(sys.argv)
+
+    def setUp(self):
+        self.pilas = pilasengine.iniciar(modo_test=True)
+        self.pilas.imagenes.vaciar_cache()
+
+    def testComparteElPixmapEntreImagenes(self):
+        imagen_a = self.pilas.imagenes.cargar("aceituna.png")
+        imagen_b = self.pilas.imagenes.cargar("aceituna.png")
+
+        self.assertIsNot(imagen_a, imagen_b, "Cada carga retorna una imagen nueva")
+        self.assertIs(imagen_a._imagen, imagen_b._imagen, "Pero comparten el pixmap")
+
+        estadisticas = self.pilas.imagenes.obtener_estadisticas_de_cache()
+        self.assertEquals(estadisticas['fallos'], 1)
+        self.assertEquals(estadisticas['aciertos'], 1)
+
+    def testPuedePrecargarImagenes(self):
+        self.pilas.imagenes.precargar("aceituna.png", "sin_imagen.png")
+        self.pilas.actores.Aceituna()
+
+        estadisticas = self.pilas.imagenes.obtener_estadisticas_de_cache()
+        self.assertEquals(estadisticas['fallos'], 2, "El actor no lee archivos")
+        self.assertTrue(estadisticas['aciertos'] >= 2)
+
+    def testDescartaImagenesAlSuperarElLimite(self):
+        self.pilas.imagenes.definir_limite_de_cache(1)
+
+        self.pilas.imagenes.cargar("aceituna.png")
+        self.pilas.imagenes.cargar("mono.png")
+
+        estadisticas = self.pilas.imagenes.obtener_estadisticas_de_cache()
+        self.assertEquals(estadisticas['imagenes'], 1, "Solo conserva la ultima imagen")
+        self.pilas.imagenes.definir_limite_de_cache(64 * 1024 * 1024)
+
+    def testLaSuperficiePorPartesSoloArmaLasPartesVisibles(self):
+        superficie = self.pilas.imagenes.crear_superficie_por_partes(2048, 1024)
+        grilla = self.pilas.imagenes.cargar_grilla("grillas/plataformas_10_10.png", 10, 10)
+
+        grilla.dibujarse_sobre_una_pizarra(superficie, 0, 0)
+        grilla.dibujarse_sobre_una_pizarra(superficie, 1800, 900)
+
+        superficie.definir_area_visible(0, 0, 640, 480)
+        superficie._dibujar_pixmap(QtGui.QPainter())
+
+        estadisticas = superficie.obtener_estadisticas()
+        self.assertEquals(estadisticas['partes_con_dibujos'], 2)
+        self.assertEquals(estadisticas['partes_construidas'], 1)
+
+    def testElPuntajeReutilizaElAtlasDeCaracteres(self):
+        puntaje = self.pilas.actores.Puntaje()
+        imagen = puntaje.imagen
+        atlas = imagen.atlas
+
+        puntaje.aumentar(10)
+        reconstrucciones = atlas.reconstrucciones
+        puntaje.aumentar(1)
+        puntaje.reducir(1)
+
+        self.assertIs(imagen, puntaje.imagen, "No se crean imagenes nuevas")
+        self.assertEquals(reconstrucciones, atlas.reconstrucciones)
+        self.assertEquals(puntaje.texto, "10")
+        self.assertTrue(imagen.ancho() > 0)
+
+        otro = self.pilas.actores.Puntaje(color=puntaje.color)
+        self.assertIs(otro.imagen.atlas, atlas, "Comparten el atlas")
+
+    def testRecuerdaLasMedidasDeLosTextos(self):
+        medida = self.pilas.utils.obtener_area_de_texto("Hola mundo")
+        self.assertEquals(medida, self.pilas.utils.obtener_area_de_texto("Hola mundo"))
+
+        estadisticas = self.pilas.imagenes.obtener_estadisticas_de_textos()
+        self.assertEquals(estadisticas['medidas']['fallos'], 1)
+        self.assertEquals(estadisticas['medidas']['aciertos'], 1)
+
+    def testPuedeCompartirLasImagenesDeTextosIguales(self):
+        crear_texto = self.pilas.imagenes.crear_texto
+        texto_a = crear_texto("Jugar", 20, False, None, "blanco", 0, usar_cache=True)
+        texto_b = crear_texto("Jugar", 20, False, None, "blanco", 0, usar_cache=True)
+        texto_c = crear_texto("Jugar", 20, False, None, "blanco", 0)
+
+        self.assertIs(texto_a._imagen, texto_b._imagen)
+        self.assertIsNot(texto_a._imagen, texto_c._imagen)
+        self.assertEquals(texto_b.ancho(), texto_c.ancho())
+
+    def testPuedeDibujarEnLoteSobreUnaSuperficie(self):
+        superficie = self.pilas.imagenes.crear_superficie(100, 100)
+        rojo = pilasengine.colores.rojo
+
+        with superficie.lote():
+            self.assertTrue(superficie.canvas.isActive())
+            superficie.poligono([(0, 50), (50, 50), (99, 50)], rojo, 3)
+            superficie.limpiar()
+            superficie.linea(0, 10, 99, 10, rojo, 3)
+
+        self.assertFalse(superficie.canvas.isActive())
+
+        imagen = superficie._imagen.toImage()
+        self.assertEquals(QtGui.qRed(imagen.pixel(50, 10)), 255)
+        self.assertEquals(QtGui.qAlpha(imagen.pixel(50, 50)), 0,
+                          "Se puede limpiar dentro del lote")
+
+    def testLosTextosDeUnLoteUsanLaFuentePorOmision(self):
+        superficie = self.pilas.imagenes.crear_superficie(100, 100)
+
+        with superficie.lote():
+            # Simula la fuente que dejó un texto anterior del mismo lote.
+            superficie.canvas.setFont(QtGui.QFont("Courier", 20))
+            superficie.texto("hola")
+            self.assertEquals(superficie.canvas.font().family(),
+                              QtGui.QFont().family())
+
+    def testPuedeAgruparImagenesEnUnAtlas(self):
+        atlas = self.pilas.imagenes.crear_atlas(["aceituna.png",
+                                                 "grillas/plataformas_10_10.png"])
+        self.assertEquals(atlas.obtener_cantidad_de_paginas(), 1)
+
+        try:
+            imagen = self.pilas.imagenes.cargar("aceituna.png")
+            grilla = self.pilas.imagenes.cargar_grilla("grillas/plataformas_10_10.png", 10, 10)
+            original = QtGui.QPixmap(self.pilas.obtener_ruta_al_recurso("aceituna.png"))
+
+            self.assertIs(imagen._imagen, grilla._imagen, "Comparten la misma textura")
+            self.assertEquals(imagen.ancho(), original.width())
+            x, y = original.width() / 2, original.height() / 2
+            self.assertEquals(imagen.obtener_pixmap().toImage().pixel(x, y),
+                              original.toImage().pixel(x, y))
+        finally:
+            self.pilas.imagenes.olvidar_atlas()
+
+    def testLasParticulasUsanSuParteDelAtlas(self):
+        def dibujar_particula():
+            emisor = self.pilas.actores.Emisor()
+            emisor._particulas.agregar(20, -20, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 1)
+
+            imagen = QtGui.QImage(40, 40, QtGui.QImage.Format_ARGB32)
+            imagen.fill(0)
+            painter = QtGui.QPainter(imagen)
+            emisor._particulas.dibujar(painter, emisor.imagen_particula, 0, 0)
+            painter.end()
+            return imagen, emisor.imagen_particula
+
+        esperada, _ = dibujar_particula()
+        self.pilas.imagenes.crear_atlas(["aceituna.png", "particula.png"])
+
+        try:
+            imagen, grilla = dibujar_particula()
+            self.assertNotEquals(grilla.obtener_origen(), (0, 0))
+            self.assertEquals(imagen, esperada)
+        finally:
+            self.pilas.imagenes.olvidar_atlas()
+
+    def testLasAnimacionesCompartenLosCuadrosDeLaGrilla(self):
+        grilla = self.pilas.imagenes.cargar_grilla("explosion.png", 7)
+        animacion_a = self.pilas.actores.Animacion(grilla, ciclica=True)
+        animacion_b = self.pilas.actores.Animacion(grilla, ciclica=True)
+
+        cursor_a = animacion_a.imagen
+        cursor_b = animacion_b.imagen
+        self.assertIsNot(cursor_a, cursor_b)
+        self.assertIs(cursor_a._hoja, grilla._hoja, "Comparten la hoja de cuadros")
+        self.assertFalse(hasattr(cursor_a, '__dict__'))
+        self.assertEquals(cursor_a.ancho(), grilla.cuadro_ancho)
+
+        cursor_a.avanzar(61)
+        self.assertEquals(cursor_a.obtener_cuadro(), 1)
+        self.assertEquals(cursor_b.obtener_cuadro(), 0)
+        self.assertEquals(grilla.obtener_cuadro(), 0)
+
+    def testLaHojaDeCuadrosSeLiberaSinGrillas(self):
+        grilla = self.pilas.imagenes.cargar_grilla("explosion.png", 7)
+        cursor = grilla.crear_cursor()
+        hoja = weakref.ref(grilla._hoja)
+
+        del grilla
+        gc.collect()
+        self.assertIs(hoja(), cursor._hoja, "El cursor la mantiene")
+
+        del cursor
+        gc.collect()
+        self.assertIsNone(hoja())
+
+
+if __name__ == '__main__':
+    unittest.main()
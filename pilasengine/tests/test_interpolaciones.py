@@ -40,5 +40,52 @@ class TestInterpolaciones(unittest.TestCase):
 
         self.assertEqual(0, un_actor.y, "La posicion inicial y es 0")
 
+    def testInterpolaGruposDeActores(self):
+        aceituna = self.pilas.actores.Aceituna()
+        grupo = aceituna * 10
+        grupo.x = [300]
+        grupo.rotacion = [360]
+
+        escena = self.pilas.obtener_escena_actual()
+
+        for _ in range(15):
+            escena.actualizar_interpolaciones()
+
+        self.assertTrue(0 < aceituna.x < 300, "Esta a mitad de camino")
+
+        for _ in range(15):
+            escena.actualizar_interpolaciones()
+
+        self.assertEqual([actor.x for actor in grupo], [300] * 10)
+        self.assertEqual([actor.rotacion for actor in grupo], [0] * 10)
+        self.assertEqual(self.pilas.utils.obtener_cantidad_de_interpolaciones(), 0)
+
+    def testAlMuestrearNoLlamaAFuncionesNiSetters(self):
+        class Objeto(object):
+            def __init__(self):
+                self.valores = []
+
+            def get_valor(self):
+                return 0
+
+            def set_valor(self, valor):
+                self.valores.append(valor)
+
+        aceituna = self.pilas.actores.Aceituna()
+        objeto = Objeto()
+        tweener = self.pilas.obtener_escena_actual().tweener
+        tweener.add_tween(aceituna, x=300, tween_time=1, tween_type=tweener.LINEAR)
+        tweener.add_tween(objeto, set_valor=100, tween_time=1, tween_type=tweener.LINEAR)
+        tweener.update(tweener.step)
+        x = aceituna.x
+
+        tweener.sample(0.5)
+        self.assertTrue(0 < aceituna.x < x, "Muestrea los atributos directos")
+        tweener.restore()
+
+        self.assertEqual(aceituna.x, x)
+        self.assertEqual(len(objeto.valores), 1, "Solo se llama en cada tick")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -10,7 +10,6 @@ import sys
 import uuid
 import math
 
-from pilasengine import colores
 
 from PyQt4 import QtCore
 from PyQt4 import QtGui
@@ -20,6 +19,12 @@ INTERPRETE_PATH = os.path.dirname(sys.argv[0])
 
 rutas_personalizadas = []
 
+# Rutas a recursos que ya se encontraron alguna vez (ver la función
+# obtener_ruta_al_recurso). Se vacía cuando cambian los directorios
+# de búsqueda.
+_indice_de_rutas = {}
+_directorio_del_indice = None
+
 # Relación de pixels por metro (para el motor de física).
 PPM = 30
 
@@ -35,9 +40,8 @@ class Utils(object):
 
     def obtener_area_de_texto(self, cadena, magnitud=10, vertical=False,
                               fuente=None, ancho=0):
-        texto = self.pilas.imagenes.crear_texto(cadena, magnitud, vertical,
-                                                fuente, colores.blanco, ancho)
-        return (texto.ancho(), texto.alto())
+        return self.pilas.imagenes.medir_texto(cadena, magnitud, vertical,
+                                               fuente, ancho)
 
     def es_interpolacion(self, valor):
         return isinstance(valor, list) or (isinstance(valor, tuple) and
@@ -112,6 +116,7 @@ class Utils(object):
 
         if ruta not in rutas_personalizadas:
             rutas_personalizadas.append(ruta)
+            vaciar_indice_de_rutas()
 
     def obtener_directorio_de_configuracion(self):
         """" Retorna la ruta de configuracion segun la plataforma"""
@@ -162,7 +167,40 @@ def convertir_a_pixels(valor):
     return valor * PPM
 
 
+def vaciar_indice_de_rutas():
+    """Olvida las rutas a recursos encontradas anteriormente.
+
+    Se tiene que llamar cuando aparecen o desaparecen archivos en los
+    directorios de búsqueda, por ejemplo al reiniciar en modo livecoding.
+    """
+    _indice_de_rutas.clear()
+
+
 def obtener_ruta_al_recurso(ruta):
+    """Retorna la ruta completa a un recurso (imagen, sonido, mapa etc.)
+
+    Las rutas encontradas se recuerdan, así que solo la primer búsqueda
+    de cada recurso tiene que consultar al sistema de archivos.
+    """
+    global _directorio_del_indice
+
+    # La búsqueda incluye el directorio actual, así que si
+    # cambia las rutas anteriores ya no son validas.
+    directorio_actual = os.getcwd()
+
+    if directorio_actual != _directorio_del_indice:
+        vaciar_indice_de_rutas()
+        _directorio_del_indice = directorio_actual
+
+    if ruta in _indice_de_rutas:
+        return _indice_de_rutas[ruta]
+
+    ruta_completa = _buscar_ruta_al_recurso(ruta)
+    _indice_de_rutas[ruta] = ruta_completa
+    return ruta_completa
+
+
+def _buscar_ruta_al_recurso(ruta):
     global rutas_personalizadas
 
     dirs = ['./', '/../data',
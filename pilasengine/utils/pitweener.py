@@ -34,6 +34,26 @@
 import time
 import math
 
+# Differences in seconds below this value are considered rounding errors.
+EPSILON = 1e-9
+
+# Properties whose setter only stores the value in an instance attribute
+# (a "slot"), see ``register_direct_slot``.
+DIRECT_SLOTS = {}
+
+
+def register_direct_slot(descriptor, slot, transform=None, notify=None):
+    """Lets tweens write a property's value straight into ``slot``.
+
+       ``descriptor`` is the property object of a class. Tweens on that
+       property skip its setter and assign ``transform(value)`` (or the
+       plain value) to the instance attribute ``slot``. Subclasses that
+       redefine the property keep using their own setter.
+
+       If given, ``notify(obj)`` is called after each assignment.
+       """
+    DIRECT_SLOTS[descriptor] = (slot, transform, notify)
+
 class TweenerEquations(object):
     """A set of predefined interpolation (tweening) equations. They are ported
        from the work of Robert Penner. Each equation takes 4 arguments, the
@@ -125,16 +145,30 @@ class TweenerEquations(object):
         return (a * 2. ** (-10. * t) * math.sin((t * d - s) * (2. * math.pi)
                                                 / p) + c + b)
 
+# Equations that can be written as ``b + c * f(t, d)``. Tweens using
+# them share ``f`` with every other tween that has the same equation,
+# duration and elapsed time, so it is computed once per update.
+LINEAR_EQUATIONS = set(getattr(TweenerEquations, name).__func__ for name in [
+    'OUT_EXPO', 'LINEAR', 'IN_QUAD', 'OUT_QUAD', 'IN_OUT_QUAD',
+    'OUT_IN_QUAD', 'IN_CUBIC', 'OUT_CUBIC', 'IN_OUT_CUBIC', 'OUT_IN_CUBIC',
+    'IN_QUART', 'OUT_QUART', 'IN_OUT_QUART'])
+
+
 class Tweener(TweenerEquations):
     """This class manages all active tweens, and provides a factory for
         creating and spawning tween motions.
+
+        Tweens advance by a fixed ``step`` (one logic tick) instead of
+        measuring wall-clock time, so they stay in sync with physics and
+        tasks, and replays are reproducible.
         """
 
-    def __init__(self):
+    def __init__(self, step=1/60.0):
         self.current_tweens = []
         self.default_tween_type = self.IN_OUT_QUAD
         self.default_duration = 1.0
-        self.prev_time = time.time()
+        self.step = step
+        self.interpolate_on_render = False
 
     def count_tweens(self):
         return len(self.current_tweens)
@@ -244,26 +278,56 @@ class Tweener(TweenerEquations):
            paused.
 
            ``time_since_last_frame`` is the change in time in seconds. If no
-           value is passed, the change in time is measured with time.time() from
-           the previous call of this function. If it is the first time calling
-           this function, timing is measured from the construction of the
-           Tweener engine.
+           value is passed, the tweens advance by one fixed ``step``.
            """
-        current_time = time.time()
         if time_since_last_frame is None:
-            time_since_last_frame = current_time - self.prev_time
-        self.prev_time = current_time
-        for t in self.current_tweens:
-            t.update(time_since_last_frame)
-            if t.complete:
-                self.current_tweens.remove(t)
+            time_since_last_frame = self.step
+
+        # Eased factors already computed in this update, shared by all
+        # the tweens with the same equation, duration and elapsed time.
+        factors = {}
+
+        # Tweens added or removed by callbacks during this update must not
+        # change the list being iterated, or some tweens would be skipped.
+        for t in list(self.current_tweens):
+            if not t.complete:
+                t.update(time_since_last_frame, factors)
+
+        self.current_tweens = [t for t in self.current_tweens
+                               if not t.complete]
 
     def update_time_without_motion(self):
-        current_time = time.time()
-        self.prev_time = current_time
+        """Kept for compatibility: tweens no longer measure elapsed time,
+           so there is nothing to discard while paused.
+           """
+        pass
 
     def force_update_one_frame(self):
-        self.update(1/60.0)
+        self.update(self.step)
+
+    def sample(self, alpha):
+        """Apply the value of every running tween at a point between the
+           previous logic tick (``alpha`` = 0) and the last one
+           (``alpha`` = 1).
+
+           It is meant to be called just before drawing, and must be
+           followed by ``restore`` once drawing is done.
+
+           Only properties registered with ``register_direct_slot`` are
+           sampled: setters and function tweens may have side effects,
+           so they keep the value of the last logic tick.
+           """
+        offset = (1.0 - alpha) * self.step
+
+        for t in self.current_tweens:
+            if not t.paused:
+                t.apply_slots(max(0, t.delta - offset))
+
+    def restore(self):
+        "Apply again the values of the last logic tick after ``sample``."
+        for t in self.current_tweens:
+            if not t.paused:
+                t.apply_slots(t.delta)
 
 
 class Tween(object):
@@ -285,6 +349,14 @@ class Tween(object):
         self.t_props = []
         self.t_funcs = []
         self.paused = self.delay > 0
+
+        equation = getattr(tween_type, '__func__', None)
+
+        if equation in LINEAR_EQUATIONS:
+            self.linear_equation = equation
+        else:
+            self.linear_equation = None
+
         self.decode_arguments(inicial)
 
     def decode_arguments(self, inicial):
@@ -345,6 +417,11 @@ class Tween(object):
 
             if prop:
                 tweenable = Tweenable(start_val, change)
+                descriptor = getattr(self.target.__class__, k, None)
+
+                if isinstance(descriptor, property):
+                    tweenable.slot = DIRECT_SLOTS.get(descriptor)
+
                 new_prop = [k, prop, tweenable]
                 self.t_props.append(new_prop)
 
@@ -363,15 +440,24 @@ class Tween(object):
         if self.paused:
             self.paused = False
 
-    def update(self, ptime=None):
+    def update(self, ptime=None, factors=None):
         """Update this tween with the time since the last frame. If there is an
            update function, it is always called whether the tween is running or
            paused. ptime is the change in time in seconds.
+
+           ``factors`` is an optional dict shared by the tweens of one
+           update, see ``apply``.
            """
 
         if self.paused:
             if self.delay > 0:
                 self.delay = max(0, self.delay - ptime)
+
+                # Avoids an extra tick caused by rounding errors when
+                # adding up many fixed steps.
+                if self.delay < EPSILON:
+                    self.delay = 0
+
                 if self.delay == 0:
                     self.paused = False
                     self.delay = -1
@@ -382,17 +468,11 @@ class Tween(object):
 
         self.delta = min(self.delta + ptime, self.duration)
 
-        if not self.complete:
-            for prop_name, prop, tweenable in self.t_props:
-                setattr(self.target, prop,
-                        self.tween(self.delta, tweenable.start_value,
-                                   tweenable.change, self.duration))
-            for func_name, func, tweenable in self.t_funcs:
-                func(
-                    self.tween(self.delta, tweenable.start_value,
-                               tweenable.change, self.duration)
-                )
+        if self.duration - self.delta < EPSILON:
+            self.delta = self.duration
 
+        if not self.complete:
+            self.apply(self.delta, factors)
 
         if self.delta == self.duration:
             self.complete = True
@@ -402,7 +482,72 @@ class Tween(object):
         if self.update_function:
             self.update_function()
 
+    def apply(self, delta, factors=None):
+        """Set every tweened property and function to its value at ``delta``.
+
+           When ``factors`` is a dict and the equation is linear, the eased
+           factor is looked up there (or stored for the next tweens) using
+           the equation, duration and ``delta`` as key.
+           """
+        if self.linear_equation is not None and factors is not None:
+            key = (self.linear_equation, self.duration, delta)
+            factor = factors.get(key)
+
+            if factor is None:
+                factor = self.tween(delta, 0.0, 1.0, self.duration)
+                factors[key] = factor
 
+            target = self.target
+
+            for prop_name, prop, tweenable in self.t_props:
+                value = tweenable.start_value + tweenable.change * factor
+                slot = tweenable.slot
+
+                if slot:
+                    if slot[1]:
+                        value = slot[1](value)
+                    setattr(target, slot[0], value)
+                    if slot[2]:
+                        slot[2](target)
+                else:
+                    setattr(target, prop, value)
+            for func_name, func, tweenable in self.t_funcs:
+                func(tweenable.start_value + tweenable.change * factor)
+            return
+
+        for prop_name, prop, tweenable in self.t_props:
+            value = self.tween(delta, tweenable.start_value,
+                               tweenable.change, self.duration)
+            self._set_property(prop, tweenable, value)
+        for func_name, func, tweenable in self.t_funcs:
+            func(
+                self.tween(delta, tweenable.start_value,
+                           tweenable.change, self.duration)
+            )
+
+    def apply_slots(self, delta):
+        """Like ``apply``, but only for the properties that have a direct
+           slot. Used to draw between two logic ticks.
+           """
+        for prop_name, prop, tweenable in self.t_props:
+            if tweenable.slot:
+                value = self.tween(delta, tweenable.start_value,
+                                   tweenable.change, self.duration)
+                self._set_property(prop, tweenable, value)
+
+    def _set_property(self, prop, tweenable, value):
+        if tweenable.slot:
+            slot, transform, notify = tweenable.slot
+
+            if transform:
+                value = transform(value)
+
+            setattr(self.target, slot, value)
+
+            if notify:
+                notify(self.target)
+        else:
+            setattr(self.target, prop, value)
 
     def get_tweenable(self, name):
         """Return the tweenable values corresponding to the name of the original
@@ -449,6 +594,10 @@ class Tweenable(object):
         self.start_value = start
         self.change = change
 
+        # (attribute, transform, notify) used instead of the property setter,
+        # see register_direct_slot.
+        self.slot = None
+
 
 
 class TweenTestObject(object):
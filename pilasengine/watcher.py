@@ -11,6 +11,8 @@ import glob
 from PyQt4 import QtGui
 from PyQt4 import QtCore
 
+from pilasengine import utils
+
 class Watcher(QtCore.QObject):
 
     def __init__(self, aFile=None, callback=None, checkEvery=2):
@@ -64,6 +66,9 @@ class Watcher(QtCore.QObject):
         #if modificacion != self.ultima_modificacion: # Existe un cambio en el directorio
 
         if anterior_cantidad_archivos_py != self._cantidad_archivos_py or anterior_sumatoria_mtime != self._sumatoria_mtime:
+            # Pueden existir recursos nuevos o eliminados.
+            utils.vaciar_indice_de_rutas()
+
             if self.callback:
                 self.callback()
 
@@ -17,6 +17,10 @@ import fps
 
 from pilasengine.controles import Controles
 
+# Milisegundos entre cada redibujado mientras el juego está en pausa
+# y se usa el bucle con interpolación.
+INTERVALO_EN_REPOSO = 250
+
 def capturar_errores_decorator(func):
     def _decorator(self, *args, **kwargs):
         # access a from TestSample
@@ -63,7 +67,11 @@ class WidgetConAceleracion(QGLWidget):
         self.escala = 1
 
         self.fps = fps.FPS(60)  # 60 Cuadros por segundo.
-        self.timer_id = self.startTimer(1000 / 100.0)
+        self.bucle_con_interpolacion = False
+        self._intervalo_de_intercambio_original = self.format().swapInterval()
+        self._ultimo_dibujado_en_reposo = 0
+        self._firma_del_ultimo_dibujado = None
+        self.timer_id = self.startTimer(self._obtener_intervalo_del_timer())
 
     def detener_bucle_principal(self):
         if self.timer_id:
@@ -76,7 +84,59 @@ class WidgetConAceleracion(QGLWidget):
         if self.timer_id:
             raise Exception("El bucle está en curso, no se puede reiniciar si se está ejecutando.")
         else:
-            self.timer_id = self.startTimer(1000 / 100.0)
+            self.timer_id = self.startTimer(self._obtener_intervalo_del_timer())
+
+    def _obtener_intervalo_del_timer(self):
+        if self.bucle_con_interpolacion:
+            # Un llamado por cuadro, el acumulador decide cuantas
+            # actualizaciones lógicas hacen falta en cada uno.
+            return int(self.fps.frecuencia)
+        else:
+            return 1000 / 100.0
+
+    def definir_bucle_con_interpolacion(self, estado=True, maximo_de_pasos=5):
+        """Cambia la forma en que se actualiza y dibuja el juego.
+
+        Con el bucle con interpolación se acumula el tiempo real de cada
+        cuadro y se realizan tantas actualizaciones lógicas como entren
+        en ese tiempo, pero nunca mas de ``maximo_de_pasos``: si el
+        equipo es muy lento se descarta el tiempo sobrante en lugar de
+        acumular un retraso cada vez mayor.
+
+        Al dibujar, cada actor se muestra entre su estado anterior y el
+        actual según el tiempo que sobró, así el movimiento se ve suave
+        aunque el dibujado no coincida con las actualizaciones.
+
+        Además se sincroniza el dibujado con el refresco del monitor,
+        y mientras el juego está en pausa se redibuja pocas veces por
+        segundo.
+
+        :param estado: True para usar el bucle con interpolación, False para volver al bucle normal.
+        :param maximo_de_pasos: Cantidad máxima de actualizaciones lógicas por cuadro.
+        """
+        self.bucle_con_interpolacion = estado
+
+        if estado:
+            self.fps = fps.FPSConAcumulador(60, maximo_de_pasos)
+        else:
+            self.fps = fps.FPS(60)
+
+        self._sincronizar_con_el_monitor(estado)
+
+        if self.timer_id:
+            self.killTimer(self.timer_id)
+            self.timer_id = self.startTimer(self._obtener_intervalo_del_timer())
+
+    def _sincronizar_con_el_monitor(self, estado):
+        formato = self.format()
+
+        if estado:
+            formato.setSwapInterval(1)
+        else:
+            formato.setSwapInterval(self._intervalo_de_intercambio_original)
+
+        if formato.swapInterval() != self.format().swapInterval():
+            self.setFormat(formato)
 
     def obtener_centro_fisico(self):
         """Retorna el centro de la ventana en pixels."""
@@ -109,6 +169,10 @@ class WidgetConAceleracion(QGLWidget):
         Este método se llama automáticamente 100 veces por segundo, ya
         que se hace una llamada a 'startTimer' indicando esa frecuencia.
         """
+        if self.bucle_con_interpolacion:
+            self._avanzar_bucle_con_interpolacion()
+            return
+
         if not self.pausa:
             if self.capturar_errores:
                 try:
@@ -123,6 +187,49 @@ class WidgetConAceleracion(QGLWidget):
         # Pide redibujar el widget (Qt llamará a paintEvent después).
         self.update()
 
+    def _avanzar_bucle_con_interpolacion(self):
+        """Actualiza la simulación cuando se usa el bucle con interpolación.
+
+        Si el juego está en pausa solo se redibuja cada
+        INTERVALO_EN_REPOSO milisegundos, y si la ventana está oculta
+        se sigue actualizando la lógica pero sin redibujar. Tampoco se
+        redibuja si nada cambió desde el último cuadro.
+        """
+        if self.pausa:
+            self.pilas.realizar_actualizacion_logica_en_modo_pausa()
+            self._firma_del_ultimo_dibujado = None
+
+            # El tiempo en pausa no se tiene que recuperar al continuar.
+            self.fps.reiniciar()
+            actual = self.fps.timer.elapsed()
+
+            if actual - self._ultimo_dibujado_en_reposo > INTERVALO_EN_REPOSO:
+                self._ultimo_dibujado_en_reposo = actual
+                self.update()
+
+            return
+
+        if self.capturar_errores:
+            try:
+                self._realizar_actualizacion_logica()
+            except Exception, e:
+                self.procesar_error(e)
+        else:
+            self._realizar_actualizacion_logica()
+
+        if self.isVisible() and not self.isMinimized() and self._hubo_cambios():
+            self.update()
+
+    def _hubo_cambios(self):
+        """Indica si la escena puede verse distinta que en el último dibujado."""
+        firma = self.pilas.escenas.obtener_firma_de_dibujado()
+
+        if firma is not None and firma == self._firma_del_ultimo_dibujado:
+            return False
+
+        self._firma_del_ultimo_dibujado = firma
+        return True
+
     @capturar_errores_decorator
     def keyPressEvent(self, event):
         if event.isAutoRepeat():
@@ -404,7 +511,13 @@ class WidgetSinAceleracion(QtGui.QWidget):
         self.escala = 1
 
         self.fps = fps.FPS(60)  # 60 Cuadros por segundo.
-        self.timer_id = self.startTimer(1000 / 100.0)
+        self.bucle_con_interpolacion = False
+        self._ultimo_dibujado_en_reposo = 0
+        self._firma_del_ultimo_dibujado = None
+        self.redibujar_por_regiones = False
+        self.window_dx = 0
+        self.window_dy = 0
+        self.timer_id = self.startTimer(self._obtener_intervalo_del_timer())
 
     def detener_bucle_principal(self):
         if self.timer_id:
@@ -417,7 +530,45 @@ class WidgetSinAceleracion(QtGui.QWidget):
         if self.timer_id:
             raise Exception("El bucle está en curso, no se puede reiniciar si se está ejecutando.")
         else:
-            self.timer_id = self.startTimer(1000 / 100.0)
+            self.timer_id = self.startTimer(self._obtener_intervalo_del_timer())
+
+    def _obtener_intervalo_del_timer(self):
+        if self.bucle_con_interpolacion:
+            # Un llamado por cuadro, el acumulador decide cuantas
+            # actualizaciones lógicas hacen falta en cada uno.
+            return int(self.fps.frecuencia)
+        else:
+            return 1000 / 100.0
+
+    def definir_bucle_con_interpolacion(self, estado=True, maximo_de_pasos=5):
+        """Cambia la forma en que se actualiza y dibuja el juego.
+
+        Con el bucle con interpolación se acumula el tiempo real de cada
+        cuadro y se realizan tantas actualizaciones lógicas como entren
+        en ese tiempo, pero nunca mas de ``maximo_de_pasos``: si el
+        equipo es muy lento se descarta el tiempo sobrante en lugar de
+        acumular un retraso cada vez mayor.
+
+        Al dibujar, cada actor se muestra entre su estado anterior y el
+        actual según el tiempo que sobró, así el movimiento se ve suave
+        aunque el dibujado no coincida con las actualizaciones.
+
+        Mientras el juego está en pausa se redibuja pocas veces por
+        segundo.
+
+        :param estado: True para usar el bucle con interpolación, False para volver al bucle normal.
+        :param maximo_de_pasos: Cantidad máxima de actualizaciones lógicas por cuadro.
+        """
+        self.bucle_con_interpolacion = estado
+
+        if estado:
+            self.fps = fps.FPSConAcumulador(60, maximo_de_pasos)
+        else:
+            self.fps = fps.FPS(60)
+
+        if self.timer_id:
+            self.killTimer(self.timer_id)
+            self.timer_id = self.startTimer(self._obtener_intervalo_del_timer())
 
     def obtener_centro_fisico(self):
         """Retorna el centro de la ventana en pixels."""
@@ -450,6 +601,10 @@ class WidgetSinAceleracion(QtGui.QWidget):
         Este método se llama automáticamente 100 veces por segundo, ya
         que se hace una llamada a 'startTimer' indicando esa frecuencia.
         """
+        if self.bucle_con_interpolacion:
+            self._avanzar_bucle_con_interpolacion()
+            return
+
         if not self.pausa:
             if self.capturar_errores:
                 try:
@@ -462,8 +617,76 @@ class WidgetSinAceleracion(QtGui.QWidget):
             self.pilas.realizar_actualizacion_logica_en_modo_pausa()
 
         # Pide redibujar el widget (Qt llamará a paintEvent después).
+        self._solicitar_redibujado()
+
+    def _avanzar_bucle_con_interpolacion(self):
+        """Actualiza la simulación cuando se usa el bucle con interpolación.
+
+        Si el juego está en pausa solo se redibuja cada
+        INTERVALO_EN_REPOSO milisegundos, y si la ventana está oculta
+        se sigue actualizando la lógica pero sin redibujar. Tampoco se
+        redibuja si nada cambió desde el último cuadro.
+        """
+        if self.pausa:
+            self.pilas.realizar_actualizacion_logica_en_modo_pausa()
+            self._firma_del_ultimo_dibujado = None
+
+            # El tiempo en pausa no se tiene que recuperar al continuar.
+            self.fps.reiniciar()
+            actual = self.fps.timer.elapsed()
+
+            if actual - self._ultimo_dibujado_en_reposo > INTERVALO_EN_REPOSO:
+                self._ultimo_dibujado_en_reposo = actual
+                self.update()
+
+            return
+
+        if self.capturar_errores:
+            try:
+                self._realizar_actualizacion_logica()
+            except Exception, e:
+                self.procesar_error(e)
+        else:
+            self._realizar_actualizacion_logica()
+
+        if self.isVisible() and not self.isMinimized() and self._hubo_cambios():
+            self._solicitar_redibujado()
+
+    def _hubo_cambios(self):
+        """Indica si la escena puede verse distinta que en el último dibujado."""
+        firma = self.pilas.escenas.obtener_firma_de_dibujado()
+
+        if firma is not None and firma == self._firma_del_ultimo_dibujado:
+            return False
+
+        self._firma_del_ultimo_dibujado = firma
+        return True
+
+    def definir_redibujado_por_regiones(self, estado=True):
+        """Hace que en cada cuadro solo se pinten las partes que cambiaron.
+
+        :param estado: True para pintar solo las regiones modificadas, False para pintar siempre toda la ventana.
+        """
+        self.redibujar_por_regiones = estado
         self.update()
 
+    def _solicitar_redibujado(self):
+        rectangulos = None
+
+        if self.redibujar_por_regiones and not self.pausa:
+            rectangulos = self.pilas.escenas.obtener_rectangulos_modificados()
+
+        if rectangulos is None:
+            self.update()
+            return
+
+        for (x, y, ancho, alto) in rectangulos:
+            x = self.window_dx + x * self.escala
+            y = self.window_dy + y * self.escala
+            self.update(int(x) - 1, int(y) - 1,
+                        int(ancho * self.escala) + 3,
+                        int(alto * self.escala) + 3)
+
     @capturar_errores_decorator
     def keyPressEvent(self, event):
         if event.isAutoRepeat():
@@ -707,5 +930,8 @@ class WidgetSinAceleracion(QtGui.QWidget):
         "Quita el modo pausa."
         self.pausa = False
 
+        # Borra el texto 'en pausa' aunque se pinte solo por regiones.
+        self.update()
+
     def usa_aceleracion_de_video(self):
         return False